@@ -0,0 +1,81 @@
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from typing import List, Optional, Tuple, Any
+from datetime import datetime
+import base64
+import json
+
+# Keyset pagination over (created_at, id): rows inserted while a client is
+# paging never shift the pages it has not fetched yet.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_rank_cursor(rank: float, kind: str, row_id: str) -> str:
+    """Cursor for result lists ordered by (rank desc, kind, id), such as search"""
+    raw = json.dumps([rank, kind, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, kind, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), str(kind), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_fields(fields: Optional[str], allowed: List[str], required: List[str]) -> List[str]:
+    """Resolve a comma-separated ?fields= selector; always includes ``required``"""
+    if not fields:
+        return list(allowed)
+    
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    return [f for f in allowed if f in requested or f in required]
+
+def keyset_page(query, model, cursor: Optional[str], limit: int):
+    """
+    Order by (created_at, id), start after ``cursor`` and fetch one extra row
+    to know whether another page exists. Returns (rows, next_cursor).
+    Rows must expose ``created_at`` and ``id``.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) > tuple_(created_at, row_id))
+    
+    rows = query.order_by(model.created_at, model.id).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+def select_columns(model, fields: List[str]) -> List[Any]:
+    """Columns to load for the selected fields plus the keyset columns"""
+    names = list(dict.fromkeys(fields + ["created_at", "id"]))
+    return [getattr(model, name) for name in names]
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
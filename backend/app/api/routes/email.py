@@ -5,8 +5,9 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 
 from ...core.database import get_db
+from ...core.rate_limit import rate_limit
 from ...models.database import PDF, LearningObjective
-from ...services.email_service import send_test_link_email
+from ...services.email_service import enqueue_test_link_email
 
 router = APIRouter()
 
@@ -15,7 +16,7 @@ class SendTestLinkRequest(BaseModel):
     pdf_id: Optional[str] = None
     learning_objective_id: Optional[str] = None
 
-@router.post("/send-test-link")
+@router.post("/send-test-link", dependencies=[Depends(rate_limit("email"))])
 async def send_test_link(
     request: SendTestLinkRequest,
     db: Session = Depends(get_db)
@@ -46,16 +47,20 @@ async def send_test_link(
                     "pdf_id": lo_record.pdf_id
                 }
         
-        # Send email with test link
-        await send_test_link_email(
+        # Queue email with test link; the outbox sender delivers it after commit.
+        # The same link to the same address is sent at most once a day
+        queued = enqueue_test_link_email(
+            db,
             email=request.email,
             pdf_info=pdf_info,
             lo_info=lo_info
         )
+        db.commit()
         
         return {
-            "message": "Test link sent successfully",
-            "email": request.email
+            "message": "Test link queued for delivery" if queued else "This test link was already sent today",
+            "email": request.email,
+            "queued": queued
         }
         
     except Exception as e:
@@ -65,21 +70,27 @@ async def send_test_link(
             detail=f"Failed to send test link: {str(e)}"
         )
 
-@router.post("/send-demo-link")
-async def send_demo_link(request: SendTestLinkRequest):
+@router.post("/send-demo-link", dependencies=[Depends(rate_limit("email"))])
+async def send_demo_link(
+    request: SendTestLinkRequest,
+    db: Session = Depends(get_db)
+):
     """Send a demo link for testing the app without any specific content"""
     
     try:
-        await send_test_link_email(
+        queued = enqueue_test_link_email(
+            db,
             email=request.email,
             pdf_info=None,
             lo_info=None,
             is_demo=True
         )
+        db.commit()
         
         return {
-            "message": "Demo link sent successfully",
-            "email": request.email
+            "message": "Demo link queued for delivery" if queued else "This demo link was already sent today",
+            "email": request.email,
+            "queued": queued
         }
         
     except Exception as e:
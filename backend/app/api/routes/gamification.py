@@ -2,15 +2,16 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from typing import Dict, Any
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
+from ...models.schemas import GamificationStats
 from ...services.gamification_service import gamification_service
 
 router = APIRouter()
 
-@router.get("/stats/{user_id}")
+@router.get("/stats/{user_id}", response_model=GamificationStats)
 async def get_user_gamification_stats(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get user's current gamification stats including streak, mastery points, and badges"""
     
@@ -1,44 +1,52 @@
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import uuid
-import os
 from datetime import datetime
 
-from ...core.database import get_db
-from ...models.database import PDF, LearningObjective, Question
+from ...core.database import get_db, get_read_db, session_scope
+from ...models.database import PDF, LearningObjective
+from ...models.schemas import PDFStatus, LearningObjectiveSummary
 from ...services.ai_service import ai_service
+from ...services.persistence_service import persistence_service
+from ...services.storage_service import storage_service
+from ...services.extraction_service import extraction_service, document_hash, format_pages
+from ...services.revision_service import revision_service
+from ...services.markdown_splitter import is_markdown
 from ...core.config import settings
+from ..pagination import DEFAULT_PAGE_SIZE, keyset_page, parse_fields, select_columns, set_next_cursor
+from ...core.metrics import timed_job, PROCESSING_JOB_FAILURES
+from ...core.rate_limit import rate_limit, llm_admission
 
 router = APIRouter()
 
-@router.post("/upload")
+@router.post(
+    "/upload",
+    dependencies=[Depends(llm_admission("pdf_upload")), Depends(rate_limit("pdf_upload"))]
+)
 async def upload_pdf(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: str = "user-1",  # TODO: Get from auth
     db: Session = Depends(get_db)
 ):
-    """Upload and process PDF file"""
+    """Upload and process a PDF or Markdown file"""
     
     # Validate file
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    if not (file.filename.endswith('.pdf') or is_markdown(file.filename)):
+        raise HTTPException(status_code=400, detail="Only PDF and Markdown files are allowed")
     
     if file.size > settings.max_file_size:
         raise HTTPException(status_code=400, detail="File size too large")
     
-    # Create upload directory if it doesn't exist
-    os.makedirs(settings.upload_dir, exist_ok=True)
-    
-    # Save file
+    # Save file; the storage key never includes the client-supplied filename
     pdf_id = str(uuid.uuid4())
-    file_path = os.path.join(settings.upload_dir, f"{pdf_id}_{file.filename}")
+    file_path = f"pdfs/{pdf_id}.md" if is_markdown(file.filename) else f"pdfs/{pdf_id}.pdf"
     
     content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    await storage_service.save(file_path, content)
+    content_hash = document_hash(content)
     
     # Create PDF record
     pdf_record = PDF(
@@ -46,6 +54,7 @@ async def upload_pdf(
         user_id=user_id,
         filename=file.filename,
         file_path=file_path,
+        content_hash=content_hash,
         uploaded_at=datetime.utcnow(),
         processed=False
     )
@@ -54,7 +63,7 @@ async def upload_pdf(
     db.commit()
     
     # Process PDF in background
-    background_tasks.add_task(process_pdf_task, pdf_id, content, db)
+    background_tasks.add_task(process_pdf_task, pdf_id, file_path, content, content_hash)
     
     return {
         "pdf_id": pdf_id,
@@ -62,68 +71,112 @@ async def upload_pdf(
         "status": "processing"
     }
 
-async def process_pdf_task(pdf_id: str, file_content: bytes, db: Session):
+@timed_job("pdf_upload")
+async def process_pdf_task(pdf_id: str, file_path: str, file_content: bytes, content_hash: Optional[str] = None):
     """Background task to process PDF and generate questions"""
     try:
-        # Extract text
-        pdf_text = await ai_service.extract_text_from_pdf(file_content)
-        
-        # Parse learning objectives
-        learning_objectives = await ai_service.parse_learning_objectives_table(pdf_text)
+        if is_markdown(file_path):
+            # Objectives and their sections in one pass over the stored file
+            learning_objectives = await ai_service.parse_markdown_objectives(file_path)
+        else:
+            # Extract text (re-uploads of the same file reuse the cached pages)
+            _, pages = await extraction_service.pages_from_content(file_content, content_hash)
+            pdf_text = format_pages(pages)
+            
+            # Parse learning objectives
+            learning_objectives = await ai_service.parse_learning_objectives_table(pdf_text)
         
         # Extract content chunks
-        content_chunks = await ai_service.extract_content_chunks(pdf_text, learning_objectives)
+        content_chunks = await ai_service.extract_content_chunks(learning_objectives)
         
-        # Create learning objective records
+        # Generate everything first, then persist the document in one transaction
+        objective_rows = []
+        question_rows = []
         for lo_data in learning_objectives:
             lo_id = lo_data["id"]
+            content_chunk = content_chunks.get(lo_id, "")
             
-            lo_record = LearningObjective(
-                id=lo_id,
-                pdf_id=pdf_id,
-                title=lo_data["title"],
-                priority=lo_data["priority"],
-                page_range=lo_data.get("page_range", ""),
-                tags=lo_data.get("tags", []),
-                content_chunk=content_chunks.get(lo_id, ""),
-                mastery_percent=0.0
+            objective_rows.append(
+                persistence_service.learning_objective_row(lo_id, pdf_id, lo_data, content_chunk)
             )
             
-            db.add(lo_record)
-            db.commit()
-            
             # Generate questions for this LO
-            questions = await ai_service.generate_questions_for_lo(lo_data, content_chunks.get(lo_id, ""))
-            
-            for q_data in questions:
-                question_record = Question(
-                    id=q_data["id"],
-                    learning_objective_id=lo_id,
-                    question_text=q_data["question_text"],
-                    options=q_data["options"],
-                    correct_answer=q_data["correct_answer"],
-                    explanation=q_data["explanation"],
-                    difficulty=q_data["difficulty"],
-                    stability=1.0,
-                    difficulty_rating=5.0,
-                    review_count=0
-                )
-                
-                db.add(question_record)
-            
-            db.commit()
+            questions = await ai_service.generate_questions_for_lo(lo_data, content_chunk)
+            question_rows.extend(persistence_service.question_row(lo_id, q_data) for q_data in questions)
         
-        # Mark PDF as processed
-        pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
-        if pdf_record:
-            pdf_record.processed = True
-            db.commit()
+        with session_scope() as db:
+            persistence_service.save_generated_content(db, objective_rows, question_rows)
+            
+            # Mark PDF as processed
+            db.query(PDF).filter(PDF.id == pdf_id).update({PDF.processed: True})
             
     except Exception as e:
+        PROCESSING_JOB_FAILURES.labels(job="pdf_upload").inc()
         print(f"Error processing PDF {pdf_id}: {str(e)}")
         # TODO: Update PDF record with error status
 
-@router.get("/status/{pdf_id}")
+@router.post(
+    "/{pdf_id}/revision",
+    dependencies=[Depends(llm_admission("pdf_upload")), Depends(rate_limit("pdf_upload"))]
+)
+async def upload_revision(
+    pdf_id: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """Upload a new version of a PDF; only objectives on changed pages are regenerated"""
+    
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+    
+    if file.size > settings.max_file_size:
+        raise HTTPException(status_code=400, detail="File size too large")
+    
+    pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
+    if not pdf_record:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    
+    if not pdf_record.processed:
+        raise HTTPException(status_code=409, detail="PDF is still being processed")
+    
+    if is_markdown(pdf_record.file_path or ""):
+        raise HTTPException(status_code=400, detail="Revisions are supported for PDF documents only")
+    
+    content = await file.read()
+    content_hash = document_hash(content)
+    if content_hash == pdf_record.content_hash:
+        return {"pdf_id": pdf_id, "message": "Revision is identical to the current version.", "status": "unchanged"}
+    
+    # A new key per revision; the previous file is removed once the revision is applied
+    file_path = f"pdfs/{pdf_id}.{content_hash[:16]}.pdf"
+    await storage_service.save(file_path, content)
+    
+    pdf_record.processed = False
+    db.commit()
+    
+    background_tasks.add_task(process_revision_task, pdf_id, file_path, content, content_hash)
+    
+    return {
+        "pdf_id": pdf_id,
+        "message": "Revision uploaded. Reprocessing changed pages.",
+        "status": "processing"
+    }
+
+@timed_job("pdf_revision")
+async def process_revision_task(pdf_id: str, file_path: str, file_content: bytes, content_hash: str):
+    """Background task to apply a revision to an already processed PDF"""
+    try:
+        summary = await revision_service.apply_revision(pdf_id, file_path, file_content, content_hash)
+        print(f"Applied revision to PDF {pdf_id}: {summary}")
+    except Exception as e:
+        PROCESSING_JOB_FAILURES.labels(job="pdf_revision").inc()
+        print(f"Error applying revision to PDF {pdf_id}: {str(e)}")
+        # The previous version stays current
+        with session_scope() as db:
+            db.query(PDF).filter(PDF.id == pdf_id).update({PDF.processed: True})
+
+@router.get("/status/{pdf_id}", response_model=PDFStatus)
 async def get_pdf_status(pdf_id: str, db: Session = Depends(get_db)):
     """Get PDF processing status"""
     
@@ -138,22 +191,32 @@ async def get_pdf_status(pdf_id: str, db: Session = Depends(get_db)):
         "uploaded_at": pdf_record.uploaded_at
     }
 
-@router.get("/learning-objectives/{pdf_id}")
-async def get_learning_objectives(pdf_id: str, db: Session = Depends(get_db)):
-    """Get learning objectives for a PDF"""
+LEARNING_OBJECTIVE_FIELDS = ["id", "title", "priority", "page_range", "tags", "mastery_percent"]
+
+@router.get(
+    "/learning-objectives/{pdf_id}",
+    response_model=List[LearningObjectiveSummary],
+    response_model_exclude_unset=True
+)
+async def get_learning_objectives(
+    pdf_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Get learning objectives for a PDF (keyset paginated, see X-Next-Cursor)"""
     
-    learning_objectives = db.query(LearningObjective).filter(
+    selected = parse_fields(fields, LEARNING_OBJECTIVE_FIELDS, required=["id"])
+    
+    query = db.query(*select_columns(LearningObjective, selected)).filter(
         LearningObjective.pdf_id == pdf_id
-    ).all()
+    )
+    learning_objectives, next_cursor = keyset_page(query, LearningObjective, cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     return [
-        {
-            "id": lo.id,
-            "title": lo.title,
-            "priority": lo.priority,
-            "page_range": lo.page_range,
-            "tags": lo.tags,
-            "mastery_percent": lo.mastery_percent
-        }
+        {field: getattr(lo, field) for field in selected}
         for lo in learning_objectives
     ]
@@ -5,14 +5,22 @@ from typing import Dict, Any
 import uuid
 from datetime import datetime
 
-from ...core.database import get_db
-from ...models.database import PDF, LearningObjective, Question
+from ...core.database import get_db, session_scope
+from ...core.metrics import timed_job, PROCESSING_JOB_FAILURES
+from ...core.rate_limit import rate_limit, llm_admission
+from ...models.database import PDF
 from ...services.ai_service import ai_service
-from ...services.email_service import send_processing_complete_email
+from ...services.persistence_service import persistence_service
+from ...services.extraction_service import extraction_service, format_pages
+from ...services.markdown_splitter import is_markdown
+from ...services.email_service import enqueue_processing_complete_email
 
 router = APIRouter()
 
-@router.post("/pdf/{pdf_id}")
+@router.post(
+    "/pdf/{pdf_id}",
+    dependencies=[Depends(llm_admission("pdf_process")), Depends(rate_limit("pdf_process"))]
+)
 async def process_pdf(
     pdf_id: str,
     background_tasks: BackgroundTasks,
@@ -33,7 +41,7 @@ async def process_pdf(
     db.commit()
     
     # Start background processing
-    background_tasks.add_task(process_pdf_task, pdf_id, db)
+    background_tasks.add_task(process_pdf_task, pdf_id)
     
     return {
         "message": "PDF processing started",
@@ -41,81 +49,68 @@ async def process_pdf(
         "status": "processing"
     }
 
-async def process_pdf_task(pdf_id: str, db: Session):
+@timed_job("pdf_process")
+async def process_pdf_task(pdf_id: str):
     """Background task to process PDF and generate questions"""
     try:
         # Get PDF record
-        pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
-        if not pdf_record:
-            return
+        with session_scope() as db:
+            pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
+            if not pdf_record:
+                return
+            file_path = pdf_record.file_path
+            content_hash = pdf_record.content_hash
+            user_id = pdf_record.user_id
+            filename = pdf_record.filename
         
-        # Download file from Supabase storage
-        file_content = await ai_service.download_pdf_from_storage(pdf_record.file_path)
-        
-        # Extract text
-        pdf_text = await ai_service.extract_text_from_pdf(file_content)
-        
-        # Parse learning objectives
-        learning_objectives = await ai_service.parse_learning_objectives_from_text(pdf_text)
+        if is_markdown(file_path):
+            # Objectives and their sections in one pass over the stored file
+            learning_objectives = await ai_service.parse_markdown_objectives(file_path, filename)
+            for lo_data in learning_objectives:
+                lo_data.setdefault("content", lo_data.get("content_text", ""))
+        else:
+            # Cached pages when this file was extracted before; otherwise parse
+            # straight from the stored file (cached locally for remote storage)
+            content_hash, pages = await extraction_service.pages_from_storage(file_path, content_hash)
+            pdf_text = format_pages(pages)
+            
+            # Parse learning objectives
+            learning_objectives = await ai_service.parse_learning_objectives_from_text(pdf_text)
         
-        # Create learning objective records
+        # Generate everything first, then persist the document in one transaction
+        objective_rows = []
+        question_rows = []
         for lo_data in learning_objectives:
             lo_id = str(uuid.uuid4())
             
-            lo_record = LearningObjective(
-                id=lo_id,
-                pdf_id=pdf_id,
-                user_id=pdf_record.user_id,
-                title=lo_data["title"],
-                description=lo_data.get("description", ""),
-                priority=lo_data.get("priority", "Medium"),
-                page_range=lo_data.get("page_range", ""),
-                content_text=lo_data.get("content", ""),
-                mastery_level=0.0,
-                total_questions=0
+            objective_rows.append(
+                persistence_service.learning_objective_row(lo_id, pdf_id, lo_data, lo_data.get("content", ""))
             )
             
-            db.add(lo_record)
-            db.commit()
-            
             # Generate questions for this LO
             questions = await ai_service.generate_questions_for_lo(lo_data)
+            question_rows.extend(persistence_service.question_row(lo_id, q_data) for q_data in questions)
+        
+        with session_scope() as db:
+            persistence_service.save_generated_content(db, objective_rows, question_rows)
             
-            for q_data in questions:
-                question_record = Question(
-                    id=str(uuid.uuid4()),
-                    learning_objective_id=lo_id,
-                    question_text=q_data["question_text"],
-                    option_a=q_data["options"][0],
-                    option_b=q_data["options"][1], 
-                    option_c=q_data["options"][2],
-                    option_d=q_data["options"][3],
-                    correct_answer=q_data["correct_answer"],
-                    explanation=q_data["explanation"],
-                    difficulty=q_data["difficulty"]
-                )
-                
-                db.add(question_record)
+            # Update PDF status and counts
+            pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
+            pdf_record.processing_status = "completed"
+            pdf_record.content_hash = content_hash
+            pdf_record.total_learning_objectives = len(learning_objectives)
             
-            # Update LO with question count
-            lo_record.total_questions = len(questions)
-            db.commit()
-        
-        # Update PDF status and counts
-        pdf_record.processing_status = "completed"
-        pdf_record.total_learning_objectives = len(learning_objectives)
-        db.commit()
-        
-        # Send completion email
-        await send_processing_complete_email(pdf_record.user_id, pdf_record.filename)
+            # Completion email commits with the results, so it is sent only if they are saved
+            enqueue_processing_complete_email(db, user_id, filename)
         
     except Exception as e:
+        PROCESSING_JOB_FAILURES.labels(job="pdf_process").inc()
         print(f"Error processing PDF {pdf_id}: {str(e)}")
         # Update PDF status to failed
-        pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
-        if pdf_record:
-            pdf_record.processing_status = "failed"
-            db.commit()
+        with session_scope() as db:
+            pdf_record = db.query(PDF).filter(PDF.id == pdf_id).first()
+            if pdf_record:
+                pdf_record.processing_status = "failed"
 
 @router.get("/status/{pdf_id}")
 async def get_processing_status(pdf_id: str, db: Session = Depends(get_db)):
@@ -1,16 +1,21 @@
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.orm import Session, contains_eager, undefer
+from typing import List, Dict, Any, Optional
 
-from ...core.database import get_db
-from ...models.database import Question, LearningObjective
-from ...services.ai_service import ai_service
+from ...core.database import get_db, get_read_db
+from ..pagination import DEFAULT_PAGE_SIZE, keyset_page, parse_fields, select_columns, set_next_cursor
+from ...core.config import settings
+from ...core.rate_limit import rate_limit, llm_limiter
+from ...models.database import Question, LearningObjective, PDF
+from ...models.schemas import DueQuestion, QuestionDetail
+from ...services.coverage_service import coverage_service
+from ...services.question_buffer import question_buffer
 from ...services.fsrs_service import fsrs_service
 
 router = APIRouter()
 
-@router.get("/due")
+@router.get("/due", response_model=List[DueQuestion])
 async def get_due_questions(
     user_id: str = "user-1",  # TODO: Get from auth
     limit: int = 30,
@@ -18,116 +23,108 @@ async def get_due_questions(
 ):
     """Get questions due for review"""
     
-    # Get all questions for the user
-    questions = db.query(Question).join(LearningObjective).join(LearningObjective.pdf).filter(
-        Question.learning_objective.has(
-            LearningObjective.pdf.has(user_id=user_id)
-        )
-    ).all()
+    # Get all questions for the user, loading each LO in the same query
+    questions = db.query(Question).join(Question.learning_objective).join(LearningObjective.pdf).filter(
+        PDF.user_id == user_id
+    ).options(contains_eager(Question.learning_objective)).all()
     
     # Get due questions using FSRS
     due_questions = fsrs_service.get_due_questions(questions, limit)
     
+    # Options are deferred; fetch them for the returned page only, in one query
+    options = dict(
+        db.query(Question.id, Question.options).filter(Question.id.in_([q.id for q in due_questions]))
+    ) if due_questions else {}
+    
     return [
         {
             "id": q.id,
             "learning_objective_id": q.learning_objective_id,
             "learning_objective_title": q.learning_objective.title,
             "question_text": q.question_text,
-            "options": q.options,
+            "options": options.get(q.id),
             "difficulty": q.difficulty,
             "review_count": q.review_count
         }
         for q in due_questions
     ]
 
-@router.get("/by-objective/{learning_objective_id}")
+QUESTION_FIELDS = ["id", "question_text", "options", "correct_answer", "explanation", "difficulty"]
+
+@router.get(
+    "/by-objective/{learning_objective_id}",
+    response_model=List[QuestionDetail],
+    response_model_exclude_unset=True
+)
 async def get_questions_by_objective(
     learning_objective_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get all questions for a specific learning objective"""
+    """
+    Get questions for a specific learning objective, one keyset page at a time.
+    The next page's cursor is returned in the X-Next-Cursor header; ``fields``
+    (e.g. ``id,question_text``) limits the columns loaded and returned.
+    """
     
-    questions = db.query(Question).filter(
+    selected = parse_fields(fields, QUESTION_FIELDS, required=["id"])
+    
+    query = db.query(*select_columns(Question, selected)).filter(
         Question.learning_objective_id == learning_objective_id
-    ).all()
+    )
+    questions, next_cursor = keyset_page(query, Question, cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     return [
-        {
-            "id": q.id,
-            "question_text": q.question_text,
-            "options": q.options,
-            "correct_answer": q.correct_answer,
-            "explanation": q.explanation,
-            "difficulty": q.difficulty
-        }
+        {field: getattr(q, field) for field in selected}
         for q in questions
     ]
 
-@router.post("/check-coverage/{learning_objective_id}")
+@router.post(
+    "/check-coverage/{learning_objective_id}",
+    dependencies=[Depends(rate_limit("coverage"))]
+)
 async def check_and_generate_questions(
     learning_objective_id: str,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Check if more questions are needed and generate them if necessary"""
+    """
+    Score the question bank against the objective's material locally and
+    only queue LLM generation when coverage is actually low
+    """
     
     # Get learning objective
-    lo = db.query(LearningObjective).filter(LearningObjective.id == learning_objective_id).first()
+    lo = db.query(LearningObjective).filter(LearningObjective.id == learning_objective_id).options(
+        undefer(LearningObjective.content_chunk)
+    ).first()
     if not lo:
         raise HTTPException(status_code=404, detail="Learning objective not found")
     
-    # Get existing questions
-    existing_questions = db.query(Question).filter(
-        Question.learning_objective_id == learning_objective_id
-    ).all()
+    # Only the columns the coverage engine reads
+    rows = db.query(
+        Question.question_text, Question.options, Question.explanation, Question.difficulty, Question.review_count
+    ).filter(Question.learning_objective_id == learning_objective_id).all()
+    existing_questions = [row._asdict() for row in rows]
     
-    # Check if we need more questions
-    needs_more = await ai_service.check_question_coverage(learning_objective_id, existing_questions)
+    profile = coverage_service.profile_for(lo.id, lo.content_chunk or "", lo.tags or [])
+    report = coverage_service.analyze(profile, existing_questions)
     
-    if needs_more:
-        # Generate more questions in background
-        background_tasks.add_task(generate_additional_questions_task, lo, existing_questions, db)
-        return {"message": "Additional questions are being generated", "status": "generating"}
-    else:
-        return {"message": "Sufficient questions available", "status": "sufficient"}
-
-async def generate_additional_questions_task(
-    learning_objective: LearningObjective,
-    existing_questions: List[Question],
-    db: Session
-):
-    """Background task to generate additional questions"""
-    try:
-        lo_data = {
-            "id": learning_objective.id,
-            "title": learning_objective.title,
-            "priority": learning_objective.priority
-        }
-        
-        new_questions = await ai_service.generate_additional_questions(
-            lo_data,
-            learning_objective.content_chunk,
-            existing_questions
+    if not report.needs_more:
+        return {"message": "Sufficient questions available", "status": "sufficient", "coverage": report.to_dict()}
+    
+    if question_buffer.is_refilling(learning_objective_id):
+        return {"message": "Additional questions are being generated", "status": "generating", "coverage": report.to_dict()}
+    
+    if llm_limiter.saturated:
+        raise HTTPException(
+            status_code=503,
+            detail="AI processing is at capacity, please retry later",
+            headers={"Retry-After": str(settings.llm_retry_after_seconds)}
         )
-        
-        for q_data in new_questions:
-            question_record = Question(
-                id=q_data["id"],
-                learning_objective_id=learning_objective.id,
-                question_text=q_data["question_text"],
-                options=q_data["options"],
-                correct_answer=q_data["correct_answer"],
-                explanation=q_data["explanation"],
-                difficulty=q_data["difficulty"],
-                stability=1.0,
-                difficulty_rating=5.0,
-                review_count=0
-            )
-            
-            db.add(question_record)
-        
-        db.commit()
-        
-    except Exception as e:
-        print(f"Error generating additional questions for {learning_objective.id}: {str(e)}")
+    
+    # Generated by the question buffer workers, under the global generation budget
+    question_buffer.request_refill(learning_objective_id)
+    return {"message": "Additional questions are being generated", "status": "generating", "coverage": report.to_dict()}
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from ...core.database import get_read_db
+from ..pagination import decode_rank_cursor, encode_rank_cursor, set_next_cursor
+from ...models.schemas import SearchHit
+from ...services.search_service import search_service, KINDS
+
+router = APIRouter()
+
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 50
+
+@router.get("", response_model=List[SearchHit], response_model_exclude_none=True)
+async def search(
+    q: str,
+    response: Response,
+    user_id: str = "user-1",  # TODO: Get from auth
+    kind: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_SEARCH_PAGE_SIZE,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Search the user's questions and learning objectives, best matches first.
+    ``q`` takes words, "quoted phrases" and -excluded words; ``kind`` limits
+    results to ``question`` or ``objective``. The next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
+    
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {kind}. Allowed: {', '.join(KINDS)}")
+    
+    hits, next_cursor = search_service.search(
+        db,
+        user_id,
+        q,
+        kinds=[kind] if kind else None,
+        cursor=decode_rank_cursor(cursor) if cursor else None,
+        limit=max(1, min(limit, MAX_SEARCH_PAGE_SIZE))
+    )
+    set_next_cursor(response, encode_rank_cursor(*next_cursor) if next_cursor else None)
+    return hits
@@ -1,18 +1,22 @@
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.orm import Session, undefer
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import uuid
 
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db, pin_reads_to_primary
+from ..pagination import DEFAULT_PAGE_SIZE, keyset_page, parse_fields, select_columns, set_next_cursor
 from ...models.database import StudySession, Question, QuestionAttempt
+from ...models.schemas import SessionStarted, AnswerResult, SessionCompleted, SessionResults
 from ...services.fsrs_service import fsrs_service
+from ...services.question_buffer import question_buffer
 
 router = APIRouter()
 
-@router.post("/session/start")
+@router.post("/session/start", response_model=SessionStarted)
 async def start_study_session(
+    response: Response,
     session_type: str = "test",  # "study" or "test"
     user_id: str = "user-1",  # TODO: Get from auth
     db: Session = Depends(get_db)
@@ -30,6 +34,7 @@ async def start_study_session(
     
     db.add(session)
     db.commit()
+    pin_reads_to_primary(response)
     
     return {
         "session_id": session_id,
@@ -37,10 +42,11 @@ async def start_study_session(
         "started_at": session.started_at
     }
 
-@router.post("/session/{session_id}/answer")
+@router.post("/session/{session_id}/answer", response_model=AnswerResult)
 async def submit_answer(
     session_id: str,
     answer_data: Dict[str, Any],
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Submit an answer for a question in a session"""
@@ -50,10 +56,11 @@ async def submit_answer(
     response_time = answer_data.get("response_time", 0)
     difficulty_rating = answer_data.get("difficulty_rating", "medium")
     
-    # Get question
-    question = db.query(Question).filter(Question.id == question_id).first()
+    # Get question, with the explanation this response returns (deferred by default)
+    question = db.query(Question).filter(Question.id == question_id).options(undefer(Question.explanation)).first()
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
+    explanation = question.explanation
     
     # Check if answer is correct
     is_correct = user_answer == question.correct_answer
@@ -83,17 +90,23 @@ async def submit_answer(
     question.review_count = fsrs_updates["review_count"]
     
     db.commit()
+    pin_reads_to_primary(response)
+    
+    # First review of this question: one fewer unseen in its objective's buffer
+    if question.review_count == 1:
+        question_buffer.note_demand(question.learning_objective_id)
     
     return {
         "is_correct": is_correct,
         "correct_answer": question.correct_answer,
-        "explanation": question.explanation,
+        "explanation": explanation,
         "next_review": question.next_review
     }
 
-@router.post("/session/{session_id}/complete")
+@router.post("/session/{session_id}/complete", response_model=SessionCompleted)
 async def complete_study_session(
     session_id: str,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Complete a study session and calculate results"""
@@ -118,6 +131,7 @@ async def complete_study_session(
     session.accuracy = accuracy
     
     db.commit()
+    pin_reads_to_primary(response)
     
     return {
         "session_id": session_id,
@@ -127,20 +141,34 @@ async def complete_study_session(
         "completed_at": session.completed_at
     }
 
-@router.get("/session/{session_id}/results")
+ATTEMPT_FIELDS = ["question_id", "user_answer", "is_correct", "response_time", "difficulty_rating"]
+
+@router.get(
+    "/session/{session_id}/results",
+    response_model=SessionResults,
+    response_model_exclude_unset=True
+)
 async def get_session_results(
     session_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_read_db)
 ):
-    """Get detailed results for a study session"""
+    """Get detailed results for a study session, with keyset-paginated attempts"""
     
     session = db.query(StudySession).filter(StudySession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    attempts = db.query(QuestionAttempt).filter(
+    selected = parse_fields(fields, ATTEMPT_FIELDS, required=["question_id"])
+    
+    query = db.query(*select_columns(QuestionAttempt, selected)).filter(
         QuestionAttempt.session_id == session_id
-    ).all()
+    )
+    attempts, next_cursor = keyset_page(query, QuestionAttempt, cursor, limit)
+    set_next_cursor(response, next_cursor)
     
     return {
         "session": {
@@ -153,13 +181,7 @@ async def get_session_results(
             "accuracy": session.accuracy
         },
         "attempts": [
-            {
-                "question_id": attempt.question_id,
-                "user_answer": attempt.user_answer,
-                "is_correct": attempt.is_correct,
-                "response_time": attempt.response_time,
-                "difficulty_rating": attempt.difficulty_rating
-            }
+            {field: getattr(attempt, field) for field in selected}
             for attempt in attempts
         ]
     }
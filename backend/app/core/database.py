@@ -1,4 +1,7 @@
-
+from contextlib import contextmanager
+from typing import Optional
+import os
+from fastapi import Request, Response
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -8,9 +11,81 @@ engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Read replica, falling back to the primary when none is configured
+if settings.database_read_url:
+    read_engine = create_engine(
+        settings.database_read_url,
+        execution_options={"postgresql_readonly": True} if settings.database_read_url.startswith("postgresql") else {}
+    )
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Clients send this header, or carry this cookie after a write, to read from the primary
+READ_PRIMARY_HEADER = "X-Read-Primary"
+READ_PRIMARY_COOKIE = "rf_read_primary"
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints, routed to the read replica.
+
+    Requests that must see their own writes are pinned to the primary, either
+    explicitly via the ``X-Read-Primary: 1`` header or by the short-lived
+    cookie set by ``pin_reads_to_primary`` on write endpoints.
+    """
+    pinned = (
+        request.headers.get(READ_PRIMARY_HEADER) == "1"
+        or READ_PRIMARY_COOKIE in request.cookies
+    )
+    db = SessionLocal() if pinned else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def pin_reads_to_primary(response: Response):
+    """Keep this client's reads on the primary until the replica has caught up"""
+    if read_engine is engine:
+        return
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        "1",
+        max_age=settings.read_primary_pin_seconds,
+        httponly=True,
+        samesite="lax"
+    )
+
+def run_migrations(database_url: Optional[str] = None):
+    """Upgrade the schema to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+    
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "migrations"))
+    config.set_main_option("sqlalchemy.url", database_url or settings.database_url)
+    command.upgrade(config, "head")
+
+@contextmanager
+def session_scope():
+    """Transactional session for background workers.
+
+    Request-scoped sessions from ``get_db`` are closed once the response is
+    sent, so background tasks must open their own session. Everything done
+    inside the block is committed once, or rolled back on error.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+from typing import Optional
+import asyncio
+import random
+
+from .config import settings
+
+# One pooled HTTP/2 client for every outbound integration (Resend, Supabase
+# storage), created and closed by the app lifespan. httpx is imported lazily
+# to keep it off the app import path.
+
+_client = None
+
+# Responses worth retrying: rate limits and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def create_http_client(transport=None):
+    """Build the shared client; pass ``transport`` (e.g. httpx.MockTransport) in tests"""
+    import httpx
+    
+    return httpx.AsyncClient(
+        http2=transport is None,
+        transport=transport,
+        timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections
+        )
+    )
+
+async def start_http_client(transport=None):
+    """Create the shared client (app startup)"""
+    global _client
+    if _client is None:
+        _client = create_http_client(transport)
+    return _client
+
+async def close_http_client():
+    """Close the shared client and its pooled connections (app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def set_http_client(client):
+    """Swap in a different client, e.g. one backed by a mock transport"""
+    global _client
+    _client = client
+
+def get_http_client():
+    """The shared client; created on demand when running outside the app lifespan"""
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
+
+def _retry_delay(attempt: int, response=None) -> float:
+    """Exponential backoff with full jitter, honouring Retry-After when given"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.http_max_backoff_seconds)
+    ceiling = min(settings.http_max_backoff_seconds, settings.http_backoff_seconds * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+async def request_with_retry(method: str, url: str, max_retries: Optional[int] = None, **kwargs):
+    """
+    Send a request on the shared client, retrying transport errors and
+    429/5xx responses with exponential backoff. Returns the last response;
+    raises the last transport error if every attempt failed to connect.
+    """
+    import httpx
+    
+    max_retries = settings.http_max_retries if max_retries is None else max_retries
+    client = get_http_client()
+    
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            continue
+        
+        if response.status_code not in RETRY_STATUSES or attempt == max_retries:
+            return response
+        await asyncio.sleep(_retry_delay(attempt, response))
@@ -0,0 +1,224 @@
+from functools import wraps
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+# HTTP instrumentation, fed by RequestMetricsMiddleware
+HTTP_REQUEST_DURATION = Histogram(
+    "recallforge_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "recallforge_http_requests_in_flight",
+    "HTTP requests currently being served",
+    ["method"]
+)
+
+# Database instrumentation, fed per request by QueryStatsMiddleware
+DB_QUERIES_PER_REQUEST = Histogram(
+    "recallforge_db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "recallforge_db_time_per_request_seconds",
+    "Cumulative time spent in SQL statements per HTTP request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_N_PLUS_ONE = Counter(
+    "recallforge_db_n_plus_one_total",
+    "Requests that repeated one statement with different parameters past the N+1 threshold",
+    ["route"]
+)
+
+# LLM instrumentation, fed by OptimizedAIService
+LLM_CALLS = Counter(
+    "recallforge_llm_calls_total",
+    "LLM generate calls by operation and outcome",
+    ["operation", "outcome"]
+)
+LLM_LATENCY = Histogram(
+    "recallforge_llm_call_duration_seconds",
+    "LLM generate call latency",
+    ["operation"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+LLM_PROMPT_CHARS = Histogram(
+    "recallforge_llm_prompt_chars",
+    "LLM prompt size in characters",
+    ["operation"],
+    buckets=(500, 1000, 2500, 5000, 10000, 20000, 50000)
+)
+LLM_RESPONSE_CHARS = Histogram(
+    "recallforge_llm_response_chars",
+    "LLM response size in characters",
+    ["operation"],
+    buckets=(500, 1000, 2500, 5000, 10000, 20000, 50000)
+)
+OBJECTIVE_PARSES = Counter(
+    "recallforge_objective_parses_total",
+    "Learning objective extraction by method: documented table (no LLM) or LLM",
+    ["method"]
+)
+LLM_FALLBACKS = Counter(
+    "recallforge_llm_fallbacks_total",
+    "Results replaced by canned fallback content",
+    ["kind"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "recallforge_llm_calls_in_flight",
+    "LLM calls currently holding a slot under LLM_MAX_CONCURRENCY"
+)
+
+# Background question buffer refills, fed by QuestionBufferService
+QUESTION_BUFFER_REFILLS = Counter(
+    "recallforge_question_buffer_refills_total",
+    "Question buffer refill checks by outcome",
+    ["outcome"]
+)
+QUESTION_BUFFER_QUEUE = Gauge(
+    "recallforge_question_buffer_queue_depth",
+    "Learning objectives waiting for a refill check"
+)
+
+# Admission control, fed by the rate_limit and llm_admission dependencies
+RATE_LIMITED = Counter(
+    "recallforge_requests_rejected_total",
+    "Requests rejected by rate limiting (429) or LLM load shedding (503)",
+    ["route", "reason"]
+)
+
+# Email outbox, fed by OutboxSender
+OUTBOX_EMAILS = Counter(
+    "recallforge_outbox_emails_total",
+    "Outbox emails by delivery outcome",
+    ["outcome"]
+)
+OUTBOX_BATCH_SIZE = Histogram(
+    "recallforge_outbox_batch_size",
+    "Emails claimed per outbox drain",
+    buckets=(1, 5, 10, 25, 50, 100)
+)
+
+# Background processing jobs
+PROCESSING_JOB_DURATION = Histogram(
+    "recallforge_processing_job_duration_seconds",
+    "Background processing job duration",
+    ["job"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200)
+)
+PROCESSING_JOB_FAILURES = Counter(
+    "recallforge_processing_job_failures_total",
+    "Background processing jobs that ended in an error",
+    ["job"]
+)
+
+# Local document cache in front of remote storage
+STORAGE_CACHE_LOOKUPS = Counter(
+    "recallforge_storage_cache_lookups_total",
+    "Document cache lookups for remotely stored documents",
+    ["result"]
+)
+STORAGE_CACHE_BYTES = Gauge(
+    "recallforge_storage_cache_bytes",
+    "Bytes held in the local document cache"
+)
+
+# Persisted per-page PDF extraction cache
+EXTRACTION_CACHE_LOOKUPS = Counter(
+    "recallforge_extraction_cache_lookups_total",
+    "Extracted page cache lookups when processing a document",
+    ["result"]
+)
+
+def timed_job(job: str):
+    """Record the duration of an async background job"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                PROCESSING_JOB_DURATION.labels(job=job).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+class RequestMetricsMiddleware:
+    """Per-route latency histogram and in-flight gauge, cheap enough to leave on"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        finished = False
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method=method)
+        started = time.perf_counter()
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            in_flight.dec()
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(method=method, route=route, status=str(status)).observe(
+                time.perf_counter() - started
+            )
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            # BackgroundTasks run after the last body chunk, inside self.app;
+            # they are not part of the request's latency
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Requests that never completed a response (errors, disconnects)
+            finish()
+
+class DBPoolCollector:
+    """Reports connection pool state for each engine at scrape time"""
+
+    def __init__(self, engines):
+        self.engines = engines
+
+    def collect(self):
+        size = GaugeMetricFamily("recallforge_db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("recallforge_db_pool_checked_out", "Connections in use", labels=["engine"])
+        checked_in = GaugeMetricFamily("recallforge_db_pool_checked_in", "Idle connections in the pool", labels=["engine"])
+        overflow = GaugeMetricFamily("recallforge_db_pool_overflow", "Connections beyond pool size", labels=["engine"])
+
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # Only QueuePool exposes counters; other pools (e.g. SQLite's) are skipped
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            checked_in.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], pool.overflow())
+
+        return [size, checked_out, checked_in, overflow]
+
+def register_db_pool_collector(engines):
+    """Expose pool stats for the given {name: engine} mapping"""
+    REGISTRY.register(DBPoolCollector(engines))
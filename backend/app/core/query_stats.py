@@ -0,0 +1,156 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Tuple
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .metrics import DB_QUERIES_PER_REQUEST, DB_TIME_PER_REQUEST, DB_N_PLUS_ONE
+
+def _parameters_key(parameters) -> int:
+    """Hash of a statement's bound parameters (executemany lists included)"""
+    try:
+        if isinstance(parameters, dict):
+            return hash(tuple(sorted(parameters.items())))
+        if isinstance(parameters, list):
+            return hash(tuple(_parameters_key(p) for p in parameters))
+        return hash(parameters)
+    except TypeError:
+        # Unhashable values (e.g. JSON columns)
+        return hash(repr(parameters))
+
+class QueryStats:
+    """SQL statement count, cumulative DB time and repeated statements for one scope"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+        # Statement -> hashes of the distinct parameter sets it ran with
+        self.parameter_sets = defaultdict(set)
+        self.closed = False
+
+    def record(self, statement: str, parameters, elapsed: float):
+        if self.closed:
+            return
+        self.count += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+        self.parameter_sets[statement].add(_parameters_key(parameters))
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Statements run with at least ``threshold`` distinct parameter sets,
+        the N+1 signature; re-running one lookup with the same parameters is
+        not flagged
+        """
+        threshold = threshold or settings.n_plus_one_threshold
+        repeated = [(sql, len(keys)) for sql, keys in self.parameter_sets.items() if len(keys) >= threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+# Stats for the request currently being served (set by QueryStatsMiddleware)
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Process-wide collectors used by count_queries(); they see queries from any thread
+_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters, elapsed)
+
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.record(statement, parameters, elapsed)
+
+class QueryStatsMiddleware:
+    """
+    Counts SQL statements and DB time per request and flags N+1 patterns.
+    Debug mode adds X-DB-* response headers; metrics are always recorded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        def finish():
+            # BackgroundTasks run after the response, still in this context;
+            # their queries are not the request's
+            if stats.closed:
+                return
+            stats.closed = True
+            route = getattr(scope.get("route"), "path", "unmatched")
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route=route).observe(stats.total_time)
+
+            repeated = stats.repeated_statements()
+            if repeated:
+                DB_N_PLUS_ONE.labels(route=route).inc()
+                if settings.debug:
+                    sql, n = repeated[0]
+                    print(f"Possible N+1 on {route}: statement ran with {n} parameter sets: {sql[:200]}")
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.debug:
+                repeated = stats.repeated_statements()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_time * 1000:.2f}".encode()))
+                headers.append((b"x-db-n-plus-one", str(len(repeated)).encode()))
+                message["headers"] = headers
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _request_stats.reset(token)
+            finish()
+
+@contextmanager
+def count_queries():
+    """Collect every SQL statement executed inside the block, from any thread"""
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """
+    Fail if the block runs more than ``max_queries`` SQL statements.
+
+        with assert_max_queries(3):
+            client.get("/api/questions/due")
+    """
+    with count_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        listing = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.most_common())
+        raise AssertionError(f"Expected at most {max_queries} queries, got {stats.count}:\n{listing}")
@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import asyncio
+import math
+import threading
+import time
+
+from fastapi import HTTPException, Request
+
+from .config import settings
+from .metrics import RATE_LIMITED, LLM_IN_FLIGHT
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """``capacity`` requests per ``period_seconds``, refilled continuously"""
+    capacity: int
+    period_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimitRule":
+        """Parse "capacity/period_seconds", e.g. "5/60" """
+        capacity, period = spec.split("/")
+        return cls(int(capacity), float(period))
+
+class MemoryRateLimitStore:
+    """Token buckets in process memory; per worker, so limits scale with worker count"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> Tuple[bool, float]:
+        """Take ``cost`` tokens; returns (allowed, seconds until enough tokens)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(rule.capacity), now))
+            tokens = min(rule.capacity, tokens + (now - updated) * rule.refill_per_second)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            # Least recently used buckets go first; an evicted bucket simply starts full again
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        retry_after = 0.0 if allowed else (cost - tokens) / rule.refill_per_second
+        return allowed, retry_after
+
+# Same algorithm as MemoryRateLimitStore, run atomically inside Redis
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker through Redis"""
+
+    def __init__(self, url: str):
+        # Imported here so the memory store has no redis dependency
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+
+    def take(self, key: str, rule: RateLimitRule, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, tokens = self._script(
+            keys=[f"ratelimit:{key}"],
+            args=[rule.capacity, rule.refill_per_second, cost]
+        )
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / rule.refill_per_second
+
+class RateLimiter:
+    """Per-route token buckets keyed by client IP and by user"""
+
+    def __init__(self):
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._rules: Optional[Dict[str, RateLimitRule]] = None
+
+    @property
+    def store(self):
+        with self._store_lock:
+            if self._store is None:
+                if settings.rate_limit_backend == "redis":
+                    self._store = RedisRateLimitStore(settings.rate_limit_redis_url or settings.redis_url)
+                else:
+                    self._store = MemoryRateLimitStore()
+            return self._store
+
+    def set_store(self, store):
+        with self._store_lock:
+            self._store = store
+
+    def rules(self) -> Dict[str, RateLimitRule]:
+        """Per-route rules from settings, parsed once"""
+        if self._rules is None:
+            self._rules = {
+                "email": RateLimitRule.parse(settings.rate_limit_email),
+                "pdf_upload": RateLimitRule.parse(settings.rate_limit_pdf_upload),
+                "pdf_process": RateLimitRule.parse(settings.rate_limit_pdf_process),
+                "coverage": RateLimitRule.parse(settings.rate_limit_coverage),
+            }
+        return self._rules
+
+    def check(self, route: str, client_ip: str, user_id: Optional[str] = None) -> float:
+        """Take a token from every bucket that applies; returns Retry-After seconds, 0 if allowed"""
+        rule = self.rules()[route]
+        keys = [f"{route}:ip:{client_ip}"]
+        if user_id:
+            keys.append(f"{route}:user:{user_id}")
+
+        retry_after = 0.0
+        for key in keys:
+            try:
+                allowed, wait = self.store.take(key, rule)
+            except Exception as e:
+                # Fail open: a limiter outage must not take the endpoints down with it
+                print(f"Error checking rate limit: {str(e)}")
+                continue
+            if not allowed:
+                retry_after = max(retry_after, wait)
+        return retry_after
+
+def _client_ip(request: Request) -> str:
+    if settings.rate_limit_trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+def rate_limit(route: str):
+    """
+    Dependency that admits a request only if both the caller's IP bucket and
+    user bucket for ``route`` have a token, otherwise 429 with Retry-After.
+    The user is the ``user_id`` query parameter or X-User-Id header until auth lands.
+    """
+    async def dependency(request: Request):
+        if not settings.rate_limit_enabled:
+            return
+        user_id = request.query_params.get("user_id") or request.headers.get("x-user-id")
+        client_ip = _client_ip(request)
+        if settings.rate_limit_backend == "redis":
+            # Keep the Redis round trip off the event loop
+            retry_after = await asyncio.to_thread(rate_limiter.check, route, client_ip, user_id)
+        else:
+            retry_after = rate_limiter.check(route, client_ip, user_id)
+        if retry_after > 0:
+            RATE_LIMITED.labels(route=route, reason="rate_limit").inc()
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+    return dependency
+
+class ConcurrencyLimiter:
+    """
+    Caps concurrent LLM calls for the whole process. Calls past the cap wait
+    their turn; ``saturated`` tells request handlers to shed new LLM work
+    instead of queueing it behind minutes of backlog.
+    """
+
+    def __init__(self, max_concurrency: int, max_waiting: int):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per event loop (benchmarks and scripts may run several)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_concurrency and self.waiting >= self.max_waiting
+
+    async def __aenter__(self):
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        LLM_IN_FLIGHT.set(self.in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.in_flight -= 1
+        LLM_IN_FLIGHT.set(self.in_flight)
+        self._get_semaphore().release()
+
+def llm_admission(route: str):
+    """Dependency that rejects new LLM-backed requests with 503 while the LLM queue is full"""
+    async def dependency():
+        if llm_limiter.saturated:
+            RATE_LIMITED.labels(route=route, reason="llm_saturated").inc()
+            raise HTTPException(
+                status_code=503,
+                detail="AI processing is at capacity, please retry later",
+                headers={"Retry-After": str(settings.llm_retry_after_seconds)}
+            )
+    return dependency
+
+# Global rate limiter and LLM concurrency limiter instances
+rate_limiter = RateLimiter()
+llm_limiter = ConcurrencyLimiter(settings.llm_max_concurrency, settings.llm_max_waiting)
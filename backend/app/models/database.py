@@ -1,7 +1,7 @@
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 from enum import Enum
 
@@ -17,6 +17,12 @@ class Difficulty(str, Enum):
     MEDIUM = "medium"
     HARD = "hard"
 
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -33,9 +39,11 @@ class PDF(Base):
     __tablename__ = "pdfs"
     
     id = Column(String, primary_key=True)
-    user_id = Column(String, ForeignKey("users.id"))
+    user_id = Column(String, ForeignKey("users.id"), index=True)
     filename = Column(String)
     file_path = Column(String)
+    # SHA-256 of the stored file; keys the extracted page cache
+    content_hash = Column(String(64))
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     processed = Column(Boolean, default=False)
     
@@ -43,18 +51,25 @@ class PDF(Base):
     user = relationship("User", back_populates="pdfs")
     learning_objectives = relationship("LearningObjective", back_populates="pdf")
 
+# learning_objectives and questions also have full-text search indexes that the
+# database maintains itself and are not mapped here (migration 0006)
 class LearningObjective(Base):
     __tablename__ = "learning_objectives"
+    __table_args__ = (
+        # Keyset pagination within a PDF
+        Index("ix_learning_objectives_pdf_id_created_at_id", "pdf_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True)
-    pdf_id = Column(String, ForeignKey("pdfs.id"))
+    pdf_id = Column(String, ForeignKey("pdfs.id"), index=True)
     title = Column(String)
     priority = Column(String)  # High, Medium, Low
     page_range = Column(String)
     tags = Column(JSON)
-    content_chunk = Column(Text)
+    # Source text (often 5-50 KB); loaded only when accessed or undefer()ed
+    content_chunk = deferred(Column(Text))
     mastery_percent = Column(Float, default=0.0)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     pdf = relationship("PDF", back_populates="learning_objectives")
@@ -62,15 +77,22 @@ class LearningObjective(Base):
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Keyset pagination within a learning objective
+        Index("ix_questions_learning_objective_id_created_at_id", "learning_objective_id", "created_at", "id"),
+        # Due-card counts per objective for the reminder digest
+        Index("ix_questions_learning_objective_id_next_review", "learning_objective_id", "next_review"),
+    )
     
     id = Column(String, primary_key=True)
-    learning_objective_id = Column(String, ForeignKey("learning_objectives.id"))
+    learning_objective_id = Column(String, ForeignKey("learning_objectives.id"), index=True)
     question_text = Column(Text)
-    options = Column(JSON)  # List of options for MCQ
+    # Not needed by scheduling or list queries; loaded only when accessed or undefer()ed
+    options = deferred(Column(JSON))  # List of options for MCQ
     correct_answer = Column(String)
-    explanation = Column(Text)
+    explanation = deferred(Column(Text))
     difficulty = Column(String, default="medium")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # FSRS Algorithm fields
     stability = Column(Float, default=1.0)
@@ -85,6 +107,10 @@ class Question(Base):
 
 class StudySession(Base):
     __tablename__ = "study_sessions"
+    __table_args__ = (
+        # Streak and mastery lookups filter by user and walk completed_at
+        Index("ix_study_sessions_user_id_completed_at", "user_id", "completed_at"),
+    )
     
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey("users.id"))
@@ -101,16 +127,51 @@ class StudySession(Base):
 
 class QuestionAttempt(Base):
     __tablename__ = "question_attempts"
+    __table_args__ = (
+        # Keyset pagination of a session's attempts
+        Index("ix_question_attempts_session_id_created_at_id", "session_id", "created_at", "id"),
+    )
     
     id = Column(String, primary_key=True)
-    session_id = Column(String, ForeignKey("study_sessions.id"))
-    question_id = Column(String, ForeignKey("questions.id"))
+    session_id = Column(String, ForeignKey("study_sessions.id"), index=True)
+    question_id = Column(String, ForeignKey("questions.id"), index=True)
     user_answer = Column(String)
     is_correct = Column(Boolean)
     response_time = Column(Float)  # in seconds
     difficulty_rating = Column(String)  # easy, medium, hard (user feedback)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     session = relationship("StudySession", back_populates="attempts")
     question = relationship("Question", back_populates="attempts")
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The sender polls for due rows in (status, next_attempt_at) order
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    
+    id = Column(String, primary_key=True)
+    recipient = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    # Same recipient + same message within the dedup window is enqueued once
+    dedup_key = Column(String, unique=True, nullable=False)
+    status = Column(String, default=OutboxStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+class ExtractedPage(Base):
+    """Cleaned text of one PDF page, shared by every upload of the same file"""
+    __tablename__ = "extracted_pages"
+    
+    document_hash = Column(String(64), primary_key=True)
+    # Rows written by an older extractor are never read (see EXTRACTOR_VERSION)
+    extractor_version = Column(Integer, primary_key=True)
+    page_number = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
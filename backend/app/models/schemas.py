@@ -0,0 +1,103 @@
+from pydantic import BaseModel
+from typing import List, Optional, Any
+from datetime import datetime
+
+# Response models for the hot read/write endpoints. Declaring them lets
+# FastAPI serialize through pydantic-core instead of jsonable_encoder.
+
+class DueQuestion(BaseModel):
+    id: str
+    learning_objective_id: Optional[str] = None
+    learning_objective_title: Optional[str] = None
+    question_text: Optional[str] = None
+    options: Optional[List[Any]] = None
+    difficulty: Optional[str] = None
+    review_count: Optional[int] = None
+
+class QuestionDetail(BaseModel):
+    id: str
+    question_text: Optional[str] = None
+    options: Optional[List[Any]] = None
+    correct_answer: Optional[str] = None
+    explanation: Optional[str] = None
+    difficulty: Optional[str] = None
+
+class LearningObjectiveSummary(BaseModel):
+    id: str
+    title: Optional[str] = None
+    priority: Optional[str] = None
+    page_range: Optional[str] = None
+    tags: Optional[List[Any]] = None
+    mastery_percent: Optional[float] = None
+
+class SearchHit(BaseModel):
+    kind: str  # "question" or "objective"
+    id: str
+    learning_objective_id: Optional[str] = None
+    learning_objective_title: Optional[str] = None
+    question_text: Optional[str] = None
+    difficulty: Optional[str] = None
+    snippet: Optional[str] = None  # HTML-escaped, matches wrapped in <mark>
+    rank: float
+
+class PDFStatus(BaseModel):
+    pdf_id: str
+    filename: Optional[str] = None
+    processed: Optional[bool] = None
+    uploaded_at: Optional[datetime] = None
+
+class SessionStarted(BaseModel):
+    session_id: str
+    session_type: Optional[str] = None
+    started_at: Optional[datetime] = None
+
+class AnswerResult(BaseModel):
+    is_correct: bool
+    correct_answer: Optional[str] = None
+    explanation: Optional[str] = None
+    next_review: Optional[datetime] = None
+
+class SessionCompleted(BaseModel):
+    session_id: str
+    total_questions: int
+    correct_answers: int
+    accuracy: float
+    completed_at: Optional[datetime] = None
+
+class SessionSummary(BaseModel):
+    id: str
+    session_type: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    total_questions: Optional[int] = None
+    correct_answers: Optional[int] = None
+    accuracy: Optional[float] = None
+
+class AttemptResult(BaseModel):
+    question_id: Optional[str] = None
+    user_answer: Optional[str] = None
+    is_correct: Optional[bool] = None
+    response_time: Optional[float] = None
+    difficulty_rating: Optional[str] = None
+
+class SessionResults(BaseModel):
+    session: SessionSummary
+    # One keyset page; the next page's cursor is in the X-Next-Cursor header
+    attempts: List[AttemptResult]
+
+class Badge(BaseModel):
+    id: str
+    name: str
+    description: str
+    icon: str
+    requirement: int
+    type: str
+    earned: bool = False
+
+class GamificationStats(BaseModel):
+    user_id: str
+    streak_count: int
+    total_mastery_points: int
+    earned_badges_count: int
+    total_badges_count: int
+    earned_badges: List[Badge]
@@ -3,46 +3,89 @@ import os
 import re
 import json
 from typing import List, Dict, Any, Optional, Tuple
-import google.generativeai as genai
-import PyPDF2
-import markdown
-from io import BytesIO
+import threading
 import uuid
-import httpx
+import time
+
+import asyncio
+
+# google.generativeai and PyPDF2 are imported on first use
+# to keep them off the app import path
 
 from ..core.config import settings
+from ..core.rate_limit import llm_limiter
+from ..core.metrics import LLM_CALLS, LLM_LATENCY, LLM_PROMPT_CHARS, LLM_RESPONSE_CHARS, LLM_FALLBACKS, OBJECTIVE_PARSES
 from ..models.database import LearningObjective, Question
+from .llm_backends import LLMBackend, create_llm_backend
+from .dedup_service import dedup_service
+from .storage_service import storage_service
+from .extraction_service import extract_pages, format_pages
+from .objective_table import parse_objective_table
+from .markdown_splitter import markdown_objectives
+
+# Markdown without headings goes to the LLM; its prompt uses the first 12k characters
+MARKDOWN_LLM_BYTES = 48 * 1024
+
+# How many existing question stems to quote in a prompt as "do not repeat"
+AVOID_LIST_SIZE = 40
 
 class OptimizedAIService:
     def __init__(self):
-        # Configure Gemini with optimized settings
-        if settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(
-                'gemini-pro',
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,
-                    top_p=0.8,
-                    top_k=40,
-                    max_output_tokens=8192,
-                )
-            )
-        else:
-            print("Warning: GEMINI_API_KEY not configured")
-            self.model = None
+        # The LLM backend is built by configure(), from the app lifespan or on first use
+        self._backend = None
+        self._configured = False
+        self._configure_lock = threading.Lock()
+    
+    def configure(self, backend: Optional[LLMBackend] = None):
+        """Build the LLM backend selected in settings, or install the given one"""
+        with self._configure_lock:
+            if backend is not None:
+                self._backend = backend
+                self._configured = True
+            elif not self._configured:
+                self._backend = create_llm_backend()
+                self._configured = True
+            return self._backend
+    
+    @property
+    def backend(self) -> Optional[LLMBackend]:
+        return self._backend if self._configured else self.configure()
+    
+    @property
+    def is_configured(self) -> bool:
+        """Whether a backend is (or will be) available, without building it"""
+        return settings.llm_backend != "gemini" or bool(settings.gemini_api_key)
+    
+    async def _generate(self, operation: str, prompt: str) -> str:
+        """Call the backend off the event loop and record count, latency and payload sizes"""
+        LLM_PROMPT_CHARS.labels(operation=operation).observe(len(prompt))
+        # Global cap so a burst of documents cannot exhaust the Gemini quota or the thread pool
+        async with llm_limiter:
+            started = time.perf_counter()
+            try:
+                response_text = await asyncio.to_thread(self.backend.generate, operation, prompt)
+            except Exception:
+                LLM_CALLS.labels(operation=operation, outcome="error").inc()
+                raise
+            finally:
+                LLM_LATENCY.labels(operation=operation).observe(time.perf_counter() - started)
+        
+        LLM_CALLS.labels(operation=operation, outcome="ok").inc()
+        LLM_RESPONSE_CHARS.labels(operation=operation).observe(len(response_text))
+        return response_text
+    
+    def _extract_json_array(self, text: str) -> Optional[List[Any]]:
+        """Parse the outermost JSON array in a model response"""
+        # Greedy match: objects contain nested arrays (options, key_concepts)
+        json_match = re.search(r'\[.*\]', text, re.DOTALL)
+        if not json_match:
+            return None
+        return json.loads(json_match.group())
     
     async def download_file_from_storage(self, file_path: str) -> bytes:
-        """Download file from Supabase storage"""
+        """Read a stored document (through the local document cache for remote backends)"""
         try:
-            storage_url = f"{settings.supabase_url}/storage/v1/object/public/documents/{file_path}"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(storage_url)
-                if response.status_code == 200:
-                    return response.content
-                else:
-                    raise Exception(f"Failed to download file: {response.status_code}")
-                    
+            return await storage_service.read(file_path)
         except Exception as e:
             raise Exception(f"Failed to download file from storage: {str(e)}")
     
@@ -63,64 +106,49 @@ class OptimizedAIService:
         except Exception as e:
             raise Exception(f"Failed to extract content from file: {str(e)}")
     
-    async def _extract_pdf_content(self, file_content: bytes) -> str:
+    async def extract_text_from_pdf(self, file_content) -> str:
+        """Extract text from an uploaded PDF (bytes or a memory-mapped file)"""
+        return await self._extract_pdf_content(file_content)
+    
+    async def download_pdf_from_storage(self, file_path: str) -> bytes:
+        """Download a stored PDF"""
+        return await self.download_file_from_storage(file_path)
+    
+    async def _extract_pdf_content(self, file_content) -> str:
         """Extract text from PDF with better formatting"""
         try:
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-            text_parts = []
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text.strip():
-                    # Clean and format text
-                    page_text = self._clean_extracted_text(page_text)
-                    text_parts.append(f"## Page {page_num}\n\n{page_text}\n")
-            
-            return '\n'.join(text_parts)
+            return format_pages(extract_pages(file_content))
         except Exception as e:
             raise Exception(f"Failed to extract PDF content: {str(e)}")
     
     async def _extract_markdown_content(self, file_content: bytes) -> str:
         """Extract content from Markdown files"""
         try:
-            # Decode markdown content
-            md_content = file_content.decode('utf-8')
-            
-            # Convert to HTML then back to clean text for processing
-            html = markdown.markdown(md_content)
-            
-            # Return original markdown for better structure preservation
-            return md_content
+            # Markdown is already the structure the parsers want; no rendering needed
+            return file_content.decode('utf-8')
         except Exception as e:
             raise Exception(f"Failed to extract Markdown content: {str(e)}")
     
-    def _clean_extracted_text(self, text: str) -> str:
-        """Clean and format extracted text"""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Fix common PDF extraction issues
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add space between camelCase
-        text = re.sub(r'([.!?])\s*([A-Z])', r'\1\n\n\2', text)  # New paragraph after sentences
-        
-        # Remove page numbers and headers/footers (basic heuristic)
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            # Skip likely page numbers, headers, footers
-            if len(line) < 3 or line.isdigit() or re.match(r'^Page \d+', line):
-                continue
-            cleaned_lines.append(line)
+    async def parse_markdown_objectives(self, file_path: str, filename: str = "document") -> List[Dict[str, Any]]:
+        """
+        Learning objectives of a stored Markdown document, split by headings
+        in one pass over the file; the LLM sees the start of the document
+        only when it has no headings at all
+        """
+        local_path = await storage_service.local_path(file_path)
+        learning_objectives = await asyncio.to_thread(_markdown_objectives_from_file, local_path)
+        if learning_objectives:
+            OBJECTIVE_PARSES.labels(method="markdown").inc()
+            return learning_objectives
         
-        return '\n'.join(cleaned_lines)
+        head = await storage_service.read_range(file_path, 0, MARKDOWN_LLM_BYTES)
+        return await self.parse_learning_objectives_table(head.decode('utf-8', 'replace'), filename)
     
     async def parse_learning_objectives_from_content(self, content: str, filename: str) -> List[Dict[str, Any]]:
         """Parse learning objectives from content using optimized Gemini prompts"""
         
-        if not self.model:
-            raise Exception("Gemini API not configured")
+        if not self.backend:
+            raise Exception("LLM backend not configured")
         
         # Enhanced prompt for better learning objective extraction
         prompt = f"""
@@ -156,13 +184,11 @@ class OptimizedAIService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            content_text = response.text
+            content_text = await self._generate("parse_learning_objectives", prompt)
             
             # Extract JSON with better error handling
-            json_match = re.search(r'\[.*?\]', content_text, re.DOTALL)
-            if json_match:
-                learning_objectives = json.loads(json_match.group())
+            learning_objectives = self._extract_json_array(content_text)
+            if learning_objectives:
                 
                 # Validate and enhance each learning objective
                 validated_objectives = []
@@ -178,6 +204,31 @@ class OptimizedAIService:
             print(f"Error parsing learning objectives: {str(e)}")
             return self._create_fallback_objectives(content, filename)
     
+    async def parse_learning_objectives_table(self, content: str, filename: str = "document") -> List[Dict[str, Any]]:
+        """Parse learning objectives and give each one an id"""
+        # Documents with the documented objectives table need no LLM call
+        learning_objectives = parse_objective_table(content)
+        if learning_objectives:
+            OBJECTIVE_PARSES.labels(method="table").inc()
+            return learning_objectives
+        
+        OBJECTIVE_PARSES.labels(method="llm").inc()
+        learning_objectives = await self.parse_learning_objectives_from_content(content, filename)
+        for obj in learning_objectives:
+            obj.setdefault("id", str(uuid.uuid4()))
+        return learning_objectives
+    
+    async def parse_learning_objectives_from_text(self, content: str) -> List[Dict[str, Any]]:
+        """Parse learning objectives with their material under "content" """
+        learning_objectives = await self.parse_learning_objectives_table(content)
+        for obj in learning_objectives:
+            obj.setdefault("content", obj.get("content_text", ""))
+        return learning_objectives
+    
+    async def extract_content_chunks(self, learning_objectives: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Map each learning objective id to its study material"""
+        return {obj["id"]: obj.get("content_text", "") for obj in learning_objectives}
+    
     def _validate_learning_objective(self, obj: Dict) -> bool:
         """Validate learning objective structure"""
         required_fields = ['title', 'description', 'priority', 'content_text']
@@ -185,6 +236,7 @@ class OptimizedAIService:
     
     def _create_fallback_objectives(self, content: str, filename: str) -> List[Dict[str, Any]]:
         """Create fallback learning objectives if AI parsing fails"""
+        LLM_FALLBACKS.labels(kind="objectives").inc()
         content_preview = content[:2000] if len(content) > 2000 else content
         
         return [
@@ -203,8 +255,8 @@ class OptimizedAIService:
     async def generate_comprehensive_questions(self, learning_objective: Dict, min_questions: int = 30) -> List[Dict[str, Any]]:
         """Generate comprehensive questions using optimized Gemini prompts"""
         
-        if not self.model:
-            raise Exception("Gemini API not configured")
+        if not self.backend:
+            raise Exception("LLM backend not configured")
         
         # Enhanced prompt for diverse, high-quality question generation
         prompt = f"""
@@ -262,12 +314,10 @@ class OptimizedAIService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            content_text = response.text
+            content_text = await self._generate("generate_questions", prompt)
             
-            json_match = re.search(r'\[.*?\]', content_text, re.DOTALL)
-            if json_match:
-                questions = json.loads(json_match.group())
+            questions = self._extract_json_array(content_text)
+            if questions:
                 
                 # Validate and ensure we have enough questions
                 validated_questions = []
@@ -292,6 +342,23 @@ class OptimizedAIService:
             print(f"Error generating questions: {str(e)}")
             return self._create_fallback_questions(learning_objective, min_questions)
     
+    async def generate_questions_for_lo(self, lo_data: Dict, content_chunk: str = "", min_questions: int = 30) -> List[Dict[str, Any]]:
+        """Generate questions for a learning objective in the stored format"""
+        learning_objective = {**lo_data, "content_text": content_chunk or lo_data.get("content_text", "")}
+        questions = await self.generate_comprehensive_questions(learning_objective, min_questions)
+        return [self._to_stored_question(q) for q in questions]
+    
+    def _to_stored_question(self, question: Dict) -> Dict[str, Any]:
+        """Convert generated option_a..option_d fields to the stored options list"""
+        return {
+            "id": str(uuid.uuid4()),
+            "question_text": question["question_text"],
+            "options": [question["option_a"], question["option_b"], question["option_c"], question["option_d"]],
+            "correct_answer": question["correct_answer"].upper(),
+            "explanation": question["explanation"],
+            "difficulty": question.get("difficulty", "medium")
+        }
+    
     def _validate_question(self, question: Dict) -> bool:
         """Validate question structure and content"""
         required_fields = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer', 'explanation']
@@ -309,8 +376,31 @@ class OptimizedAIService:
         
         return True
     
+    async def generate_additional_questions(
+        self,
+        lo_data: Dict,
+        content_chunk: str,
+        existing_questions: List[Any],
+        count: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Generate ``count`` new questions for an objective in the stored format, avoiding existing ones"""
+        learning_objective = {**lo_data, "content_text": content_chunk or ""}
+        existing = [
+            {"question_text": q["question_text"] if isinstance(q, dict) else q.question_text}
+            for q in existing_questions
+        ]
+        questions = await self._generate_additional_questions(learning_objective, count, existing)
+        return [self._to_stored_question(q) for q in questions]
+    
     async def _generate_additional_questions(self, learning_objective: Dict, needed_count: int, existing_questions: List[Dict]) -> List[Dict[str, Any]]:
         """Generate additional questions to meet minimum requirement"""
+        # Near-duplicate index over what we already have: it picks the distinct
+        # stems to quote in the prompt and rejects repeats in the response
+        index = dedup_service.build_index(
+            (str(i), q["question_text"]) for i, q in enumerate(existing_questions) if q.get("question_text")
+        )
+        avoid = "\n".join(f"- {text[:160]}" for text in index.texts(AVOID_LIST_SIZE))
+        
         # Simplified prompt for additional questions
         prompt = f"""
         Buat {needed_count} soal pilihan ganda tambahan yang BERBEDA dari soal-soal yang sudah ada.
@@ -318,19 +408,23 @@ class OptimizedAIService:
         Topik: {learning_objective['title']}
         Materi: {learning_objective.get('content_text', '')[:4000]}
         
+        Soal yang sudah ada (JANGAN diulang atau diparafrasekan):
+        {avoid or "-"}
+        
         Hindari duplikasi dengan soal yang sudah ada. Buat soal dengan fokus berbeda.
         
         Format JSON yang sama seperti sebelumnya.
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            content_text = response.text
+            content_text = await self._generate("generate_additional_questions", prompt)
             
-            json_match = re.search(r'\[.*?\]', content_text, re.DOTALL)
-            if json_match:
-                additional_questions = json.loads(json_match.group())
-                return [q for q in additional_questions if self._validate_question(q)]
+            additional_questions = self._extract_json_array(content_text)
+            if additional_questions:
+                return [
+                    q for i, q in enumerate(additional_questions)
+                    if self._validate_question(q) and index.add_if_new(f"new-{i}", q["question_text"])
+                ]
         except:
             pass
         
@@ -338,6 +432,7 @@ class OptimizedAIService:
     
     def _create_fallback_questions(self, learning_objective: Dict, count: int) -> List[Dict[str, Any]]:
         """Create fallback questions if AI generation fails"""
+        LLM_FALLBACKS.labels(kind="questions").inc()
         base_question = {
             "question_text": f"Apa konsep utama dalam {learning_objective['title']}?",
             "option_a": "Konsep fundamental yang mendasari pemahaman",
@@ -359,5 +454,9 @@ class OptimizedAIService:
         
         return questions
 
+def _markdown_objectives_from_file(path: str) -> Optional[List[Dict[str, Any]]]:
+    with open(path, "rb") as f:
+        return markdown_objectives(f)
+
 # Global optimized AI service instance
 ai_service = OptimizedAIService()
@@ -0,0 +1,157 @@
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+import re
+import threading
+import zlib
+
+# Indonesian and English function words; content is mostly Indonesian
+STOPWORDS = frozenset("""
+yang dan di ke dari untuk dengan pada adalah dalam ini itu atau juga tidak akan oleh sebagai
+dapat telah sudah karena secara bahwa antara lebih setiap harus masih agar maka serta jika
+bila saat tersebut yaitu yakni seperti hanya belum para sangat lain sama bagi hingga sampai
+namun tetapi terhadap melalui menjadi memiliki merupakan beberapa banyak semua suatu sebuah
+the and for with that this from are was were which what when where who how why into than
+then there their these those have has had been being also such other more most only very
+about between because while after before under over each some many much will would can
+could should does done used using uses
+""".split())
+
+_TOKEN = re.compile(r"[^\W\d_]{4,}", re.UNICODE)
+
+# Target difficulty mix used by the question generation prompt
+TARGET_DIFFICULTY = {"easy": 0.3, "medium": 0.5, "hard": 0.2}
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+@dataclass(frozen=True)
+class TermProfile:
+    """Key terms and concepts of one learning objective's material"""
+    terms: Tuple[str, ...]
+    concepts: Tuple[Tuple[str, ...], ...]
+
+@dataclass
+class CoverageReport:
+    question_count: int
+    term_coverage: float
+    concept_coverage: float
+    difficulty_balance: float
+    unseen_ratio: float
+    needs_more: bool
+    reasons: List[str] = field(default_factory=list)
+    missing_terms: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "question_count": self.question_count,
+            "term_coverage": round(self.term_coverage, 3),
+            "concept_coverage": round(self.concept_coverage, 3),
+            "difficulty_balance": round(self.difficulty_balance, 3),
+            "unseen_ratio": round(self.unseen_ratio, 3),
+            "needs_more": self.needs_more,
+            "reasons": self.reasons,
+            "missing_terms": self.missing_terms,
+        }
+
+class CoverageService:
+    """Scores a learning objective's question bank against its material without calling the LLM"""
+
+    def __init__(self, max_profiles: int = 2000):
+        self.key_term_count = 25          # Most frequent content terms tracked per objective
+        self.min_questions = 30           # Same floor as generate_questions_for_lo
+        self.min_term_coverage = 0.6      # Share of key terms the questions must touch
+        self.min_concept_coverage = 0.5   # Share of tagged key concepts the questions must touch
+        self.min_difficulty_balance = 0.6 # 1.0 = exactly the 30/50/20 target mix
+        self.min_unseen_ratio = 0.2       # Below this, users are running out of fresh questions
+        self._profiles: "OrderedDict[Tuple[str, int], TermProfile]" = OrderedDict()
+        self._max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def build_profile(self, content: str, concepts: Optional[Iterable[str]] = None) -> TermProfile:
+        """Key terms by frequency (ties by first appearance) plus tokenized concepts"""
+        counts = Counter(tokenize(content))
+        terms = tuple(term for term, _ in counts.most_common(self.key_term_count))
+        concept_tokens = tuple(
+            tuple(tokens) for tokens in (tokenize(concept) for concept in (concepts or [])) if tokens
+        )
+        return TermProfile(terms, concept_tokens)
+
+    def profile_for(self, lo_id: str, content: str, concepts: Optional[Iterable[str]] = None) -> TermProfile:
+        """Cached profile, rebuilt only when the objective's material or tags change"""
+        concepts = list(concepts or [])
+        key = (lo_id, zlib.crc32("\x00".join([content or ""] + concepts).encode("utf-8")))
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+
+        profile = self.build_profile(content, concepts)
+        with self._lock:
+            self._profiles[key] = profile
+            while len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def _difficulty_balance(self, difficulties: List[str]) -> float:
+        if not difficulties:
+            return 0.0
+        counts = Counter(d or "medium" for d in difficulties)
+        total = len(difficulties)
+        # 1 - total variation distance from the target mix
+        distance = sum(abs(counts.get(level, 0) / total - share) for level, share in TARGET_DIFFICULTY.items())
+        distance += sum(count / total for level, count in counts.items() if level not in TARGET_DIFFICULTY)
+        return max(0.0, 1.0 - distance / 2)
+
+    def analyze(self, profile: TermProfile, questions: List[Dict[str, Any]]) -> CoverageReport:
+        """
+        Score questions (dicts with question_text, options, explanation,
+        difficulty, review_count) against a profile
+        """
+        # One regex pass over the whole bank; only key-term membership is checked,
+        # so stopwords need not be filtered out here
+        parts = []
+        for q in questions:
+            parts.append(q.get("question_text") or "")
+            parts.append(q.get("explanation") or "")
+            parts.extend(str(option) for option in q.get("options") or [])
+        covered = set(_TOKEN.findall(" ".join(parts).lower()))
+
+        term_coverage = (
+            sum(1 for term in profile.terms if term in covered) / len(profile.terms) if profile.terms else 1.0
+        )
+        concept_coverage = (
+            sum(1 for concept in profile.concepts if all(token in covered for token in concept)) / len(profile.concepts)
+            if profile.concepts else 1.0
+        )
+        difficulty_balance = self._difficulty_balance([q.get("difficulty") for q in questions])
+        unseen_ratio = (
+            sum(1 for q in questions if not q.get("review_count")) / len(questions) if questions else 0.0
+        )
+
+        reasons = []
+        if len(questions) < self.min_questions:
+            reasons.append("too_few_questions")
+        if term_coverage < self.min_term_coverage:
+            reasons.append("low_term_coverage")
+        if concept_coverage < self.min_concept_coverage:
+            reasons.append("low_concept_coverage")
+        if questions and difficulty_balance < self.min_difficulty_balance:
+            reasons.append("unbalanced_difficulty")
+        if questions and unseen_ratio < self.min_unseen_ratio:
+            reasons.append("saturated")
+
+        return CoverageReport(
+            question_count=len(questions),
+            term_coverage=term_coverage,
+            concept_coverage=concept_coverage,
+            difficulty_balance=difficulty_balance,
+            unseen_ratio=unseen_ratio,
+            needs_more=bool(reasons),
+            reasons=reasons,
+            missing_terms=[term for term in profile.terms if term not in covered][:10],
+        )
+
+# Global coverage service instance
+coverage_service = CoverageService()
@@ -0,0 +1,238 @@
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from operator import eq
+from zlib import crc32
+import re
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.database import Question
+
+Signature = Tuple[int, ...]
+
+# 64-bit Fibonacci hashing constant
+_MIX = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+def normalize_question_text(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace so formatting does not count as a difference"""
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+class MinHasher:
+    """
+    One-permutation MinHash: each character shingle is hashed once and
+    lands in one of ``num_bins`` bins, keeping the bin minimum. Empty bins
+    borrow from the next filled bin (rotation densification), so short
+    questions still get comparable signatures. About 100x cheaper than
+    hashing every shingle ``num_bins`` times.
+    """
+
+    def __init__(self, num_bins: int = 64, shingle_size: int = 5):
+        if num_bins & (num_bins - 1):
+            raise ValueError("num_bins must be a power of two")
+        self.num_bins = num_bins
+        self.shingle_size = shingle_size
+        self._bin_bits = num_bins.bit_length() - 1
+        self._empty = 1 << 64
+
+    def shingles(self, text: str) -> set:
+        normalized = normalize_question_text(text)
+        size = self.shingle_size
+        if len(normalized) <= size:
+            return {normalized} if normalized else set()
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    def signature(self, text: str) -> Optional[Signature]:
+        """MinHash signature of ``text``, or None if it has no content"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+
+        # crc32 is ~7x cheaper than a cryptographic hash here; the multiply spreads
+        # its bits so the top bits pick the bin and the rest are the value
+        value_bits = 64 - self._bin_bits
+        value_mask = (1 << value_bits) - 1
+        bins = [self._empty] * self.num_bins
+        for h in [(crc32(shingle.encode("utf-8")) * _MIX) & _MASK64 for shingle in shingles]:
+            b = h >> value_bits
+            value = h & value_mask
+            if value < bins[b]:
+                bins[b] = value
+
+        # Rotation densification: an empty bin takes the next filled bin's value,
+        # offset by the distance so borrowed values stay distinguishable
+        if self._empty in bins:
+            filled = [i for i, value in enumerate(bins) if value != self._empty]
+            for i in range(self.num_bins):
+                if bins[i] == self._empty:
+                    j = next((f for f in filled if f > i), filled[0])
+                    distance = (j - i) % self.num_bins
+                    bins[i] = bins[j] + (distance << value_bits)
+        return tuple(bins)
+
+def estimate_similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the two questions' shingle sets"""
+    return sum(map(eq, a, b)) / len(a)
+
+def pack_signature(signature: Signature) -> bytes:
+    """Compact 8 bytes/bin encoding for storing or shipping signatures"""
+    return b"".join(value.to_bytes(8, "little") for value in signature)
+
+def unpack_signature(data: bytes) -> Signature:
+    return tuple(int.from_bytes(data[i:i + 8], "little") for i in range(0, len(data), 8))
+
+class QuestionSimilarityIndex:
+    """
+    Near-duplicate lookup over one learning objective's questions.
+    Signatures are split into LSH bands; only questions sharing a band are
+    compared, so a lookup costs ``bands`` dict probes plus a few signature
+    comparisons regardless of bank size.
+    """
+
+    def __init__(self, hasher: MinHasher, bands: int = 16, threshold: float = 0.7):
+        if hasher.num_bins % bands:
+            raise ValueError("bands must divide num_bins")
+        self.hasher = hasher
+        self.bands = bands
+        self.rows = hasher.num_bins // bands
+        self.threshold = threshold
+        self._signatures: Dict[str, Signature] = {}
+        self._texts: Dict[str, str] = {}
+        self._buckets: List[Dict[Signature, List[str]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: Signature) -> Iterable[Tuple[int, Signature]]:
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows]
+
+    def find_duplicate(self, signature: Optional[Signature]) -> Optional[Tuple[str, float]]:
+        """(question_id, similarity) of the closest indexed question above the threshold"""
+        if signature is None:
+            return None
+        hits = Counter()
+        for band, key in self._band_keys(signature):
+            hits.update(self._buckets[band].get(key, ()))
+
+        # A true near-duplicate (similarity >= 0.7) shares two or more of 16 bands
+        # over 90% of the time; a single shared band is usually a common phrase
+        min_hits = 2 if self.bands >= 8 else 1
+        best = None
+        for question_id, count in hits.items():
+            if count < min_hits:
+                continue
+            score = estimate_similarity(signature, self._signatures[question_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (question_id, score)
+        return best
+
+    def add(self, question_id: str, text: str, signature: Optional[Signature] = None):
+        signature = signature or self.hasher.signature(text)
+        if signature is None or question_id in self._signatures:
+            return
+        self._signatures[question_id] = signature
+        self._texts[question_id] = text
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(question_id)
+
+    def add_if_new(self, question_id: str, text: str) -> bool:
+        """Index the question unless it near-duplicates one already indexed"""
+        signature = self.hasher.signature(text)
+        if signature is None or self.find_duplicate(signature):
+            return False
+        self.add(question_id, text, signature)
+        return True
+
+    def signatures(self) -> Dict[str, Signature]:
+        return dict(self._signatures)
+
+    def texts(self, limit: Optional[int] = None) -> List[str]:
+        """Indexed question texts (already deduplicated), oldest first"""
+        texts = list(self._texts.values())
+        return texts if limit is None else texts[-limit:]
+
+class DedupService:
+    """Per-learning-objective similarity indexes, built lazily and kept in an LRU"""
+
+    def __init__(self, max_indexes: int = 1000):
+        self.hasher = MinHasher(settings.question_minhash_bins)
+        self._indexes: "OrderedDict[str, QuestionSimilarityIndex]" = OrderedDict()
+        self._max_indexes = max_indexes
+        self._lock = threading.Lock()
+
+    def new_index(self) -> QuestionSimilarityIndex:
+        return QuestionSimilarityIndex(self.hasher, settings.question_minhash_bands, settings.question_dup_threshold)
+
+    def build_index(self, questions: Iterable[Tuple[str, str]]) -> QuestionSimilarityIndex:
+        """Index (id, text) pairs, keeping the first of any near-duplicates"""
+        index = self.new_index()
+        for question_id, text in questions:
+            index.add_if_new(question_id, text)
+        return index
+
+    def _indexes_for(self, db: Session, lo_ids: List[str]) -> Dict[str, QuestionSimilarityIndex]:
+        with self._lock:
+            found = {}
+            for lo_id in lo_ids:
+                if lo_id in self._indexes:
+                    self._indexes.move_to_end(lo_id)
+                    found[lo_id] = self._indexes[lo_id]
+            missing = [lo_id for lo_id in lo_ids if lo_id not in found]
+
+        if missing:
+            # One query for every uncached objective, texts only
+            grouped: Dict[str, List[Tuple[str, str]]] = {lo_id: [] for lo_id in missing}
+            rows = db.query(Question.learning_objective_id, Question.id, Question.question_text).filter(
+                Question.learning_objective_id.in_(missing)
+            ).order_by(Question.created_at, Question.id)
+            for lo_id, question_id, text in rows:
+                grouped[lo_id].append((question_id, text))
+
+            with self._lock:
+                for lo_id, questions in grouped.items():
+                    # Another request may have built it meanwhile; keep whichever got there first
+                    index = self._indexes.get(lo_id) or self.build_index(questions)
+                    self._indexes[lo_id] = index
+                    found[lo_id] = index
+                while len(self._indexes) > self._max_indexes:
+                    self._indexes.popitem(last=False)
+        return found
+
+    def index_for(self, db: Session, lo_id: str) -> QuestionSimilarityIndex:
+        return self._indexes_for(db, [lo_id])[lo_id]
+
+    def filter_new_questions(self, db: Session, question_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop rows that near-duplicate a stored question of the same objective,
+        or an earlier row in the batch. Accepted rows are added to the index.
+        """
+        if not question_rows:
+            return []
+        indexes = self._indexes_for(db, list({row["learning_objective_id"] for row in question_rows}))
+
+        accepted = []
+        with self._lock:
+            for row in question_rows:
+                if indexes[row["learning_objective_id"]].add_if_new(row["id"], row["question_text"]):
+                    accepted.append(row)
+        
+        # The indexes now hold uncommitted questions; rebuild them if the transaction rolls back
+        touched = list(indexes)
+        event.listen(db, "after_soft_rollback", lambda session, previous: self.forget(*touched), once=True)
+        return accepted
+
+    def forget(self, *lo_ids: str):
+        """Drop cached indexes, e.g. after questions were deleted"""
+        with self._lock:
+            for lo_id in lo_ids:
+                self._indexes.pop(lo_id, None)
+
+# Global dedup service instance
+dedup_service = DedupService()
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import session_scope
+from ..core.metrics import timed_job, PROCESSING_JOB_FAILURES
+from ..models.database import User, PDF, LearningObjective, Question
+from .email_service import build_due_digest_email, enqueue_emails
+
+class DigestService:
+    """Daily "cards due" reminder emails for every user, computed in bulk"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def due_counts(
+        self,
+        db: Session,
+        now: datetime,
+        after_user_id: str = "",
+        limit: int = 1000
+    ) -> List[Tuple[str, str, Optional[str], int]]:
+        """
+        Due-card counts for the next ``limit`` users after ``after_user_id``,
+        as (user_id, email, name, due_count), in one grouped query. Walking
+        users.id in keyset order keeps memory bounded however many users exist.
+        Uses the same due rule as ``fsrs_service.get_due_questions``.
+        """
+        due_count = func.count(Question.id)
+        return db.query(User.id, User.email, User.name, due_count).join(
+            PDF, PDF.user_id == User.id
+        ).join(
+            LearningObjective, LearningObjective.pdf_id == PDF.id
+        ).join(
+            Question, Question.learning_objective_id == LearningObjective.id
+        ).filter(
+            User.id > after_user_id,
+            User.email.isnot(None),
+            or_(Question.next_review.is_(None), Question.next_review <= now)
+        ).group_by(User.id, User.email, User.name).order_by(User.id).limit(limit).all()
+
+    def run_digest(self, now: Optional[datetime] = None, chunk_size: Optional[int] = None) -> int:
+        """Queue one digest per user with cards due; returns the number queued"""
+        now = now or datetime.utcnow()
+        chunk_size = chunk_size or settings.digest_chunk_size
+        day = now.date().isoformat()
+
+        queued = 0
+        after_user_id = ""
+        while True:
+            # Each chunk commits on its own; the dedup key makes a rerun on the same day a no-op
+            with session_scope() as db:
+                counts = self.due_counts(db, now, after_user_id, chunk_size)
+                if not counts:
+                    break
+
+                messages = []
+                for user_id, email, name, due_count in counts:
+                    subject, html = build_due_digest_email(name, due_count)
+                    messages.append({
+                        "recipient": email,
+                        "subject": subject,
+                        "html": html,
+                        "dedup_key": f"due-digest:{user_id}:{day}"
+                    })
+                queued += enqueue_emails(db, messages)
+
+            after_user_id = counts[-1][0]
+            if len(counts) < chunk_size:
+                break
+
+        print(f"Due digest queued {queued} emails")
+        return queued
+
+    @timed_job("due_digest")
+    async def run_digest_job(self):
+        try:
+            return await asyncio.to_thread(self.run_digest)
+        except Exception as e:
+            PROCESSING_JOB_FAILURES.labels(job="due_digest").inc()
+            print(f"Error running due digest: {str(e)}")
+
+    def _seconds_until_next_run(self, now: datetime) -> float:
+        next_run = now.replace(hour=settings.digest_hour_utc, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def run(self):
+        """Run the digest once a day at DIGEST_HOUR_UTC until cancelled"""
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run(datetime.utcnow()))
+            await self.run_digest_job()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+# Global digest service instance
+digest_service = DigestService()
+
+if __name__ == "__main__":
+    # For cron/one-off runs: python -m app.services.digest_service
+    digest_service.run_digest()
@@ -1,144 +1,184 @@
 
-import httpx
 from ..core.config import settings
-from typing import Optional, Dict, Any
+from ..core.http_client import request_with_retry
+from ..models.database import EmailOutbox, OutboxStatus, User
+from .email_templates import render_email
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
+from urllib.parse import quote
+import hashlib
+import uuid
 
-async def send_processing_complete_email(user_id: str, filename: str):
-    """Send email notification when PDF processing is complete"""
+RESEND_EMAILS_URL = "https://api.resend.com/emails"
+RESEND_BATCH_URL = "https://api.resend.com/emails/batch"
+
+def _resend_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {settings.resend_api_key}",
+        "Content-Type": "application/json",
+        # Lets Resend drop duplicates when a retried request had already succeeded
+        "Idempotency-Key": str(uuid.uuid4())
+    }
+
+async def _post_to_resend(payload: Dict[str, Any]):
+    """Send one email through Resend on the shared pooled client"""
+    return await request_with_retry("POST", RESEND_EMAILS_URL, headers=_resend_headers(), json=payload)
+
+async def _post_batch_to_resend(payloads: List[Dict[str, Any]]):
+    """Send up to 100 emails in one Resend batch request"""
+    return await request_with_retry("POST", RESEND_BATCH_URL, headers=_resend_headers(), json=payloads)
+
+def enqueue_email(
+    db: Session,
+    recipient: str,
+    subject: str,
+    html: str,
+    dedup_key: Optional[str] = None
+) -> bool:
+    """
+    Add an email to the outbox in the caller's transaction; the outbox
+    sender delivers it after commit. Identical messages to the same
+    recipient on the same day are enqueued once. Returns False if deduped.
+    """
+    if dedup_key is None:
+        digest = hashlib.sha256(f"{recipient}\n{subject}\n{html}".encode("utf-8")).hexdigest()[:32]
+        dedup_key = f"{datetime.utcnow().date().isoformat()}:{digest}"
+    
+    if db.query(EmailOutbox.id).filter(EmailOutbox.dedup_key == dedup_key).first():
+        return False
+    
+    try:
+        # Savepoint, so losing a dedup race does not roll back the caller's work
+        with db.begin_nested():
+            db.add(EmailOutbox(
+                id=str(uuid.uuid4()),
+                recipient=recipient,
+                subject=subject,
+                html=html,
+                dedup_key=dedup_key
+            ))
+    except IntegrityError:
+        return False
+    return True
+
+def enqueue_emails(db: Session, messages: List[Dict[str, Any]]) -> int:
+    """
+    Bulk version of ``enqueue_email`` for jobs that queue thousands of
+    messages: one lookup for existing dedup keys and one executemany insert.
+    Each message needs recipient, subject, html and dedup_key. Returns the
+    number of rows queued.
+    """
+    if not messages:
+        return 0
     
-    if not settings.resend_api_key:
-        print("RESEND_API_KEY not configured, skipping email notification")
-        return
+    keys = [message["dedup_key"] for message in messages]
+    existing = {key for (key,) in db.query(EmailOutbox.dedup_key).filter(EmailOutbox.dedup_key.in_(keys))}
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "recipient": message["recipient"],
+            "subject": message["subject"],
+            "html": message["html"],
+            "dedup_key": message["dedup_key"],
+            "status": OutboxStatus.PENDING.value,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        }
+        for message in messages
+        if message["dedup_key"] not in existing
+    ]
+    if not rows:
+        return 0
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {settings.resend_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "from": "RecallForge <noreply@recallforge.com>",
-                    "to": ["user@example.com"],  # Replace with actual user email
-                    "subject": f"PDF Processing Complete - {filename}",
-                    "html": f"""
-                    <h2>PDF Processing Complete!</h2>
-                    <p>Your PDF file "<strong>{filename}</strong>" has been successfully processed.</p>
-                    <p>Learning objectives and questions have been generated and are ready for study.</p>
-                    <p>Login to your RecallForge account to start learning!</p>
-                    <br>
-                    <p>Happy Learning!</p>
-                    <p>The RecallForge Team</p>
-                    """
-                }
-            )
-            
-            if response.status_code == 200:
-                print(f"Email notification sent successfully for PDF: {filename}")
-            else:
-                print(f"Failed to send email notification: {response.text}")
-                
-    except Exception as e:
-        print(f"Error sending email notification: {str(e)}")
+        with db.begin_nested():
+            db.execute(insert(EmailOutbox), rows)
+    except IntegrityError:
+        # Another writer queued some of these keys since the lookup; fall back to row by row
+        return sum(
+            enqueue_email(db, row["recipient"], row["subject"], row["html"], row["dedup_key"])
+            for row in rows
+        )
+    return len(rows)
 
-async def send_test_link_email(
-    email: str, 
+def build_processing_complete_email(filename: str) -> Tuple[str, str]:
+    """Subject and HTML for the processing-complete notification"""
+    subject = f"PDF Processing Complete - {filename}"
+    return subject, render_email("processing_complete.html", filename=filename)
+
+def enqueue_processing_complete_email(db: Session, user_id: str, filename: str) -> bool:
+    """Queue the processing-complete notification for a user"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.email:
+        print(f"No email address for user {user_id}, skipping processing notification")
+        return False
+    
+    subject, html = build_processing_complete_email(filename)
+    return enqueue_email(db, user.email, subject, html)
+
+def build_due_digest_email(name: Optional[str], due_count: int) -> Tuple[str, str]:
+    """Subject and HTML for the daily cards-due reminder"""
+    cards = "card" if due_count == 1 else "cards"
+    subject = f"You have {due_count} {cards} due today"
+    html = render_email(
+        "due_digest.html",
+        name=name or "there",
+        due_count=due_count,
+        cards=cards,
+        study_link=f"{settings.frontend_url}/study"
+    )
+    return subject, html
+
+def build_test_link_email(
     pdf_info: Optional[Dict[str, Any]] = None,
     lo_info: Optional[Dict[str, Any]] = None,
     is_demo: bool = False
-):
-    """Send email with test link to access RecallForge without login"""
+) -> Tuple[str, str]:
+    """Subject and HTML for a test link to access RecallForge without login"""
+    base_url = settings.frontend_url
     
-    if not settings.resend_api_key:
-        print("RESEND_API_KEY not configured, skipping test link email")
-        return
+    if is_demo:
+        test_link = f"{base_url}/demo"
+        subject = "Try RecallForge - Demo Access"
+        intro = render_email("test_link_intro_demo.html")
+    elif lo_info:
+        test_link = f"{base_url}/study?lo_id={quote(str(lo_info['id']))}&test_mode=true"
+        subject = f"Test Link - {lo_info['title']}"
+        intro = render_email("test_link_intro_objective.html", lo_title=lo_info["title"])
+    elif pdf_info:
+        test_link = f"{base_url}/pdf/{quote(str(pdf_info['id']))}?test_mode=true"
+        subject = f"Test Link - {pdf_info['filename']}"
+        intro = render_email("test_link_intro_pdf.html", pdf_filename=pdf_info["filename"])
+    else:
+        test_link = f"{base_url}/?test_mode=true"
+        subject = "RecallForge Test Access"
+        intro = render_email("test_link_intro_generic.html")
     
-    try:
-        # Generate the test link
-        base_url = "https://your-frontend-domain.com"  # Update with your actual frontend URL
-        
-        if is_demo:
-            test_link = f"{base_url}/demo"
-            subject = "Try RecallForge - Demo Access"
-            content_title = "Demo Access Ready!"
-            content_body = """
-            <p>You've been granted demo access to RecallForge!</p>
-            <p>Click the link below to explore our AI-powered spaced repetition learning system:</p>
-            """
-        elif lo_info:
-            test_link = f"{base_url}/study?lo_id={lo_info['id']}&test_mode=true"
-            subject = f"Test Link - {lo_info['title']}"
-            content_title = "Your Test Link is Ready!"
-            content_body = f"""
-            <p>You've been invited to test a learning objective: <strong>{lo_info['title']}</strong></p>
-            <p>Click the link below to start the test without needing to create an account:</p>
-            """
-        elif pdf_info:
-            test_link = f"{base_url}/pdf/{pdf_info['id']}?test_mode=true"
-            subject = f"Test Link - {pdf_info['filename']}"
-            content_title = "Your Test Link is Ready!"
-            content_body = f"""
-            <p>You've been invited to test content from: <strong>{pdf_info['filename']}</strong></p>
-            <p>Click the link below to explore the generated learning materials without needing to create an account:</p>
-            """
-        else:
-            test_link = f"{base_url}/?test_mode=true"
-            subject = "RecallForge Test Access"
-            content_title = "Your Test Link is Ready!"
-            content_body = """
-            <p>You've been granted test access to RecallForge!</p>
-            <p>Click the link below to explore our platform without needing to create an account:</p>
-            """
+    html = render_email(
+        "test_link.html",
+        title="Demo Access Ready!" if is_demo else "Your Test Link is Ready!",
+        intro=intro,
+        test_link=test_link,
+        closing=(
+            "Perfect for trying out our demo features!" if is_demo
+            else "You can experience the full learning journey with AI-generated questions."
+        ),
+        base_url=base_url
+    )
+    return subject, html
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {settings.resend_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "from": "RecallForge <noreply@recallforge.com>",
-                    "to": [email],
-                    "subject": subject,
-                    "html": f"""
-                    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
-                        <h2 style="color: #2563eb;">{content_title}</h2>
-                        {content_body}
-                        
-                        <div style="margin: 30px 0;">
-                            <a href="{test_link}" 
-                               style="background-color: #2563eb; color: white; padding: 12px 24px; 
-                                      text-decoration: none; border-radius: 6px; display: inline-block;">
-                                Start Testing Now
-                            </a>
-                        </div>
-                        
-                        <p style="font-size: 14px; color: #666;">
-                            This test link allows you to explore RecallForge without creating an account.
-                            {"Perfect for trying out our demo features!" if is_demo else "You can experience the full learning journey with AI-generated questions."}
-                        </p>
-                        
-                        <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
-                        
-                        <p style="font-size: 12px; color: #888;">
-                            This email was sent by RecallForge. If you didn't request this, you can safely ignore this email.
-                        </p>
-                        
-                        <p style="font-size: 12px; color: #888;">
-                            Want to create your own account? Visit <a href="{base_url}">RecallForge</a>
-                        </p>
-                    </div>
-                    """
-                }
-            )
-            
-            if response.status_code == 200:
-                print(f"Test link email sent successfully to: {email}")
-            else:
-                print(f"Failed to send test link email: {response.text}")
-                
-    except Exception as e:
-        print(f"Error sending test link email: {str(e)}")
-        raise e
+def enqueue_test_link_email(
+    db: Session,
+    email: str,
+    pdf_info: Optional[Dict[str, Any]] = None,
+    lo_info: Optional[Dict[str, Any]] = None,
+    is_demo: bool = False
+) -> bool:
+    """Queue a test link email"""
+    subject, html = build_test_link_email(pdf_info, lo_info, is_demo)
+    return enqueue_email(db, email, subject, html)
@@ -0,0 +1,42 @@
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+from typing import Any
+import re
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+# string.Template placeholder syntax: $name
+_PLACEHOLDER = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+
+class SafeHTML(str):
+    """Already-escaped HTML, inserted into templates as is"""
+
+class EmailTemplate:
+    """
+    An email body split once into literal text and ``$placeholders``.
+    Rendering is a join over the pieces with every value HTML-escaped,
+    so user-controlled strings (filenames, LO titles, names) cannot
+    inject markup. Pass ``SafeHTML`` for trusted fragments.
+    """
+
+    def __init__(self, source: str):
+        parts = _PLACEHOLDER.split(source)
+        self.literals = parts[0::2]
+        self.fields = parts[1::2]
+
+    def render(self, **values: Any) -> SafeHTML:
+        pieces = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            value = values[field]
+            pieces.append(value if isinstance(value, SafeHTML) else escape(str(value)))
+            pieces.append(literal)
+        return SafeHTML("".join(pieces))
+
+@lru_cache(maxsize=None)
+def get_email_template(name: str) -> EmailTemplate:
+    """Load and compile a template from app/templates/email once per process"""
+    return EmailTemplate((TEMPLATE_DIR / name).read_text(encoding="utf-8").rstrip("\n"))
+
+def render_email(template_name: str, **values: Any) -> SafeHTML:
+    return get_email_template(template_name).render(**values)
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import re
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+
+from ..core.database import session_scope
+from ..core.metrics import EXTRACTION_CACHE_LOOKUPS
+from ..models.database import ExtractedPage
+from .storage_service import storage_service
+
+# Bump whenever extract_pages() output changes (PyPDF2 upgrade, cleaning
+# rules); cached pages from other versions are then ignored and replaced
+EXTRACTOR_VERSION = 1
+
+def document_hash(content) -> str:
+    """SHA-256 of a document (bytes or a memory-mapped file)"""
+    return hashlib.sha256(content).hexdigest()
+
+def clean_page_text(text: str) -> str:
+    """Clean and format extracted text"""
+    # Remove excessive whitespace
+    text = re.sub(r'\s+', ' ', text)
+
+    # Fix common PDF extraction issues
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add space between camelCase
+    text = re.sub(r'([.!?])\s*([A-Z])', r'\1\n\n\2', text)  # New paragraph after sentences
+
+    # Remove page numbers and headers/footers (basic heuristic)
+    lines = text.split('\n')
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+        # Skip likely page numbers, headers, footers
+        if len(line) < 3 or line.isdigit() or re.match(r'^Page \d+', line):
+            continue
+        cleaned_lines.append(line)
+
+    return '\n'.join(cleaned_lines)
+
+def extract_pages(content) -> List[str]:
+    """Cleaned text of every page, in order; blank pages are empty strings"""
+    import PyPDF2
+
+    # Seekable buffers (mmap) are parsed in place, without a copy
+    stream = content if hasattr(content, "seek") else BytesIO(content)
+    pages = []
+    for page in PyPDF2.PdfReader(stream).pages:
+        page_text = page.extract_text()
+        pages.append(clean_page_text(page_text) if page_text.strip() else "")
+    return pages
+
+def format_pages(pages: List[str]) -> str:
+    """Pages as the "## Page N" text the LO parsers and chunkers consume"""
+    return '\n'.join(
+        f"## Page {page_num}\n\n{page_text}\n"
+        for page_num, page_text in enumerate(pages, 1)
+        if page_text
+    )
+
+class ExtractionService:
+    """
+    PDF text extraction with a persisted per-page cache. Pages are stored
+    by document hash and EXTRACTOR_VERSION, so reprocessing, chunking
+    experiments and objective regeneration read cleaned text from the
+    database instead of parsing the PDF again.
+    """
+
+    def load(self, doc_hash: str) -> Optional[List[str]]:
+        """Cached pages of a document, or None when it has not been extracted"""
+        with session_scope() as db:
+            rows = db.query(ExtractedPage.page_number, ExtractedPage.text).filter(
+                ExtractedPage.document_hash == doc_hash,
+                ExtractedPage.extractor_version == EXTRACTOR_VERSION
+            ).order_by(ExtractedPage.page_number).all()
+        if not rows:
+            return None
+        return [row.text for row in rows]
+
+    def store(self, doc_hash: str, pages: List[str]):
+        """Persist a document's pages, dropping any left by other extractor versions"""
+        rows = [
+            {
+                "document_hash": doc_hash,
+                "extractor_version": EXTRACTOR_VERSION,
+                "page_number": page_num,
+                "text": page_text
+            }
+            for page_num, page_text in enumerate(pages, 1)
+        ]
+        try:
+            with session_scope() as db:
+                db.execute(delete(ExtractedPage).where(ExtractedPage.document_hash == doc_hash))
+                if rows:
+                    db.execute(insert(ExtractedPage.__table__), rows)
+        except IntegrityError:
+            # Another worker extracted the same document first
+            pass
+
+    async def pages_from_content(self, content, doc_hash: Optional[str] = None) -> Tuple[str, List[str]]:
+        """(hash, pages) of an in-memory or mapped document, parsing only on a cache miss"""
+        doc_hash = doc_hash or await asyncio.to_thread(document_hash, content)
+        pages = await asyncio.to_thread(self.load, doc_hash)
+        if pages is not None:
+            EXTRACTION_CACHE_LOOKUPS.labels(result="hit").inc()
+            return doc_hash, pages
+
+        EXTRACTION_CACHE_LOOKUPS.labels(result="miss").inc()
+        pages = await asyncio.to_thread(extract_pages, content)
+        await asyncio.to_thread(self.store, doc_hash, pages)
+        return doc_hash, pages
+
+    async def pages_from_storage(self, file_path: str, doc_hash: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        (hash, pages) of a stored document. With a known hash a cached
+        document is not read from storage at all
+        """
+        if doc_hash:
+            pages = await asyncio.to_thread(self.load, doc_hash)
+            if pages is not None:
+                EXTRACTION_CACHE_LOOKUPS.labels(result="hit").inc()
+                return doc_hash, pages
+
+        async with storage_service.mapped(file_path) as content:
+            return await self.pages_from_content(content)
+
+# Global extraction service instance
+extraction_service = ExtractionService()
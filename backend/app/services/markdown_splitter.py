@@ -0,0 +1,178 @@
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from .objective_table import page_bounds, parse_objective_table
+
+MARKDOWN_EXTENSIONS = (".md", ".markdown")
+
+# The objectives table sits at the top of documents in the documented format
+TABLE_SCAN_BYTES = 64 * 1024
+
+_ATX = re.compile(rb"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*\r?\n?$")
+_SETEXT = re.compile(rb"^ {0,3}(=+|-+)[ \t]*\r?\n?$")
+_FENCE = re.compile(rb"^ {0,3}(`{3,}|~{3,})")
+# Headings like "Chapter 2: useState and useEffect Patterns (Pages 6-12)"
+_PAGES = re.compile(r"\((?:pages?|pp?\.|halaman|hal\.)\s*([^)]*)\)", re.IGNORECASE)
+_OBJECTIVES_TITLE = re.compile(r"learning objectives?|tujuan pembelajaran", re.IGNORECASE)
+_WORD = re.compile(r"\w{3,}", re.UNICODE)
+
+def is_markdown(filename: str) -> bool:
+    return filename.lower().endswith(MARKDOWN_EXTENSIONS)
+
+@dataclass
+class Section:
+    """A heading and everything under it, as byte offsets into the file"""
+    level: int
+    title: str
+    start: int
+    end: int
+    parent: Optional[int] = None
+    page_range: Optional[str] = None
+
+def split_sections(lines: Iterable[bytes]) -> List[Section]:
+    """
+    Heading tree of a Markdown file in one pass over its lines. Only
+    headings and offsets are kept, never section text, so memory grows with
+    the number of headings rather than the size of the file. Headings
+    inside fenced code blocks are ignored; ATX and setext headings count.
+    """
+    sections: List[Section] = []
+    open_sections: List[int] = []
+    offset = 0
+    fence = None
+    previous = None  # (offset, line) of the last paragraph line, for setext headings
+
+    def start_section(level: int, raw_title: bytes, start: int):
+        while open_sections and sections[open_sections[-1]].level >= level:
+            sections[open_sections.pop()].end = start
+        title = " ".join(raw_title.decode("utf-8", "replace").split())
+        pages = _PAGES.search(title)
+        sections.append(Section(
+            level=level,
+            title=title,
+            start=start,
+            end=start,
+            parent=open_sections[-1] if open_sections else None,
+            page_range=re.sub(r"\s+", "", pages.group(1)) if pages else None
+        ))
+        open_sections.append(len(sections) - 1)
+
+    for line in lines:
+        fence_match = _FENCE.match(line)
+        if fence is not None:
+            if fence_match and fence_match.group(1)[:1] == fence[:1] and len(fence_match.group(1)) >= len(fence):
+                fence = None
+        elif fence_match:
+            fence = fence_match.group(1)
+            previous = None
+        else:
+            atx = _ATX.match(line)
+            setext = _SETEXT.match(line) if previous is not None else None
+            if atx:
+                start_section(len(atx.group(1)), atx.group(2) or b"", offset)
+                previous = None
+            elif setext and not previous[1].lstrip().startswith((b"|", b"-", b"*", b"+", b">")):
+                start_section(1 if setext.group(1)[:1] == b"=" else 2, previous[1], previous[0])
+                previous = None
+            else:
+                previous = (offset, line) if line.strip() else None
+        offset += len(line)
+
+    for index in open_sections:
+        sections[index].end = offset
+    return sections
+
+def read_section(f: BinaryIO, section: Section) -> str:
+    f.seek(section.start)
+    return f.read(section.end - section.start).decode("utf-8", "replace")
+
+def _words(text: str) -> set:
+    return {word.lower() for word in _WORD.findall(text)}
+
+def _main_level(sections: List[Section]) -> Optional[int]:
+    """Shallowest heading level that splits the document into several sections"""
+    levels = sorted({section.level for section in sections})
+    for level in levels:
+        if sum(1 for section in sections if section.level == level) > 1:
+            return level
+    return levels[0] if levels else None
+
+def _table_objectives(f: BinaryIO, sections: List[Section]) -> Optional[List[Dict[str, Any]]]:
+    """Objectives from the documented table, under an objectives heading or at the top of the file"""
+    candidates = [section for section in sections if _OBJECTIVES_TITLE.search(section.title)]
+    for section in candidates:
+        f.seek(section.start)
+        objectives = parse_objective_table(f.read(min(section.end - section.start, TABLE_SCAN_BYTES)).decode("utf-8", "replace"))
+        if objectives:
+            return objectives
+    f.seek(0)
+    return parse_objective_table(f.read(TABLE_SCAN_BYTES).decode("utf-8", "replace"))
+
+def _overlaps(a: List[Tuple[int, Optional[int]]], b: List[Tuple[int, Optional[int]]]) -> bool:
+    """Whether two page_bounds lists share a page; open-ended ranges run to the end"""
+    return any(
+        first_a <= (last_b if last_b is not None else first_a)
+        and first_b <= (last_a if last_a is not None else first_b)
+        for first_a, last_a in a
+        for first_b, last_b in b
+    )
+
+def _matching_sections(objective: Dict[str, Any], units: List[Section]) -> List[Section]:
+    """Sections annotated with overlapping pages, else the best title match"""
+    bounds = page_bounds(objective.get("page_range"))
+    if bounds:
+        matched = [
+            section for section in units
+            if section.page_range and _overlaps(bounds, page_bounds(section.page_range) or [])
+        ]
+        if matched:
+            return matched
+
+    wanted = _words(objective["title"])
+    scored = [(len(wanted & _words(section.title)), -i, section) for i, section in enumerate(units)]
+    best = max(scored, default=None, key=lambda item: item[:2])
+    return [best[2]] if best and best[0] > 0 else []
+
+def markdown_objectives(f: BinaryIO) -> Optional[List[Dict[str, Any]]]:
+    """
+    Learning objectives of a Markdown document with their material, in a
+    single pass over the file plus one ranged read per objective. Uses the
+    documented objectives table when present, mapping each objective to the
+    sections whose "(Pages a-b)" headings overlap its page range (or whose
+    title matches best); otherwise each main section becomes an objective.
+    None when the document has no headings.
+    """
+    f.seek(0)
+    sections = split_sections(f)
+    if not sections:
+        return None
+
+    level = _main_level(sections)
+    units = [
+        section for section in sections
+        if section.level == level and not _OBJECTIVES_TITLE.search(section.title)
+    ]
+    # Annotated sections may sit below the main level (e.g. chapters under a course title)
+    annotated = [section for section in sections if section.page_range]
+
+    objectives = _table_objectives(f, sections)
+    if objectives:
+        for objective in objectives:
+            matched = _matching_sections(objective, annotated or units)
+            objective["content_text"] = "\n".join(read_section(f, section) for section in matched)
+        return objectives
+
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "title": _PAGES.sub("", section.title).strip() or f"Section {i}",
+            "description": _PAGES.sub("", section.title).strip(),
+            "priority": "Medium",
+            "page_range": section.page_range or "",
+            "tags": [],
+            "content_text": read_section(f, section),
+        }
+        for i, section in enumerate(units, 1)
+    ] or None
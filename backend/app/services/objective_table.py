@@ -0,0 +1,128 @@
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# The table prescribed by docs/PDF_FORMAT_EXAMPLE.md:
+#   | ID | Learning Objective | Priority | Page Range | Tags |
+# Extracted PDF text loses the line breaks (and usually the pipes) of the
+# table, so cells are separated by "|" and/or any whitespace
+_SEP = r"\s*\|?\s*"
+_HEADER = re.compile(
+    r"\bID" + _SEP + r"Learning\s+Objectives?" + _SEP + r"Priority" + _SEP + r"Page\s+Range" + _SEP + r"Tags\b",
+    re.IGNORECASE
+)
+_ID = r"\bLO[-_ ]?\d+\b"
+_RANGE = r"\d+(?:\s*[-–—]\s*(?:\d+|end))?"
+_ROW = re.compile(
+    r"(?P<id>" + _ID + r")" + _SEP
+    + r"(?P<title>(?:(?!" + _ID + r")[^|])+?)" + _SEP
+    + r"\b(?P<priority>high|medium|low|tinggi|sedang|rendah)\b" + _SEP
+    + r"(?P<pages>" + _RANGE + r"(?:\s*,\s*" + _RANGE + r")*)\b" + _SEP
+    + r"(?P<tags>[\w#+.-]+(?:[ \t]*,[ \t]*[\w#+.-]+)*)?[ \t]*\|?",
+    re.IGNORECASE
+)
+# Between rows of one table: whitespace, pipes and the |----| separator only
+_BETWEEN_ROWS = re.compile(r"[\s|:-]*")
+
+_PRIORITIES = {
+    "high": "High", "tinggi": "High",
+    "medium": "Medium", "sedang": "Medium",
+    "low": "Low", "rendah": "Low",
+}
+
+_PAGE_HEADING = re.compile(r"^## Page (\d+)[ \t]*$", re.MULTILINE)
+_RANGE_PART = re.compile(r"^(\d+)\s*(?:[-–—]|to|sampai|s/d)?\s*(\d+|end)?$", re.IGNORECASE)
+
+def page_bounds(value: Optional[str]) -> Optional[List[Tuple[int, Optional[int]]]]:
+    """
+    (first, last) page pairs of a page_range such as "3", "6-12", "1-end" or
+    "2, 5-7", with last None for open-ended ("end") ranges; None when the
+    value is not a page list (free text from the LLM)
+    """
+    bounds = []
+    for part in re.sub(r"(?i)\b(?:pages?|pp?\.|halaman|hal\.)\s*", "", value or "").split(","):
+        match = _RANGE_PART.match(part.strip())
+        if not match:
+            return None
+        first = int(match.group(1))
+        last = match.group(2)
+        bounds.append((first, None if last and last.lower() == "end" else int(last or first)))
+    return bounds or None
+
+def parse_page_range(value: Optional[str], page_count: int) -> Optional[Set[int]]:
+    """Pages named by a page_range (see page_bounds), up to page_count"""
+    bounds = page_bounds(value)
+    if bounds is None:
+        return None
+    pages = set()
+    for first, last in bounds:
+        pages.update(range(first, min(page_count if last is None else last, page_count) + 1))
+    return pages or None
+
+def split_pages(text: str) -> Dict[int, str]:
+    """Page number -> text for documents in the "## Page N" extraction format"""
+    headings = list(_PAGE_HEADING.finditer(text))
+    return {
+        int(heading.group(1)): text[heading.start():headings[i + 1].start() if i + 1 < len(headings) else len(text)]
+        for i, heading in enumerate(headings)
+    }
+
+def find_objective_table(text: str):
+    """(rows, start, end) of the first Learning Objectives table, or None"""
+    header = _HEADER.search(text)
+    if not header:
+        return None
+
+    rows = []
+    position = header.end()
+    for row in _ROW.finditer(text, position):
+        if not _BETWEEN_ROWS.fullmatch(text, position, row.start()):
+            break
+        rows.append(row)
+        position = row.end()
+    if not rows:
+        return None
+    # Another LO id right after the last row means a row we could not parse;
+    # a prefix of the table would silently drop the remaining objectives
+    rest = _BETWEEN_ROWS.match(text, position).end()
+    if re.match(_ID, text[rest:rest + 16], re.IGNORECASE):
+        return None
+    return rows, header.start(), position
+
+def parse_objective_table(text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Learning objectives from the documented table, with each objective's
+    page range as its material; None when the document has no such table.
+    No LLM involved.
+    """
+    found = find_objective_table(text)
+    if not found:
+        return None
+    rows, start, end = found
+
+    # The table itself is not study material
+    body = text[:start] + text[end:]
+    pages = split_pages(body)
+    page_count = max(pages) if pages else 0
+
+    objectives = []
+    for row in rows:
+        title = " ".join(row.group("title").split())
+        page_range = ", ".join(re.sub(r"\s+", "", part) for part in row.group("pages").split(","))
+        selected = parse_page_range(page_range, page_count) if pages else None
+        if selected:
+            content_text = "\n".join(pages[page] for page in sorted(selected) if page in pages)
+        else:
+            # Without page markers (Markdown, plain text) every objective sees the whole body
+            content_text = body.strip()
+        objectives.append({
+            "id": str(uuid.uuid4()),
+            "source_id": row.group("id").upper().replace("_", "-").replace(" ", "-"),
+            "title": title,
+            "description": title,
+            "priority": _PRIORITIES[row.group("priority").lower()],
+            "page_range": page_range,
+            "tags": [tag.strip() for tag in (row.group("tags") or "").split(",") if tag.strip()],
+            "content_text": content_text,
+        })
+    return objectives
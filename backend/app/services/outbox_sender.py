@@ -0,0 +1,161 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from ..core.config import settings
+from ..core.database import session_scope
+from ..core.metrics import OUTBOX_EMAILS, OUTBOX_BATCH_SIZE
+from ..models.database import EmailOutbox, OutboxStatus
+from .email_service import _post_to_resend, _post_batch_to_resend
+
+# Resend accepts at most 100 emails per batch request
+RESEND_BATCH_LIMIT = 100
+# Retry schedule for undelivered rows: 30s, 1m, 2m, ... capped at 1h
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+class OutboxSender:
+    """Drains the email outbox through the Resend batch API"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def _claim(self, batch_size: int) -> List[Dict[str, Any]]:
+        """Lock due rows and mark them as sending so other senders skip them"""
+        now = datetime.utcnow()
+        with session_scope() as db:
+            # A sender that died mid-batch leaves rows in "sending"; they are reclaimed once the claim expires
+            rows = db.query(EmailOutbox).filter(
+                EmailOutbox.status.in_([OutboxStatus.PENDING.value, OutboxStatus.SENDING.value]),
+                EmailOutbox.next_attempt_at <= now
+            ).order_by(EmailOutbox.next_attempt_at).limit(batch_size).with_for_update(skip_locked=True).all()
+
+            claim_expires = now + timedelta(seconds=settings.outbox_claim_seconds)
+            claimed = []
+            for row in rows:
+                row.status = OutboxStatus.SENDING.value
+                row.attempts += 1
+                row.next_attempt_at = claim_expires
+                claimed.append({
+                    "id": row.id,
+                    "recipient": row.recipient,
+                    "subject": row.subject,
+                    "html": row.html,
+                    "attempts": row.attempts
+                })
+            return claimed
+
+    def _mark_sent(self, ids: List[str]):
+        if not ids:
+            return
+        with session_scope() as db:
+            db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids)).update({
+                EmailOutbox.status: OutboxStatus.SENT.value,
+                EmailOutbox.sent_at: datetime.utcnow(),
+                EmailOutbox.last_error: None
+            }, synchronize_session=False)
+        OUTBOX_EMAILS.labels(outcome="sent").inc(len(ids))
+
+    def _mark_failed(self, emails: List[Dict[str, Any]], error: str, permanent: bool = False):
+        """Reschedule with exponential backoff, or give up after the max attempts"""
+        if not emails:
+            return
+        now = datetime.utcnow()
+        with session_scope() as db:
+            for email in emails:
+                row = db.query(EmailOutbox).filter(EmailOutbox.id == email["id"]).first()
+                if not row:
+                    continue
+                row.last_error = error[:2000]
+                if permanent or row.attempts >= settings.outbox_max_attempts:
+                    row.status = OutboxStatus.FAILED.value
+                    OUTBOX_EMAILS.labels(outcome="failed").inc()
+                else:
+                    delay = min(RETRY_BASE_SECONDS * 2 ** (row.attempts - 1), RETRY_MAX_SECONDS)
+                    row.status = OutboxStatus.PENDING.value
+                    row.next_attempt_at = now + timedelta(seconds=delay)
+                    OUTBOX_EMAILS.labels(outcome="retried").inc()
+
+    def _payload(self, email: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "from": settings.email_from,
+            "to": [email["recipient"]],
+            "subject": email["subject"],
+            "html": email["html"]
+        }
+
+    async def _send_individually(self, emails: List[Dict[str, Any]]):
+        """Fallback when Resend rejects a batch, so one bad address cannot block the rest"""
+        sent = []
+        for email in emails:
+            try:
+                response = await _post_to_resend(self._payload(email))
+            except Exception as e:
+                await asyncio.to_thread(self._mark_failed, [email], str(e))
+                continue
+
+            if response.status_code == 200:
+                sent.append(email["id"])
+            else:
+                # Other 4xx responses mean the message itself is invalid; retrying will not help
+                permanent = 400 <= response.status_code < 500 and response.status_code != 429
+                await asyncio.to_thread(self._mark_failed, [email], f"{response.status_code}: {response.text}", permanent)
+        await asyncio.to_thread(self._mark_sent, sent)
+
+    async def _send_batch(self, emails: List[Dict[str, Any]]):
+        try:
+            response = await _post_batch_to_resend([self._payload(email) for email in emails])
+        except Exception as e:
+            print(f"Error sending outbox batch: {str(e)}")
+            await asyncio.to_thread(self._mark_failed, emails, str(e))
+            return
+
+        if response.status_code == 200:
+            await asyncio.to_thread(self._mark_sent, [email["id"] for email in emails])
+        elif response.status_code in (400, 422):
+            await self._send_individually(emails)
+        else:
+            print(f"Failed to send outbox batch: {response.status_code} {response.text}")
+            await asyncio.to_thread(self._mark_failed, emails, f"{response.status_code}: {response.text}")
+
+    async def drain_once(self, batch_size: Optional[int] = None) -> int:
+        """Claim and send one batch of due emails; returns how many were claimed"""
+        batch_size = min(batch_size or settings.outbox_batch_size, RESEND_BATCH_LIMIT)
+        emails = await asyncio.to_thread(self._claim, batch_size)
+        if not emails:
+            return 0
+
+        OUTBOX_BATCH_SIZE.observe(len(emails))
+        await self._send_batch(emails)
+        return len(emails)
+
+    async def run(self):
+        """Poll the outbox until cancelled; full batches are drained back to back"""
+        while True:
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error draining email outbox: {str(e)}")
+                claimed = 0
+
+            if claimed < settings.outbox_batch_size:
+                await asyncio.sleep(settings.outbox_poll_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+# Global outbox sender instance
+outbox_sender = OutboxSender()
@@ -0,0 +1,74 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional
+import uuid
+
+from ..models.database import LearningObjective, Question
+from .dedup_service import dedup_service
+
+# Gemini returns options as separate fields, the table stores them as a list
+OPTION_KEYS = ["option_a", "option_b", "option_c", "option_d"]
+
+class PersistenceService:
+    """Batched persistence for generated learning objectives and questions"""
+
+    def learning_objective_row(
+        self,
+        lo_id: str,
+        pdf_id: str,
+        lo_data: Dict[str, Any],
+        content_chunk: str
+    ) -> Dict[str, Any]:
+        """Build a learning_objectives row from parsed objective data"""
+        return {
+            "id": lo_id,
+            "pdf_id": pdf_id,
+            "title": lo_data["title"],
+            "priority": lo_data.get("priority", "Medium"),
+            "page_range": lo_data.get("page_range", ""),
+            "tags": lo_data.get("tags", []),
+            "content_chunk": content_chunk,
+            "mastery_percent": 0.0
+        }
+
+    def question_row(self, lo_id: str, q_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a questions row from generated question data"""
+        return {
+            "id": q_data.get("id") or str(uuid.uuid4()),
+            "learning_objective_id": lo_id,
+            "question_text": q_data["question_text"],
+            "options": q_data.get("options") or [q_data[key] for key in OPTION_KEYS],
+            "correct_answer": q_data["correct_answer"],
+            "explanation": q_data["explanation"],
+            "difficulty": q_data.get("difficulty", "medium"),
+            "stability": 1.0,
+            "difficulty_rating": 5.0,
+            "review_count": 0
+        }
+
+    def save_generated_content(
+        self,
+        db: Session,
+        objective_rows: List[Dict[str, Any]],
+        question_rows: Optional[List[Dict[str, Any]]] = None
+    ) -> int:
+        """
+        Insert objectives and questions with one executemany per table.
+        The caller owns the transaction (see ``session_scope``).
+        Returns the number of rows written.
+        """
+        question_rows = question_rows or []
+
+        # Near-duplicates of stored questions (or of each other) are dropped here
+        question_rows = dedup_service.filter_new_questions(db, question_rows)
+        
+        # Objectives first so question foreign keys resolve
+        if objective_rows:
+            db.execute(insert(LearningObjective.__table__), objective_rows)
+        if question_rows:
+            db.execute(insert(Question.__table__), question_rows)
+
+        return len(objective_rows) + len(question_rows)
+
+# Global persistence service instance
+persistence_service = PersistenceService()
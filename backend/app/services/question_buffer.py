@@ -0,0 +1,164 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import undefer
+
+from ..core.config import settings
+from ..core.database import session_scope
+from ..core.metrics import QUESTION_BUFFER_REFILLS, QUESTION_BUFFER_QUEUE, timed_job
+from ..core.rate_limit import MemoryRateLimitStore, RateLimitRule, rate_limiter
+from ..models.database import LearningObjective, Question
+from .ai_service import ai_service
+from .persistence_service import persistence_service
+
+class QuestionBufferService:
+    """
+    Keeps a buffer of unseen questions per learning objective. Reviews signal
+    demand; when an objective's unseen count drops below the low watermark a
+    background worker generates the next batch, so new questions are already
+    there when the user reaches the end of the current ones. All refills share
+    one concurrency limit and an hourly generation budget.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending = set()
+        self._last_checked: Dict[str, float] = {}
+        self._workers: List[asyncio.Task] = []
+        # Generation budget, as a token bucket shared by every objective. With
+        # RATE_LIMIT_BACKEND=redis it lives in the rate limiter's Redis store and
+        # is shared across API workers; otherwise it is per process, in its own
+        # store so LRU eviction of client buckets cannot reset it
+        self._budget_store = MemoryRateLimitStore(max_keys=1)
+        self._budget_rule = RateLimitRule(settings.question_buffer_hourly_budget, 3600)
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def note_demand(self, lo_id: str):
+        """A question of this objective was seen for the first time; never blocks the caller"""
+        now = time.monotonic()
+        # Each review would otherwise re-count the same objective
+        if now - self._last_checked.get(lo_id, 0.0) < settings.question_buffer_check_seconds:
+            return
+        if len(self._last_checked) > 10000:
+            self._last_checked.clear()
+        self._last_checked[lo_id] = now
+        self.request_refill(lo_id, force=False)
+
+    def request_refill(self, lo_id: str, force: bool = True) -> bool:
+        """Queue a refill check; ``force`` generates even above the low watermark"""
+        if lo_id in self._pending:
+            return False
+        self._pending.add(lo_id)
+        self.queue.put_nowait((lo_id, force))
+        QUESTION_BUFFER_QUEUE.set(self.queue.qsize())
+        return True
+
+    def is_refilling(self, lo_id: str) -> bool:
+        return lo_id in self._pending
+
+    def _load(self, lo_id: str) -> Optional[Dict[str, Any]]:
+        """Objective, existing question texts and unseen count in one session"""
+        with session_scope() as db:
+            lo = db.query(LearningObjective).filter(LearningObjective.id == lo_id).options(
+                undefer(LearningObjective.content_chunk)
+            ).first()
+            if not lo:
+                return None
+            unseen = db.query(func.count(Question.id)).filter(
+                Question.learning_objective_id == lo_id,
+                or_(Question.review_count == 0, Question.review_count.is_(None))
+            ).scalar()
+            texts = [text for (text,) in db.query(Question.question_text).filter(Question.learning_objective_id == lo_id)]
+            return {
+                "lo_data": {"id": lo.id, "title": lo.title, "priority": lo.priority},
+                "content_chunk": lo.content_chunk or "",
+                "existing_questions": [{"question_text": text} for text in texts],
+                "unseen": unseen
+            }
+
+    def _save(self, lo_id: str, new_questions: List[Dict[str, Any]]) -> int:
+        question_rows = [persistence_service.question_row(lo_id, q_data) for q_data in new_questions]
+        with session_scope() as db:
+            return persistence_service.save_generated_content(db, [], question_rows)
+
+    async def _take_budget(self) -> bool:
+        try:
+            if settings.rate_limit_backend == "redis":
+                allowed, _ = await asyncio.to_thread(
+                    rate_limiter.store.take, "question_buffer:generation", self._budget_rule
+                )
+            else:
+                allowed, _ = self._budget_store.take("question_buffer:generation", self._budget_rule)
+        except Exception as e:
+            # Fail open like the rate limiter; llm_limiter still caps concurrent calls
+            print(f"Error checking question generation budget: {str(e)}")
+            return True
+        return allowed
+
+    @timed_job("question_refill")
+    async def refill(self, lo_id: str, force: bool = False) -> int:
+        """Generate one batch for the objective if it is below the watermark; returns questions saved"""
+        state = await asyncio.to_thread(self._load, lo_id)
+        if state is None:
+            return 0
+        if not force and state["unseen"] >= settings.question_buffer_low_watermark:
+            QUESTION_BUFFER_REFILLS.labels(outcome="not_needed").inc()
+            return 0
+
+        if not await self._take_budget():
+            # Dropped, not retried: the next review of this objective asks again
+            QUESTION_BUFFER_REFILLS.labels(outcome="over_budget").inc()
+            print(f"Question generation budget exhausted, skipping refill for {lo_id}")
+            return 0
+
+        new_questions = await ai_service.generate_additional_questions(
+            state["lo_data"],
+            state["content_chunk"],
+            state["existing_questions"],
+            count=settings.question_buffer_refill_size
+        )
+        saved = await asyncio.to_thread(self._save, lo_id, new_questions)
+        QUESTION_BUFFER_REFILLS.labels(outcome="generated").inc()
+        return saved
+
+    async def _worker(self):
+        while True:
+            lo_id, force = await self.queue.get()
+            QUESTION_BUFFER_QUEUE.set(self.queue.qsize())
+            try:
+                await self.refill(lo_id, force)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                QUESTION_BUFFER_REFILLS.labels(outcome="error").inc()
+                print(f"Error refilling questions for {lo_id}: {str(e)}")
+            finally:
+                self._pending.discard(lo_id)
+                self.queue.task_done()
+
+    def start(self):
+        """Start the refill workers; their number is the refill concurrency limit"""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(settings.question_buffer_workers)
+            ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+
+# Global question buffer instance
+question_buffer = QuestionBufferService()
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select, update
+
+from ..core.database import session_scope
+from ..models.database import PDF, LearningObjective, Question, QuestionAttempt
+from .ai_service import ai_service
+from .dedup_service import dedup_service
+from .extraction_service import extraction_service, format_pages
+from .objective_table import parse_page_range
+from .persistence_service import persistence_service
+from .storage_service import storage_service
+
+def format_page_range(pages: Set[int]) -> str:
+    """Sorted pages as compact ranges, e.g. {1, 2, 3, 7} -> "1-3, 7" """
+    parts = []
+    for page in sorted(pages):
+        if parts and page == parts[-1][1] + 1:
+            parts[-1][1] = page
+        else:
+            parts.append([page, page])
+    return ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in parts)
+
+def page_hashes(pages: List[str]) -> List[str]:
+    return [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in pages]
+
+@dataclass
+class ChangedRegion:
+    """Old pages replaced by new pages; either side may be empty (insert/delete)"""
+    old_pages: range
+    new_pages: range
+
+    def touches(self, pages: Set[int]) -> bool:
+        if self.old_pages:
+            return any(page in pages for page in self.old_pages)
+        # Inserted pages continue the page before them (or precede page 1)
+        anchor = self.old_pages.start - 1
+        return (anchor if anchor >= 1 else 1) in pages
+
+@dataclass
+class PageDiff:
+    """Alignment of two versions of a document by page content hash (1-based pages)"""
+    old_count: int
+    new_count: int
+    page_map: Dict[int, int] = field(default_factory=dict)
+    regions: List[ChangedRegion] = field(default_factory=list)
+
+    @classmethod
+    def between(cls, old_pages: List[str], new_pages: List[str]) -> "PageDiff":
+        diff = cls(len(old_pages), len(new_pages))
+        matcher = SequenceMatcher(None, page_hashes(old_pages), page_hashes(new_pages), autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    diff.page_map[i1 + offset + 1] = j1 + offset + 1
+            else:
+                diff.regions.append(ChangedRegion(range(i1 + 1, i2 + 1), range(j1 + 1, j2 + 1)))
+        return diff
+
+    @property
+    def changed_new_pages(self) -> List[int]:
+        return [page for region in self.regions for page in region.new_pages]
+
+    @property
+    def changed_old_pages(self) -> List[int]:
+        return [page for region in self.regions for page in region.old_pages]
+
+@dataclass
+class RevisionPlan:
+    """What a revision does to a document's learning objectives"""
+    # Objective id -> new page_range, for objectives whose pages changed
+    # (unchanged, possibly None, when the old one could not be parsed)
+    regenerate: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Objective id -> new page_range, for untouched objectives whose pages moved
+    renumber: Dict[str, str] = field(default_factory=dict)
+    # Objectives whose pages were all deleted
+    remove: List[str] = field(default_factory=list)
+    # New pages that changed but belong to no objective
+    uncovered_pages: List[int] = field(default_factory=list)
+
+def _open_ended(page_range: str) -> str:
+    """"6-20" -> "6-end": keep the start of the last range, run it to the end"""
+    head, _, last = page_range.rpartition(", ")
+    last = f"{last.split('-')[0]}-end"
+    return f"{head}, {last}" if head else last
+
+def plan_revision(objectives: List[Tuple[str, Optional[str]]], diff: PageDiff) -> RevisionPlan:
+    """
+    Map changed pages onto objectives' page ranges (in old-version
+    numbering). An objective is regenerated when any of its pages changed;
+    untouched objectives only have their page numbers shifted. Objectives
+    whose page_range cannot be parsed keep it and are regenerated from the
+    changed pages whenever pages were changed or inserted.
+    """
+    plan = RevisionPlan()
+    if not diff.regions:
+        return plan
+
+    covered = set()
+    for lo_id, page_range in objectives:
+        old_pages = parse_page_range(page_range, diff.old_count)
+        if old_pages is None:
+            if diff.changed_new_pages:
+                plan.regenerate[lo_id] = page_range
+            continue
+
+        new_pages = {diff.page_map[page] for page in old_pages if page in diff.page_map}
+        touching = [region for region in diff.regions if region.touches(old_pages)]
+        for region in touching:
+            new_pages.update(region.new_pages)
+        covered |= new_pages
+
+        new_range = format_page_range(new_pages)
+        # Open-ended ranges keep following the end of the document; only their start moves
+        if new_range and page_range.strip().lower().endswith("end"):
+            new_range = _open_ended(new_range)
+        if touching and not new_pages:
+            plan.remove.append(lo_id)
+        elif touching:
+            plan.regenerate[lo_id] = new_range
+        elif new_range != page_range:
+            plan.renumber[lo_id] = new_range
+
+    plan.uncovered_pages = [page for page in diff.changed_new_pages if page not in covered]
+    return plan
+
+def pages_content(pages: List[str], selected: Set[int]) -> str:
+    """Study material for the selected pages of a document, in the "## Page N" format"""
+    return format_pages([text if page in selected else "" for page, text in enumerate(pages, 1)])
+
+class RevisionService:
+    """
+    Incremental reprocessing of a revised document. Pages of the old and
+    new version are aligned by content hash; only objectives whose page
+    ranges cover changed pages get new material and freshly generated
+    questions. Every other objective keeps its questions, review history
+    and FSRS state, with page numbers shifted if pages moved.
+    """
+
+    async def apply_revision(self, pdf_id: str, file_path: str, file_content: bytes, content_hash: str) -> Dict[str, Any]:
+        """Switch ``pdf_id`` to the new stored file, regenerating only affected objectives"""
+        with session_scope() as db:
+            pdf_record = db.query(PDF).filter(PDF.id == pdf_id).one()
+            old_path, old_hash = pdf_record.file_path, pdf_record.content_hash
+            objectives = {
+                lo.id: {"title": lo.title, "priority": lo.priority, "page_range": lo.page_range, "tags": lo.tags}
+                for lo in db.query(
+                    LearningObjective.id, LearningObjective.title, LearningObjective.priority,
+                    LearningObjective.page_range, LearningObjective.tags
+                ).filter(LearningObjective.pdf_id == pdf_id)
+            }
+
+        _, old_pages = await extraction_service.pages_from_storage(old_path, old_hash)
+        _, new_pages = await extraction_service.pages_from_content(file_content, content_hash)
+        diff = PageDiff.between(old_pages, new_pages)
+        plan = plan_revision([(lo_id, lo["page_range"]) for lo_id, lo in objectives.items()], diff)
+
+        # Only the affected objectives reach the LLM (bounded by llm_limiter)
+        regenerated = list(plan.regenerate.items())
+        # Objectives without a usable page_range get the changed pages, not the whole document
+        changed = set(diff.changed_new_pages)
+        contents = [
+            pages_content(new_pages, parse_page_range(page_range, len(new_pages)) or changed)
+            for _, page_range in regenerated
+        ]
+        generated = await asyncio.gather(*(
+            ai_service.generate_questions_for_lo({**objectives[lo_id], "page_range": page_range}, content)
+            for (lo_id, page_range), content in zip(regenerated, contents)
+        ))
+
+        with session_scope() as db:
+            for lo_id, page_range in plan.renumber.items():
+                db.execute(update(LearningObjective).where(LearningObjective.id == lo_id).values(page_range=page_range))
+
+            lo_ids = [lo_id for lo_id, _ in regenerated] + plan.remove
+            if lo_ids:
+                stale = select(Question.id).where(Question.learning_objective_id.in_(lo_ids))
+                db.execute(delete(QuestionAttempt).where(QuestionAttempt.question_id.in_(stale)))
+                db.execute(delete(Question).where(Question.learning_objective_id.in_(lo_ids)))
+                db.execute(delete(LearningObjective).where(LearningObjective.id.in_(plan.remove)))
+                dedup_service.forget(*lo_ids)
+            question_rows = []
+            for (lo_id, page_range), content, questions in zip(regenerated, contents, generated):
+                db.execute(
+                    update(LearningObjective).where(LearningObjective.id == lo_id).values(
+                        page_range=page_range, content_chunk=content, mastery_percent=0.0
+                    )
+                )
+                question_rows.extend(persistence_service.question_row(lo_id, q_data) for q_data in questions)
+            persistence_service.save_generated_content(db, [], question_rows)
+
+            db.query(PDF).filter(PDF.id == pdf_id).update({
+                PDF.file_path: file_path,
+                PDF.content_hash: content_hash,
+                PDF.processed: True
+            })
+
+        if old_path and old_path != file_path:
+            try:
+                await storage_service.delete(old_path)
+            except Exception as e:
+                print(f"Error deleting previous revision {old_path}: {str(e)}")
+
+        return {
+            "changed_pages": diff.changed_new_pages,
+            "replaced_pages": diff.changed_old_pages,
+            "objectives_regenerated": len(plan.regenerate),
+            "objectives_removed": len(plan.remove),
+            "objectives_kept": len(objectives) - len(plan.regenerate) - len(plan.remove),
+            "uncovered_pages": plan.uncovered_pages,
+        }
+
+# Global revision service instance
+revision_service = RevisionService()
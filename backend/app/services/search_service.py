@@ -0,0 +1,244 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
+from typing import Dict, Any, List, Optional, Tuple
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..models.database import Question, LearningObjective
+
+# Text search configuration used by the generated search_vector columns
+# (migration 0006); queries must parse with the same one
+SEARCH_CONFIG = "simple"
+
+KINDS = ("question", "objective")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_TERM = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+
+SNIPPET_CHARS = 160
+
+@dataclass
+class SearchQuery:
+    """A user query split into required phrases and excluded terms"""
+    raw: str
+    phrases: List[Tuple[str, ...]]
+    excluded: List[Tuple[str, ...]]
+
+    @classmethod
+    def parse(cls, raw: str) -> "SearchQuery":
+        """Words, "quoted phrases" and -excluded terms, like web search"""
+        phrases, excluded = [], []
+        for match in _TERM.finditer(raw or ""):
+            negated = match.group(1) or match.group(3)
+            words = tuple(word.lower() for word in _WORD.findall(match.group(2) or match.group(4) or ""))
+            if words:
+                (excluded if negated else phrases).append(words)
+        return cls(raw or "", phrases, excluded)
+
+    @property
+    def terms(self) -> List[str]:
+        return list(dict.fromkeys(word for phrase in self.phrases for word in phrase))
+
+    def fts5(self, user_id: str) -> str:
+        """
+        FTS5 MATCH expression limited to the user's rows; every token is
+        quoted so user input cannot inject operators
+        """
+        expression = " AND ".join('"' + " ".join(phrase) + '"' for phrase in self.phrases)
+        for phrase in self.excluded:
+            expression += ' NOT "' + " ".join(phrase) + '"'
+        return f'owner : "{owner_token(user_id)}" AND ({expression})'
+
+def owner_token(user_id: str) -> str:
+    """Single FTS5 token for a user id, the same value migration 0006 indexes"""
+    return "u" + user_id.encode("utf-8").hex().upper()
+
+# One UNION ALL branch per kind; every branch yields (kind, id, learning_objective_id, rank)
+_POSTGRES_BRANCHES = {
+    "question": (
+        "SELECT 'question' AS kind, q.id AS id, q.learning_objective_id AS learning_objective_id, "
+        "ts_rank_cd(q.search_vector, query.tsq, 1) AS rank "
+        "FROM query, questions q "
+        "JOIN learning_objectives lo ON lo.id = q.learning_objective_id "
+        "JOIN pdfs p ON p.id = lo.pdf_id "
+        "WHERE q.search_vector @@ query.tsq AND p.user_id = :user_id"
+    ),
+    "objective": (
+        "SELECT 'objective' AS kind, lo.id AS id, lo.id AS learning_objective_id, "
+        "ts_rank_cd(lo.search_vector, query.tsq, 1) AS rank "
+        "FROM query, learning_objectives lo "
+        "JOIN pdfs p ON p.id = lo.pdf_id "
+        "WHERE lo.search_vector @@ query.tsq AND p.user_id = :user_id"
+    ),
+}
+
+# The FTS5 tables share rowids with their content tables and are scoped to the
+# user by the owner column of the MATCH, which carries no ranking weight.
+# Rowids of tables with TEXT primary keys can be renumbered by VACUUM, so the
+# joined row is checked against the user as well: a stale index entry can
+# then only miss a hit, never return another user's row.
+# bm25 is lower-is-better; negated so both dialects sort rank descending
+_SQLITE_BRANCHES = {
+    "question": (
+        "SELECT 'question' AS kind, q.id AS id, q.learning_objective_id AS learning_objective_id, "
+        "-bm25(questions_fts, 0.0, 2.0, 1.0) AS rank "
+        "FROM questions_fts "
+        "JOIN questions q ON q.rowid = questions_fts.rowid "
+        "JOIN learning_objectives lo ON lo.id = q.learning_objective_id "
+        "JOIN pdfs p ON p.id = lo.pdf_id "
+        "WHERE questions_fts MATCH :match AND p.user_id = :user_id"
+    ),
+    "objective": (
+        "SELECT 'objective' AS kind, lo.id AS id, lo.id AS learning_objective_id, "
+        "-bm25(learning_objectives_fts, 0.0, 2.0, 1.0) AS rank "
+        "FROM learning_objectives_fts "
+        "JOIN learning_objectives lo ON lo.rowid = learning_objectives_fts.rowid "
+        "JOIN pdfs p ON p.id = lo.pdf_id "
+        "WHERE learning_objectives_fts MATCH :match AND p.user_id = :user_id"
+    ),
+}
+
+_AFTER_CURSOR = (
+    "WHERE rank < :cursor_rank OR (rank = :cursor_rank AND "
+    "(kind > :cursor_kind OR (kind = :cursor_kind AND id > :cursor_id))) "
+)
+
+@lru_cache(maxsize=64)
+def _search_statement(dialect: str, kinds: Tuple[str, ...], after: bool, limit: int):
+    """Compiled once per shape; the query text itself is a bound parameter"""
+    if dialect == "postgresql":
+        prefix = f"WITH query AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :q) AS tsq) "
+        branches = _POSTGRES_BRANCHES
+    elif dialect == "sqlite":
+        prefix = ""
+        branches = _SQLITE_BRANCHES
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    return text(
+        prefix
+        + "SELECT kind, id, learning_objective_id, rank FROM ("
+        + " UNION ALL ".join(branches[kind] for kind in kinds)
+        + ") hits "
+        + (_AFTER_CURSOR if after else "")
+        + f"ORDER BY rank DESC, kind, id LIMIT {int(limit)}"
+    )
+
+class SearchService:
+    """
+    Ranked full-text search over one user's questions and learning objectives.
+    Matching and ranking run inside the database against the indexes from
+    migration 0006 (Postgres GIN over tsvector, SQLite FTS5); only the page
+    being returned is loaded and highlighted.
+    """
+
+    def search(
+        self,
+        db: Session,
+        user_id: str,
+        raw_query: str,
+        kinds: Optional[List[str]] = None,
+        cursor: Optional[Tuple[float, str, str]] = None,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, str, str]]]:
+        """
+        One page of hits, best first, plus the (rank, kind, id) keyset of the
+        last hit when another page exists
+        """
+        query = SearchQuery.parse(raw_query)
+        if not query.phrases:
+            return [], None
+
+        params = {"user_id": user_id, "q": query.raw, "match": query.fts5(user_id)}
+        if cursor:
+            params.update(cursor_rank=cursor[0], cursor_kind=cursor[1], cursor_id=cursor[2])
+        statement = _search_statement(db.get_bind().dialect.name, tuple(kinds or KINDS), cursor is not None, limit + 1)
+        rows = db.execute(statement, params).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (float(rows[-1].rank), rows[-1].kind, rows[-1].id)
+        return self._hydrate(db, rows, query.terms), next_cursor
+
+    def _hydrate(self, db: Session, rows, terms: List[str]) -> List[Dict[str, Any]]:
+        """Load text for the page's hits only, and highlight it"""
+        question_ids = [row.id for row in rows if row.kind == "question"]
+        lo_ids = list({row.learning_objective_id for row in rows})
+
+        questions = {}
+        if question_ids:
+            for q in db.query(Question.id, Question.question_text, Question.explanation, Question.difficulty).filter(
+                Question.id.in_(question_ids)
+            ):
+                questions[q.id] = q
+        objectives = {}
+        if lo_ids:
+            for lo in db.query(LearningObjective.id, LearningObjective.title, LearningObjective.content_chunk).filter(
+                LearningObjective.id.in_(lo_ids)
+            ):
+                objectives[lo.id] = lo
+
+        hits = []
+        for row in rows:
+            lo = objectives.get(row.learning_objective_id)
+            hit = {
+                "kind": row.kind,
+                "id": row.id,
+                "learning_objective_id": row.learning_objective_id,
+                "learning_objective_title": lo.title if lo else None,
+                "rank": float(row.rank),
+            }
+            if row.kind == "question":
+                q = questions.get(row.id)
+                if q is None:
+                    continue
+                hit["question_text"] = q.question_text
+                hit["difficulty"] = q.difficulty
+                hit["snippet"] = highlight(q.question_text, terms) or highlight(q.explanation, terms)
+            else:
+                if lo is None:
+                    continue
+                hit["snippet"] = highlight(lo.title, terms) or highlight(lo.content_chunk, terms)
+            hits.append(hit)
+        return hits
+
+def highlight(source: Optional[str], terms: List[str], width: int = SNIPPET_CHARS) -> Optional[str]:
+    """
+    HTML-escaped window of ``source`` around the first matched term, with
+    every match wrapped in <mark>; None when no term occurs
+    """
+    if not source or not terms:
+        return None
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")", re.IGNORECASE)
+    first = pattern.search(source)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - width // 3)
+    end = min(len(source), start + width)
+    # Cut at word boundaries rather than mid-word
+    if start > 0:
+        space = source.find(" ", start, first.start())
+        start = space + 1 if space != -1 else start
+    if end < len(source):
+        space = source.rfind(" ", first.end(), end)
+        end = space if space != -1 else end
+    # Extracted text is full of line breaks and ragged spacing
+    window = " ".join(source[start:end].split())
+
+    pieces = ["…" if start > 0 else ""]
+    position = 0
+    for match in pattern.finditer(window):
+        pieces.append(escape(window[position:match.start()]))
+        pieces.append("<mark>" + escape(match.group(0)) + "</mark>")
+        position = match.end()
+    pieces.append(escape(window[position:]))
+    pieces.append("…" if end < len(source) else "")
+    return "".join(pieces)
+
+# Global search service instance
+search_service = SearchService()
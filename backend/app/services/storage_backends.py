@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from urllib.parse import quote, urlsplit
+
+from ..core.config import settings
+from ..core.http_client import get_http_client, request_with_retry
+
+CHUNK_SIZE = 1024 * 1024
+
+class StorageError(Exception):
+    """An object could not be read or written"""
+
+class ObjectNotFound(StorageError):
+    """No object under the requested key"""
+
+def validate_key(key: str) -> str:
+    """Keys are relative, slash-separated and may not climb out of the store"""
+    parts = key.replace("\\", "/").split("/")
+    if not key or key.startswith("/") or any(part in ("", ".", "..") for part in parts):
+        raise StorageError(f"Invalid storage key: {key!r}")
+    return "/".join(parts)
+
+class StorageBackend(ABC):
+    """Object store for uploaded documents; objects are written once and never modified"""
+
+    name = "base"
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes):
+        ...
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes ``start`` to ``end`` (exclusive)"""
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path of the object on local disk, if the backend keeps it there"""
+        return None
+
+class LocalStorageBackend(StorageBackend):
+    """Objects as files under a root directory (UPLOAD_DIR)"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def local_path(self, key: str) -> str:
+        return os.path.join(self.root, *validate_key(key).split("/"))
+
+    def _existing_path(self, key: str) -> str:
+        path = self.local_path(key)
+        if not os.path.isfile(path):
+            raise ObjectNotFound(key)
+        return path
+
+    def _write(self, key: str, data: bytes):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._write, key, data)
+
+    async def size(self, key: str) -> int:
+        return os.path.getsize(self._existing_path(key))
+
+    def _read_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self._existing_path(key), "rb") as f:
+            f.seek(start)
+            return f.read(max(0, end - start))
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        return await asyncio.to_thread(self._read_range, key, start, end)
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._existing_path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+    async def delete(self, key: str):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3-compatible object storage over the shared HTTP client, signed with
+    AWS Signature Version 4 and path-style URLs. Works with AWS S3,
+    Supabase Storage's S3 endpoint and local stand-ins such as MinIO.
+    """
+
+    name = "s3"
+
+    def __init__(self, endpoint: str, bucket: str, region: str, access_key: str, secret_key: str):
+        self.endpoint = endpoint.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        split = urlsplit(self.endpoint)
+        self._host = split.netloc
+        self._base_path = split.path
+
+    def _path(self, key: str) -> str:
+        return f"{self._base_path}/{quote(self.bucket, safe='')}/{quote(validate_key(key), safe='/-_.~')}"
+
+    def _signed(self, method: str, path: str, headers: Optional[dict] = None, payload_hash: str = "UNSIGNED-PAYLOAD"):
+        """URL and headers for a SigV4-signed request; bodies are signed only when a hash is given"""
+        now = datetime.utcnow()
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        signed = {"host": self._host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        signed_names = ";".join(sorted(signed))
+        canonical_request = "\n".join([
+            method,
+            path,
+            "",
+            "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+            signed_names,
+            payload_hash,
+        ])
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, _sha256_hex(canonical_request.encode())])
+
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        request_headers = {
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+            "Authorization": (
+                f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+                f"SignedHeaders={signed_names}, Signature={signature}"
+            ),
+        }
+        request_headers.update(headers or {})
+        return f"{self.endpoint}{path[len(self._base_path):]}", request_headers
+
+    def _check(self, response, key: str):
+        if response.status_code == 404:
+            raise ObjectNotFound(key)
+        if response.status_code >= 300:
+            raise StorageError(f"Storage request for {key} failed: {response.status_code}")
+
+    async def put(self, key: str, data: bytes):
+        url, headers = self._signed("PUT", self._path(key), payload_hash=_sha256_hex(data))
+        response = await request_with_retry("PUT", url, content=data, headers=headers)
+        self._check(response, key)
+
+    async def size(self, key: str) -> int:
+        url, headers = self._signed("HEAD", self._path(key))
+        response = await request_with_retry("HEAD", url, headers=headers)
+        self._check(response, key)
+        return int(response.headers["content-length"])
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b""
+        url, headers = self._signed("GET", self._path(key), {"Range": f"bytes={start}-{end - 1}"})
+        response = await request_with_retry("GET", url, headers=headers)
+        if response.status_code == 416:
+            return b""
+        self._check(response, key)
+        if response.status_code == 200:
+            # Server ignored the Range header and sent the whole object
+            return response.content[start:end]
+        return response.content
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        url, headers = self._signed("GET", self._path(key))
+        async with get_http_client().stream("GET", url, headers=headers) as response:
+            if response.status_code >= 300:
+                await response.aread()
+            self._check(response, key)
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+
+    async def delete(self, key: str):
+        url, headers = self._signed("DELETE", self._path(key))
+        response = await request_with_retry("DELETE", url, headers=headers)
+        if response.status_code != 404:
+            self._check(response, key)
+
+def create_storage_backend() -> StorageBackend:
+    """Build the backend selected by STORAGE_BACKEND"""
+    if settings.storage_backend == "local":
+        return LocalStorageBackend(settings.upload_dir)
+
+    if settings.storage_backend == "s3":
+        if not settings.storage_s3_endpoint:
+            raise ValueError("STORAGE_S3_ENDPOINT is required when STORAGE_BACKEND=s3")
+        return S3StorageBackend(
+            settings.storage_s3_endpoint,
+            settings.storage_s3_bucket,
+            settings.storage_s3_region,
+            settings.storage_s3_access_key,
+            settings.storage_s3_secret_key
+        )
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.storage_backend}")
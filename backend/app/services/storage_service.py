@@ -0,0 +1,239 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from ..core.config import settings
+from ..core.metrics import STORAGE_CACHE_LOOKUPS, STORAGE_CACHE_BYTES
+from .storage_backends import CHUNK_SIZE, ObjectNotFound, StorageBackend, create_storage_backend
+
+class DocumentCache:
+    """
+    Content-addressed local copies of remotely stored documents. Files live
+    under ``objects/<sha256[:2]>/<sha256>``, so identical documents uploaded
+    under different keys share one copy; ``refs/`` maps each storage key to
+    its content hash. Total size is bounded by evicting the least recently
+    used objects; an evicted object is simply downloaded again.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _ref_path(self, key: str) -> str:
+        ref = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "refs", ref[:2], ref)
+
+    def _load(self) -> "OrderedDict[str, int]":
+        """Index the cached objects, least recently used first (caller holds the lock)"""
+        if self._entries is None:
+            found = []
+            objects_dir = os.path.join(self.root, "objects")
+            for dirpath, _, filenames in os.walk(objects_dir):
+                for name in filenames:
+                    stat = os.stat(os.path.join(dirpath, name))
+                    found.append((stat.st_mtime, name, stat.st_size))
+            found.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in found)
+            self.total_bytes = sum(self._entries.values())
+            STORAGE_CACHE_BYTES.set(self.total_bytes)
+        return self._entries
+
+    def temp_path(self) -> str:
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Path of the cached copy of ``key``, marking it recently used"""
+        try:
+            with open(self._ref_path(key)) as f:
+                digest = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        path = self._object_path(digest)
+        with self._lock:
+            entries = self._load()
+            if digest not in entries or not os.path.exists(path):
+                return None
+            entries.move_to_end(digest)
+        # Recency survives restarts through the file's mtime
+        os.utime(path)
+        return path
+
+    def add_file(self, key: str, tmp_path: str, digest: str) -> str:
+        """Move a fully written temporary file into the cache under its hash"""
+        path = self._object_path(digest)
+        size = os.path.getsize(tmp_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+        ref_path = self._ref_path(key)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        ref_tmp = self.temp_path()
+        with open(ref_tmp, "w") as f:
+            f.write(digest)
+        os.replace(ref_tmp, ref_path)
+
+        with self._lock:
+            entries = self._load()
+            self.total_bytes += size - entries.pop(digest, 0)
+            entries[digest] = size
+            self._evict(keep=digest)
+            STORAGE_CACHE_BYTES.set(self.total_bytes)
+        return path
+
+    def add_bytes(self, key: str, data: bytes) -> str:
+        tmp_path = self.temp_path()
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        return self.add_file(key, tmp_path, hashlib.sha256(data).hexdigest())
+
+    def _evict(self, keep: str):
+        # Unlinking is safe while a reader has the file open or mapped;
+        # stale refs to evicted objects read as misses
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            digest, size = next(iter(self._entries.items()))
+            if digest == keep:
+                self._entries.move_to_end(digest)
+                continue
+            del self._entries[digest]
+            self.total_bytes -= size
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+class StorageService:
+    """
+    Document storage for uploads and reprocessing. Writes go to the
+    configured backend; reads of remote objects go through the local
+    document cache, so a document is downloaded once and then read from
+    disk, in ranges, as a stream or memory-mapped for the PDF parser.
+    """
+
+    def __init__(self):
+        self._backend: Optional[StorageBackend] = None
+        self._cache: Optional[DocumentCache] = None
+        self._downloads: Dict[str, asyncio.Task] = {}
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = create_storage_backend()
+        return self._backend
+
+    def set_backend(self, backend: StorageBackend, cache: Optional[DocumentCache] = None):
+        """Install a different backend (and cache), e.g. a stand-in for tests"""
+        self._backend = backend
+        self._cache = cache
+
+    @property
+    def cache(self) -> DocumentCache:
+        if self._cache is None:
+            self._cache = DocumentCache(settings.storage_cache_dir, settings.storage_cache_max_bytes)
+        return self._cache
+
+    async def save(self, key: str, data: bytes):
+        """Store a new document; remote backends also keep a cached copy for processing"""
+        await self.backend.put(key, data)
+        if self.backend.local_path(key) is None:
+            await asyncio.to_thread(self.cache.add_bytes, key, data)
+
+    async def _download(self, key: str) -> str:
+        """Stream the object into the cache, hashing it on the way"""
+        tmp_path = self.cache.temp_path()
+        hasher = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as f:
+                async for chunk in self.backend.stream(key):
+                    hasher.update(chunk)
+                    await asyncio.to_thread(f.write, chunk)
+            return await asyncio.to_thread(self.cache.add_file, key, tmp_path, hasher.hexdigest())
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def local_path(self, key: str) -> str:
+        """A local file holding the object, downloading it into the cache on a miss"""
+        path = self.backend.local_path(key)
+        if path is not None:
+            if not os.path.isfile(path):
+                raise ObjectNotFound(key)
+            return path
+
+        path = await asyncio.to_thread(self.cache.lookup, key)
+        if path is not None:
+            STORAGE_CACHE_LOOKUPS.labels(result="hit").inc()
+            return path
+
+        STORAGE_CACHE_LOOKUPS.labels(result="miss").inc()
+        # Concurrent readers of the same document share one download
+        task = self._downloads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._download(key))
+            self._downloads[key] = task
+            task.add_done_callback(lambda _: self._downloads.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def read(self, key: str) -> bytes:
+        path = await self.local_path(key)
+        return await asyncio.to_thread(_read_file, path)
+
+    async def read_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes ``start`` to ``end`` (exclusive), without downloading the whole object"""
+        path = self.backend.local_path(key) or await asyncio.to_thread(self.cache.lookup, key)
+        if path is None:
+            return await self.backend.read_range(key, start, end)
+        return await asyncio.to_thread(_read_file, path, start, end)
+
+    async def stream(self, key: str, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """The object in chunks, from the cache when it holds a copy"""
+        path = self.backend.local_path(key) or await asyncio.to_thread(self.cache.lookup, key)
+        if path is None:
+            async for chunk in self.backend.stream(key, chunk_size):
+                yield chunk
+            return
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    @asynccontextmanager
+    async def mapped(self, key: str):
+        """
+        Read-only memory map of the object; pages are read from disk as the
+        parser touches them instead of holding the whole document in memory
+        """
+        path = await self.local_path(key)
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    async def delete(self, key: str):
+        await self.backend.delete(key)
+
+def _read_file(path: str, start: int = 0, end: Optional[int] = None) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read() if end is None else f.read(max(0, end - start))
+
+# Global storage service instance
+storage_service = StorageService()
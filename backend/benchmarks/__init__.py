@@ -0,0 +1 @@
+# RecallForge Benchmarks
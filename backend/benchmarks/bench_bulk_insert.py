@@ -0,0 +1,147 @@
+"""
+Persistence benchmark for generated learning objectives and questions.
+
+Compares the old per-row ORM path (``db.add()`` per question, one commit per
+learning objective) with the batched Core executemany path used by
+``PersistenceService.save_generated_content``.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert [--documents 20] [--objectives 8]
+        [--questions 30] [--database-url sqlite:///:memory:]
+"""
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base, User, PDF, LearningObjective, Question
+from app.services.persistence_service import persistence_service
+
+from .datagen import make_question_texts
+
+def make_document(objectives: int, questions: int, seed: int = 0):
+    """
+    Build synthetic objective and question payloads for one document; question
+    texts are distinct so the near-duplicate filter keeps every row
+    """
+    los = []
+    for i in range(objectives):
+        texts = make_question_texts(questions, seed=seed * objectives + i)
+        lo_data = {
+            "id": str(uuid.uuid4()),
+            "title": f"Learning objective {i}",
+            "priority": "High",
+            "page_range": f"{i + 1}-{i + 2}",
+            "tags": ["bench"],
+        }
+        qs = [
+            {
+                "id": str(uuid.uuid4()),
+                "question_text": texts[j],
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": "A",
+                "explanation": "Synthetic explanation " * 10,
+                "difficulty": "medium",
+            }
+            for j in range(questions)
+        ]
+        los.append((lo_data, qs))
+    return los
+
+def persist_per_row(Session, pdf_id, document):
+    """Old path: ORM add per question, commit per learning objective"""
+    db = Session()
+    try:
+        for lo_data, questions in document:
+            db.add(LearningObjective(
+                id=lo_data["id"],
+                pdf_id=pdf_id,
+                title=lo_data["title"],
+                priority=lo_data["priority"],
+                page_range=lo_data["page_range"],
+                tags=lo_data["tags"],
+                content_chunk="",
+                mastery_percent=0.0
+            ))
+            db.commit()
+            for q_data in questions:
+                db.add(Question(
+                    id=q_data["id"],
+                    learning_objective_id=lo_data["id"],
+                    question_text=q_data["question_text"],
+                    options=q_data["options"],
+                    correct_answer=q_data["correct_answer"],
+                    explanation=q_data["explanation"],
+                    difficulty=q_data["difficulty"],
+                    stability=1.0,
+                    difficulty_rating=5.0,
+                    review_count=0
+                ))
+            db.commit()
+    finally:
+        db.close()
+
+def persist_bulk(Session, pdf_id, document):
+    """New path: one transaction and one executemany per table"""
+    objective_rows = []
+    question_rows = []
+    for lo_data, questions in document:
+        objective_rows.append(persistence_service.learning_objective_row(lo_data["id"], pdf_id, lo_data, ""))
+        question_rows.extend(persistence_service.question_row(lo_data["id"], q) for q in questions)
+
+    db = Session()
+    try:
+        persistence_service.save_generated_content(db, objective_rows, question_rows)
+        db.commit()
+    finally:
+        db.close()
+
+def run(strategy, args):
+    """Time one strategy over fresh tables; returns (rows written, seconds)"""
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    documents = [make_document(args.objectives, args.questions, seed=d) for d in range(args.documents)]
+    pdf_ids = [str(uuid.uuid4()) for _ in documents]
+
+    # Parent rows exist before timing starts so foreign keys resolve on Postgres
+    db = Session()
+    db.add(User(id="bench-user", email="bench@example.com", name="Bench"))
+    db.add_all(PDF(id=pdf_id, user_id="bench-user", filename="bench.pdf") for pdf_id in pdf_ids)
+    db.commit()
+    db.close()
+
+    start = time.perf_counter()
+    for pdf_id, document in zip(pdf_ids, documents):
+        strategy(Session, pdf_id, document)
+    elapsed = time.perf_counter() - start
+
+    # Rows actually written: the bulk path drops near-duplicate questions
+    db = Session()
+    rows = db.query(func.count(LearningObjective.id)).scalar() + db.query(func.count(Question.id)).scalar()
+    db.close()
+
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    return rows, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--objectives", type=int, default=8)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--database-url", default="sqlite:///:memory:")
+    args = parser.parse_args()
+
+    print(f"{'strategy':<12} {'rows':>8} {'seconds':>10} {'rows/s':>12}")
+    for name, strategy in [("per-row", persist_per_row), ("bulk", persist_bulk)]:
+        rows, elapsed = run(strategy, args)
+        print(f"{name:<12} {rows:>8} {elapsed:>10.3f} {rows / elapsed:>12.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Email rendering benchmark: time to render a batch of messages.
+
+Compares the old path (f-string interpolation of the whole body per send,
+no escaping), loading and compiling the template for every message, and
+the cached compiled templates used by email_service.
+
+Usage:
+    python -m benchmarks.bench_email_templates [--messages 10000] [--output results.json]
+"""
+
+import argparse
+
+from app.services.email_service import build_due_digest_email, build_test_link_email
+from app.services.email_templates import TEMPLATE_DIR, EmailTemplate, render_email
+
+from .harness import bench, write_results
+
+def fstring_test_link(lo_info, base_url="https://your-frontend-domain.com"):
+    """The pre-template body of send_test_link_email for an LO link (no escaping)"""
+    test_link = f"{base_url}/study?lo_id={lo_info['id']}&test_mode=true"
+    content_body = f"""
+        <p>You've been invited to test a learning objective: <strong>{lo_info['title']}</strong></p>
+        <p>Click the link below to start the test without needing to create an account:</p>
+        """
+    return f"""
+            <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+                <h2 style="color: #2563eb;">Your Test Link is Ready!</h2>
+                {content_body}
+                <div style="margin: 30px 0;">
+                    <a href="{test_link}"
+                       style="background-color: #2563eb; color: white; padding: 12px 24px;
+                              text-decoration: none; border-radius: 6px; display: inline-block;">
+                        Start Testing Now
+                    </a>
+                </div>
+                <p style="font-size: 14px; color: #666;">
+                    This test link allows you to explore RecallForge without creating an account.
+                    You can experience the full learning journey with AI-generated questions.
+                </p>
+                <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+                <p style="font-size: 12px; color: #888;">
+                    This email was sent by RecallForge. If you didn't request this, you can safely ignore this email.
+                </p>
+                <p style="font-size: 12px; color: #888;">
+                    Want to create your own account? Visit <a href="{base_url}">RecallForge</a>
+                </p>
+            </div>
+            """
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    n = args.messages
+    objectives = [{"id": f"lo-{i}", "title": f"Objective {i} <Cardiology & Renal>"} for i in range(n)]
+    users = [(f"Student {i}", i % 50 + 1) for i in range(n)]
+
+    def load_per_message():
+        for lo in objectives:
+            intro = EmailTemplate((TEMPLATE_DIR / "test_link_intro_objective.html").read_text()).render(lo_title=lo["title"])
+            EmailTemplate((TEMPLATE_DIR / "test_link.html").read_text()).render(
+                title="x", intro=intro, test_link="x", closing="x", base_url="x"
+            )
+
+    results = [
+        bench(f"test-link[{n}] f-string", lambda: [fstring_test_link(lo) for lo in objectives], repeat=3, messages=n),
+        bench(f"test-link[{n}] load+compile per message", load_per_message, repeat=3, messages=n),
+        bench(f"test-link[{n}] cached template", lambda: [build_test_link_email(lo_info=lo) for lo in objectives], repeat=3, messages=n),
+        bench(f"due-digest[{n}] cached template", lambda: [build_due_digest_email(name, count) for name, count in users], repeat=3, messages=n),
+    ]
+
+    # Escaping is part of what is being timed, so check it actually happens
+    assert "&lt;Cardiology &amp; Renal&gt;" in render_email("test_link_intro_objective.html", lo_title=objectives[0]["title"])
+
+    if args.output:
+        write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
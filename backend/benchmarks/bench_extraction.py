@@ -0,0 +1,103 @@
+"""
+Per-page extraction cache benchmark.
+
+Builds a text PDF, then times PDF parsing and cleaning against reads from
+the persisted page cache: cold (hash, parse, store), warm from content
+(hash, load) and warm by known hash (load only, the reprocess path). A
+bumped extractor version must miss and replace the old rows.
+
+Without --database-url it runs on a temporary SQLite database at head.
+
+Usage:
+    python -m benchmarks.bench_extraction [--pages 200] [--lines 40] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from app.core import database
+from app.core.database import run_migrations
+from app.models.database import ExtractedPage
+from app.services import extraction_service as extraction
+from app.services.extraction_service import extract_pages, extraction_service
+
+from .load_test import make_document
+
+def best_of(repeat, func):
+    """Fastest of ``repeat`` runs in ms, plus the last result"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), result
+
+def report(label, ms):
+    print(f"  {label:<40} {ms:9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if not database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+        run_migrations(database_url)
+    engine = create_engine(database_url)
+    database.SessionLocal.configure(bind=engine)
+
+    content = make_document(random.Random(0), pages=args.pages, lines_per_page=args.lines)
+    print(f"{args.pages}-page PDF, {len(content) // 1024} KiB, extractor version {extraction.EXTRACTOR_VERSION}")
+
+    def clear():
+        with database.session_scope() as db:
+            db.query(ExtractedPage).delete()
+
+    parse_ms, pages = best_of(args.repeat, lambda: extract_pages(content))
+    report("parse and clean (no cache)", parse_ms)
+
+    def cold():
+        clear()
+        return asyncio.run(extraction_service.pages_from_content(content))
+    cold_ms, (doc_hash, cold_pages) = best_of(args.repeat, cold)
+    report("cold: hash, parse, store", cold_ms)
+    assert cold_pages == pages
+
+    warm_ms, (_, warm_pages) = best_of(args.repeat, lambda: asyncio.run(extraction_service.pages_from_content(content)))
+    report("warm: hash, load", warm_ms)
+    assert warm_pages == pages
+
+    known_ms, (_, known_pages) = best_of(
+        args.repeat, lambda: asyncio.run(extraction_service.pages_from_storage("unused.pdf", doc_hash))
+    )
+    report("warm by known hash: load only", known_ms)
+    assert known_pages == pages
+    print(f"  speedup on reprocess: {parse_ms / known_ms:.0f}x")
+
+    # A new extractor version ignores the old rows and replaces them
+    extraction.EXTRACTOR_VERSION += 1
+    assert extraction_service.load(doc_hash) is None
+    asyncio.run(extraction_service.pages_from_content(content))
+    with database.session_scope() as db:
+        versions = {row.extractor_version for row in db.query(ExtractedPage.extractor_version)}
+    assert versions == {extraction.EXTRACTOR_VERSION}, versions
+    print(f"  version bump re-extracted; rows left: version {sorted(versions)}")
+
+    engine.dispose()
+    if tmpdir:
+        tmpdir.cleanup()
+
+if __name__ == "__main__":
+    main()
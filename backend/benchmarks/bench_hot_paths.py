@@ -0,0 +1,152 @@
+"""
+Microbenchmarks for scheduler, gamification and text-processing hot paths.
+
+Results are written as JSON; compare two runs with benchmarks.compare.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [--output results.json] [--quick]
+"""
+
+import argparse
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base
+from app.services.ai_service import ai_service
+from app.services.coverage_service import coverage_service
+from app.services.dedup_service import dedup_service
+from app.services.extraction_service import clean_page_text
+from app.services.fsrs_service import fsrs_service
+from app.services.gamification_service import gamification_service
+
+from .datagen import make_questions, make_sessions, make_page_text, make_generated_questions, make_question_texts
+from .harness import bench, write_results
+
+def bench_fsrs(quick):
+    results = []
+
+    questions = make_questions(1000, seed=1)
+    state = {"i": 0}
+
+    def review():
+        question = questions[state["i"] % len(questions)]
+        state["i"] += 1
+        fsrs_service.update_card_after_review(question, 3, 5.0)
+
+    results.append(bench("fsrs.update_card_after_review", review, number=10000, repeat=5))
+
+    for size in ([1000, 10000] if quick else [1000, 10000, 100000]):
+        questions = make_questions(size, seed=size)
+        results.append(bench(
+            f"fsrs.get_due_questions[{size}]",
+            lambda: fsrs_service.get_due_questions(questions, 30),
+            number=max(1, 10000 // size),
+            repeat=5,
+            cards=size
+        ))
+    return results
+
+def bench_gamification(quick):
+    results = []
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    for days in ([30, 365] if quick else [30, 365, 1825]):
+        user_id = f"bench-user-{days}"
+        db = Session()
+        db.add_all(make_sessions(user_id, days, seed=days))
+        db.commit()
+        results.append(bench(
+            f"gamification.calculate_streak[{days}d]",
+            lambda: gamification_service.calculate_streak(user_id, db),
+            number=10,
+            repeat=5,
+            days=days
+        ))
+        db.close()
+
+    engine.dispose()
+    return results
+
+def bench_text(quick):
+    results = []
+
+    for chars in ([10000] if quick else [10000, 100000]):
+        page = make_page_text(chars, seed=chars)
+        results.append(bench(
+            f"extraction.clean_page_text[{chars}ch]",
+            lambda: clean_page_text(page),
+            number=10,
+            repeat=5,
+            chars=chars
+        ))
+
+    for count in ([1000] if quick else [1000, 10000]):
+        batch = make_generated_questions(count, seed=count)
+        results.append(bench(
+            f"ai._validate_question[{count}]",
+            lambda: [ai_service._validate_question(q) for q in batch],
+            number=10,
+            repeat=5,
+            questions=count
+        ))
+    return results
+
+def bench_dedup(quick):
+    results = []
+
+    for size in ([500] if quick else [100, 500, 5000]):
+        texts = make_question_texts(size + 1000, seed=size)
+        index = dedup_service.build_index((str(i), text) for i, text in enumerate(texts[:size]))
+        probes = texts[size:]
+        state = {"i": 0}
+
+        def check():
+            # Insert-time check: signature plus LSH lookup, without growing the index
+            text = probes[state["i"] % len(probes)]
+            state["i"] += 1
+            return index.find_duplicate(dedup_service.hasher.signature(text))
+
+        results.append(bench(f"dedup.check_new_question[{size}]", check, number=1000, repeat=5, indexed=size))
+    return results
+
+def bench_coverage(quick):
+    results = []
+
+    material = make_page_text(8000, seed=7)
+    results.append(bench(
+        "coverage.build_profile[8000ch]",
+        lambda: coverage_service.build_profile(material, ["spacing effect", "retrieval practice"]),
+        number=100,
+        repeat=5
+    ))
+
+    profile = coverage_service.build_profile(material, ["spacing effect", "retrieval practice"])
+    for count in ([100] if quick else [30, 100, 500]):
+        questions = [
+            {**q, "options": [q["option_a"], q["option_b"], q["option_c"], q["option_d"]], "review_count": i % 3}
+            for i, q in enumerate(make_generated_questions(count, seed=count, invalid_ratio=0))
+        ]
+        results.append(bench(
+            f"coverage.analyze[{count}]",
+            lambda: coverage_service.analyze(profile, questions),
+            number=100,
+            repeat=5,
+            questions=count
+        ))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results.json"))
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    args = parser.parse_args()
+
+    results = bench_fsrs(args.quick) + bench_gamification(args.quick) + bench_text(args.quick) + bench_dedup(args.quick) + bench_coverage(args.quick)
+    write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Markdown ingestion: streaming heading splitter vs full render.
+
+Writes synthetic course notes (objectives table, chapters annotated with
+"(Pages a-b)", subsections, fenced code) to a temporary file, then times
+and measures peak Python memory (tracemalloc) for:
+  - the old path: read the whole file and markdown.markdown() it
+  - split_sections(): one pass over the lines, headings and offsets only
+  - markdown_objectives(): split plus one ranged read per objective
+
+Usage:
+    python -m benchmarks.bench_markdown [--chapters 200] [--sections 10] [--paragraphs 8]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from app.services.markdown_splitter import markdown_objectives, split_sections
+
+from .datagen import WORDS
+
+def write_notes(path, rng, chapters, sections, paragraphs, pages_per_chapter=5):
+    with open(path, "w") as f:
+        f.write("# Course Notes\n\n## Learning Objectives\n\n")
+        f.write("| ID | Learning Objective | Priority | Page Range | Tags |\n|----|----|----|----|----|\n")
+        for chapter in range(chapters):
+            first = chapter * pages_per_chapter + 1
+            title = " ".join(rng.choice(WORDS) for _ in range(5))
+            f.write(
+                f"| LO-{chapter + 1:03d} | Understand {title} | {rng.choice(['High', 'Medium', 'Low'])} | "
+                f"{first}-{first + pages_per_chapter - 1} | {', '.join(rng.sample(WORDS, 3))} |\n"
+            )
+        for chapter in range(chapters):
+            first = chapter * pages_per_chapter + 1
+            f.write(f"\n## Chapter {chapter + 1}: {rng.choice(WORDS)} (Pages {first}-{first + pages_per_chapter - 1})\n\n")
+            for section in range(sections):
+                f.write(f"### {' '.join(rng.choice(WORDS) for _ in range(3)).capitalize()}\n\n")
+                for _ in range(paragraphs):
+                    f.write(" ".join(rng.choice(WORDS) for _ in range(60)).capitalize() + ".\n\n")
+                f.write("```python\n# not a heading\nvalue = compute()\n```\n\n")
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} {elapsed * 1000:10.1f} ms   peak {peak / 1024 / 1024:8.1f} MiB")
+    return result
+
+def render(path):
+    import markdown
+
+    with open(path, encoding="utf-8") as f:
+        return markdown.markdown(f.read())
+
+def split(path):
+    with open(path, "rb") as f:
+        return split_sections(f)
+
+def objectives(path):
+    with open(path, "rb") as f:
+        return markdown_objectives(f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chapters", type=int, default=200)
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--paragraphs", type=int, default=8)
+    parser.add_argument("--skip-render", action="store_true", help="skip the (slow) full render")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "notes.md")
+        write_notes(path, random.Random(0), args.chapters, args.sections, args.paragraphs)
+        print(f"{os.path.getsize(path) / 1024 / 1024:.1f} MiB of Markdown, {args.chapters} chapters")
+
+        if not args.skip_render:
+            measure("read + markdown.markdown()", lambda: render(path))
+        sections = measure("split_sections()", lambda: split(path))
+        found = measure("markdown_objectives()", lambda: objectives(path))
+        mapped = sum(1 for objective in found if objective["content_text"].startswith("## Chapter"))
+        print(f"  {len(sections)} sections, {len(found)} objectives, {mapped} mapped to their chapter")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Learning objective extraction: documented table parser vs LLM.
+
+Builds a PDF whose first page carries the objectives table from
+docs/PDF_FORMAT_EXAMPLE.md, extracts it with the real extractor and times
+the local table parser, then times the LLM path on the same text with the
+fake backend (set FAKE_LLM_LATENCY_MS to a realistic Gemini latency).
+
+Usage:
+    FAKE_LLM_LATENCY_MS=3000 python -m benchmarks.bench_objective_table [--pages 120] [--objectives 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+from app.services.ai_service import ai_service
+from app.services.extraction_service import extract_pages, format_pages
+from app.services.objective_table import parse_objective_table
+
+from .load_test import WORDS, make_pdf
+
+def make_course(rng, pages, objectives):
+    """Table page followed by ``pages`` pages of material split evenly between objectives"""
+    per_objective = max(1, pages // objectives)
+    table = ["Learning Objectives", "ID | Learning Objective | Priority | Page Range | Tags"]
+    for i in range(objectives):
+        first = 2 + i * per_objective
+        title = " ".join(rng.choice(WORDS) for _ in range(6)).capitalize()
+        tags = ", ".join(rng.sample(WORDS, 3))
+        table.append(f"LO-{i + 1:03d} | {title} | {rng.choice(['High', 'Medium', 'Low'])} | {first}-{first + per_objective - 1} | {tags}")
+    material = [
+        [" ".join(rng.choice(WORDS) for _ in range(10)).capitalize() + "." for _ in range(30)]
+        for _ in range(per_objective * objectives)
+    ]
+    return make_pdf([table] + material)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--objectives", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = format_pages(extract_pages(make_course(random.Random(0), args.pages, args.objectives)))
+    print(f"{args.pages + 1}-page document, {len(text) // 1024} KiB of extracted text")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        objectives = parse_objective_table(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    assert objectives and len(objectives) == args.objectives, objectives
+    chunked = sum(1 for objective in objectives if objective["content_text"].startswith("## Page"))
+    print(f"  table parser: {len(objectives)} objectives, {chunked} with page chunks, {min(timings):8.2f} ms")
+
+    started = time.perf_counter()
+    llm_objectives = asyncio.run(ai_service.parse_learning_objectives_from_content(text, "course.pdf"))
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"  LLM ({ai_service.backend.name}): {len(llm_objectives)} objectives, {elapsed:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
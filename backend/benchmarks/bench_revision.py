@@ -0,0 +1,64 @@
+"""
+Incremental revision planning benchmark.
+
+Builds a synthetic document of cleaned pages with objectives over
+consecutive page ranges, applies edits (changed, inserted and deleted
+pages), and reports how many objectives a revision regenerates vs a full
+reprocess, plus the time to diff and plan. No database or LLM needed.
+
+Usage:
+    python -m benchmarks.bench_revision [--pages 300] [--pages-per-objective 6] [--changes 2]
+"""
+
+import argparse
+import random
+import time
+
+from app.services.revision_service import PageDiff, plan_revision
+
+from .datagen import make_page_text
+
+def revise(pages, rng, changes, kind):
+    """A copy of ``pages`` with ``changes`` edits of one kind"""
+    revised = list(pages)
+    for _ in range(changes):
+        position = rng.randrange(len(revised))
+        if kind == "edit":
+            revised[position] = revised[position] + " Revised paragraph."
+        elif kind == "insert":
+            revised.insert(position, make_page_text(1500, seed=rng.random()))
+        else:
+            del revised[position]
+    return revised
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--pages-per-objective", type=int, default=6)
+    parser.add_argument("--changes", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [make_page_text(1500, seed=page) for page in range(args.pages)]
+    step = args.pages_per_objective
+    objectives = [
+        (f"lo-{start}", f"{start}-{min(start + step - 1, args.pages)}")
+        for start in range(1, args.pages + 1, step)
+    ]
+    print(f"{args.pages} pages, {len(objectives)} objectives, {args.changes} changes per revision")
+    print(f"  {'revision':<10} {'regenerated':>11} {'renumbered':>10} {'LLM work':>9} {'diff+plan ms':>13}")
+
+    for kind in ("edit", "insert", "delete"):
+        revised = revise(pages, rng, args.changes, kind)
+        started = time.perf_counter()
+        plan = plan_revision(objectives, PageDiff.between(pages, revised))
+        elapsed = (time.perf_counter() - started) * 1000
+        regenerated = len(plan.regenerate) + len(plan.remove)
+        print(
+            f"  {kind:<10} {regenerated:>11} {len(plan.renumber):>10} "
+            f"{regenerated / len(objectives):>8.1%} {elapsed:>13.2f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Full-text search latency over a seeded question bank.
+
+Builds the schema with ``alembic upgrade head`` (so the search indexes from
+migration 0006 exist), seeds users x objectives x questions and times
+/api/search queries for one user: a rare term, a common term, a phrase and
+a second page.
+
+Usage:
+    python -m benchmarks.bench_search [--users 100] [--objectives 20] [--questions 100]
+        [--database-url postgresql://...] [--output results.json]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import uuid
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import run_migrations
+from app.models.database import User, PDF, LearningObjective, Question
+from app.services.search_service import search_service
+
+from .datagen import WORDS, make_page_text
+from .harness import bench, write_results
+
+SEARCH_USER = "search-user-0"
+
+def seed(engine, users: int, objectives: int, questions: int, seed: int = 0, content_chars: int = 2000):
+    """Bulk-insert the bank; every question also carries one of 1000 rare topic words"""
+    rng = random.Random(seed)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        for u in range(users):
+            user_id = f"search-user-{u}"
+            pdf_id = f"search-pdf-{u}"
+            db.execute(insert(User), [{"id": user_id, "email": f"{user_id}@example.com", "name": user_id}])
+            db.execute(insert(PDF), [{"id": pdf_id, "user_id": user_id, "filename": "search.pdf", "file_path": "search.pdf"}])
+            lo_rows, question_rows = [], []
+            for o in range(objectives):
+                lo_id = f"search-lo-{u}-{o}"
+                lo_rows.append({
+                    "id": lo_id,
+                    "pdf_id": pdf_id,
+                    "title": " ".join(rng.choice(WORDS) for _ in range(4)).capitalize(),
+                    "priority": "High",
+                    "content_chunk": make_page_text(content_chars, seed=u * objectives + o),
+                })
+                for _ in range(questions):
+                    stem = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16)))
+                    question_rows.append({
+                        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                        "learning_objective_id": lo_id,
+                        "question_text": f"Which statement about {stem} applies to topic{rng.randrange(1000)}?",
+                        "options": ["A", "B", "C", "D"],
+                        "correct_answer": "A",
+                        "explanation": " ".join(rng.choice(WORDS) for _ in range(20)),
+                        "difficulty": "medium",
+                    })
+            db.execute(insert(LearningObjective), lo_rows)
+            db.execute(insert(Question), question_rows)
+            db.commit()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--objectives", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'search.db')}"
+
+    run_migrations(database_url)
+    engine = create_engine(database_url)
+    seed(engine, args.users, args.objectives, args.questions)
+    total = args.users * args.objectives * args.questions
+    print(f"Seeded {total} questions for {args.users} users\n")
+
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        _, second_page = search_service.search(db, SEARCH_USER, "cleanup")
+        queries = [
+            ("rare_term", "topic42", None),
+            ("common_term", "cleanup", None),
+            ("two_terms", "useEffect cleanup", None),
+            ("phrase", '"spacing interval"', None),
+            ("common_term_page_2", "cleanup", second_page),
+        ]
+        results = []
+        for name, query, cursor in queries:
+            results.append(bench(
+                f"search.{name}",
+                lambda: search_service.search(db, SEARCH_USER, query, cursor=cursor),
+                number=10,
+                questions=total,
+            ))
+    finally:
+        db.close()
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    if args.output:
+        write_results(args.output, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Response serialization benchmark per payload size.
+
+Compares the old path (jsonable_encoder + stdlib JSONResponse, used for
+routes without a response model) with the new one (pydantic-core
+serialization of the declared response model + ORJSONResponse).
+
+Usage:
+    python -m benchmarks.bench_serialization [--sizes 10 100 1000 5000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models.schemas import QuestionDetail, SessionResults
+
+from .harness import bench
+
+def question_payload(size):
+    """Shape of /api/questions/by-objective/{id}"""
+    return [
+        {
+            "id": f"question-{i}",
+            "question_text": f"Which statement about topic {i} is correct?" * 2,
+            "options": [f"Option {c} for question {i}" for c in "ABCD"],
+            "correct_answer": "A",
+            "explanation": "A detailed explanation of why the answer is correct. " * 5,
+            "difficulty": "medium",
+        }
+        for i in range(size)
+    ]
+
+def results_payload(size):
+    """Shape of /api/study/session/{id}/results, which carries datetimes"""
+    now = datetime.utcnow()
+    return {
+        "session": {
+            "id": "session-1",
+            "session_type": "study",
+            "started_at": now - timedelta(minutes=30),
+            "completed_at": now,
+            "total_questions": size,
+            "correct_answers": size // 2,
+            "accuracy": 50.0,
+        },
+        "attempts": [
+            {
+                "question_id": f"question-{i}",
+                "user_answer": "B",
+                "is_correct": i % 2 == 0,
+                "response_time": 4.2,
+                "difficulty_rating": "medium",
+            }
+            for i in range(size)
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    questions_adapter = TypeAdapter(List[QuestionDetail])
+    results_adapter = TypeAdapter(SessionResults)
+
+    for size in args.sizes:
+        number = max(1, 2000 // size)
+        for label, payload, adapter in [
+            ("by-objective", question_payload(size), questions_adapter),
+            ("session-results", results_payload(size), results_adapter),
+        ]:
+            bench(
+                f"{label}[{size}] jsonable_encoder+json",
+                lambda: JSONResponse(jsonable_encoder(payload)).body,
+                number=number
+            )
+            bench(
+                f"{label}[{size}] response_model+orjson",
+                lambda: ORJSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body,
+                number=number
+            )
+
+if __name__ == "__main__":
+    main()
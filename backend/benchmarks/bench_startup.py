@@ -0,0 +1,77 @@
+"""
+Cold-start benchmark: app import time and time-to-first-response.
+
+Each run starts a fresh interpreter, so module caches do not carry over.
+Import time is measured in-process around ``import main``; time-to-first-
+response is measured from spawning uvicorn until ``GET /`` answers 200.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+def measure_import() -> float:
+    """Seconds spent importing main in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def measure_first_response(timeout: float = 60.0) -> float:
+    """Seconds from spawning uvicorn until GET / returns 200"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"Server did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    first_responses = [measure_first_response() for _ in range(args.runs)]
+
+    print(f"{'metric':<22} {'median':>10} {'min':>10} {'max':>10}")
+    for name, samples in [("import main (s)", imports), ("first response (s)", first_responses)]:
+        print(f"{name:<22} {statistics.median(samples):>10.3f} {min(samples):>10.3f} {max(samples):>10.3f}")
+
+if __name__ == "__main__":
+    main()
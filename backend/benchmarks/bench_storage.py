@@ -0,0 +1,169 @@
+"""
+Document storage benchmark against an in-memory S3 stand-in.
+
+The stand-in is an httpx.MockTransport that implements PUT/GET/HEAD/DELETE
+with Range support and a fixed per-request latency, installed as the shared
+HTTP client, so the real S3StorageBackend (SigV4 signing included) and the
+local document cache are exercised without network access. Reports cold
+(download) vs cached reads, remote vs cached range reads, cache eviction
+under a size cap, and memory-mapped PDF parsing.
+
+Usage:
+    python -m benchmarks.bench_storage [--documents 20] [--size-kb 2048] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import tempfile
+import time
+
+from app.core.http_client import create_http_client, set_http_client
+from app.services.storage_backends import S3StorageBackend
+from app.services.storage_service import DocumentCache, StorageService
+
+class FakeS3:
+    """Objects in a dict; answers just enough of the S3 REST API"""
+
+    def __init__(self, latency_ms: float):
+        self.objects = {}
+        self.latency = latency_ms / 1000
+        self.requests = 0
+
+    async def handle(self, request):
+        import httpx
+
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if not request.headers.get("authorization", "").startswith("AWS4-HMAC-SHA256 "):
+            return httpx.Response(403)
+        path = request.url.path
+
+        if request.method == "PUT":
+            self.objects[path] = await request.aread()
+            return httpx.Response(200)
+        if request.method == "DELETE":
+            self.objects.pop(path, None)
+            return httpx.Response(204)
+
+        data = self.objects.get(path)
+        if data is None:
+            return httpx.Response(404)
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-length": str(len(data))})
+
+        byte_range = request.headers.get("range")
+        if byte_range:
+            first, last = byte_range.split("=")[1].split("-")
+            start, end = int(first), min(int(last) + 1, len(data))
+            if start >= len(data):
+                return httpx.Response(416)
+            return httpx.Response(206, content=data[start:end])
+        return httpx.Response(200, content=data)
+
+def make_pdf(pages: int) -> bytes:
+    import PyPDF2
+
+    writer = PyPDF2.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def timed(label: str, started: float, count: int = 1):
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<38} {elapsed * 1000 / count:9.2f} ms/op")
+
+async def run(args):
+    import httpx
+    import PyPDF2
+
+    fake = FakeS3(args.latency_ms)
+    set_http_client(create_http_client(httpx.MockTransport(fake.handle)))
+    backend = S3StorageBackend("http://s3.test", "documents", "us-east-1", "test-access", "test-secret")
+
+    rng = random.Random(0)
+    size = args.size_kb * 1024
+    keys = [f"pdfs/doc-{i}.pdf" for i in range(args.documents)]
+    payloads = {key: rng.randbytes(size) for key in keys}
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Cache large enough for everything
+        service = StorageService()
+        service.set_backend(backend, DocumentCache(cache_dir, max_bytes=size * args.documents * 2))
+        for key, data in payloads.items():
+            await backend.put(key, data)
+
+        print(f"{args.documents} documents of {args.size_kb} KiB, {args.latency_ms} ms per request")
+        requests_before = fake.requests
+        started = time.perf_counter()
+        for key in keys:
+            assert await service.read(key) == payloads[key]
+        timed("read, cold (download into cache)", started, len(keys))
+        started = time.perf_counter()
+        for key in keys:
+            assert await service.read(key) == payloads[key]
+        timed("read, cached", started, len(keys))
+        print(f"  requests to storage: {fake.requests - requests_before} for {2 * len(keys)} reads")
+
+        # Concurrent first reads of one document share a download
+        service.set_backend(backend, DocumentCache(os.path.join(cache_dir, "shared"), max_bytes=size * 4))
+        requests_before = fake.requests
+        results = await asyncio.gather(*(service.read(keys[0]) for _ in range(10)))
+        assert all(result == payloads[keys[0]] for result in results)
+        print(f"  10 concurrent cold reads -> {fake.requests - requests_before} download(s)")
+
+        # Range reads: a remote range request vs a seek in the cached file
+        remote = StorageService()
+        remote.set_backend(backend, DocumentCache(os.path.join(cache_dir, "empty"), max_bytes=size))
+        ranges = [(start, start + 4096) for start in (rng.randrange(size - 4096) for _ in range(50))]
+        started = time.perf_counter()
+        for start, end in ranges:
+            assert await remote.read_range(keys[0], start, end) == payloads[keys[0]][start:end]
+        timed("4 KiB range read, remote", started, len(ranges))
+        started = time.perf_counter()
+        for start, end in ranges:
+            assert await service.read_range(keys[0], start, end) == payloads[keys[0]][start:end]
+        timed("4 KiB range read, cached", started, len(ranges))
+
+        # Eviction keeps the cache under its cap, least recently used first
+        capacity = max(1, len(keys) // 2)
+        small = DocumentCache(os.path.join(cache_dir, "small"), max_bytes=size * capacity)
+        service.set_backend(backend, small)
+        for key in keys:
+            await service.read(key)
+        # Touch the oldest document again so it survives the next evictions
+        await service.read(keys[0])
+        cached = [key for key in keys if small.lookup(key)]
+        print(f"  cache capped at {capacity} of {len(keys)} documents holds {len(cached)}: {', '.join(cached)}")
+        assert small.total_bytes <= small.max_bytes and keys[0] in cached
+
+        # The PDF parser reads the cached file through a memory map
+        pdf = make_pdf(args.pdf_pages)
+        await backend.put("pdfs/sample.pdf", pdf)
+        service.set_backend(backend, DocumentCache(os.path.join(cache_dir, "pdf"), max_bytes=len(pdf) * 2))
+        await service.local_path("pdfs/sample.pdf")
+        started = time.perf_counter()
+        async with service.mapped("pdfs/sample.pdf") as mapped:
+            pages = len(PyPDF2.PdfReader(mapped).pages)
+        timed(f"parse {pages}-page PDF via mmap", started)
+        started = time.perf_counter()
+        pages = len(PyPDF2.PdfReader(io.BytesIO(await service.read("pdfs/sample.pdf"))).pages)
+        timed(f"parse {pages}-page PDF via read()", started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20, help="at least 1")
+    parser.add_argument("--size-kb", type=int, default=2048)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--pdf-pages", type=int, default=200)
+    args = parser.parse_args()
+    if args.documents < 1:
+        parser.error("--documents must be at least 1")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
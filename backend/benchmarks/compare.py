@@ -0,0 +1,51 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Exits non-zero if any benchmark's median got slower than the threshold.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import sys
+
+def load(path):
+    with open(path) as f:
+        payload = json.load(f)
+    return payload, {r["name"]: r for r in payload["results"]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    base_meta, base = load(args.baseline)
+    cand_meta, cand = load(args.candidate)
+    print(f"baseline {base_meta['commit']}  vs  candidate {cand_meta['commit']}\n")
+    print(f"{'benchmark':<48} {'baseline us':>12} {'candidate us':>13} {'change':>8}")
+
+    regressions = []
+    for name in sorted(set(base) | set(cand)):
+        if name not in base or name not in cand:
+            print(f"{name:<48} {'only in ' + ('candidate' if name in cand else 'baseline'):>35}")
+            continue
+        old = base[name]["median_s"]
+        new = cand[name]["median_s"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<48} {old * 1e6:>12.1f} {new * 1e6:>13.1f} {change:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regressions above {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Seeded synthetic data generators for the benchmark suite."""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from app.models.database import LearningObjective, Question, StudySession
+
+WORDS = (
+    "memory retrieval spacing interval review recall schedule stability difficulty "
+    "retention forgetting curve practice testing feedback encoding consolidation "
+    "useEffect cleanup component render state hook dependency closure"
+).split()
+
+def make_questions(count, seed=0, objectives=50):
+    """Transient Question objects with learning objectives, ~half of them due"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    los = [
+        LearningObjective(id=f"lo-{i}", title=f"Objective {i}", priority=rng.choice(["High", "Medium", "Low"]))
+        for i in range(objectives)
+    ]
+    questions = []
+    for i in range(count):
+        reviewed = rng.random() < 0.8
+        question = Question(
+            id=str(uuid.UUID(int=rng.getrandbits(128))),
+            question_text=f"Question {i}?",
+            stability=rng.uniform(0.5, 30.0),
+            difficulty_rating=rng.uniform(1.0, 10.0),
+            last_reviewed=now - timedelta(days=rng.randint(1, 60)) if reviewed else None,
+            next_review=now + timedelta(days=rng.randint(-30, 30)) if reviewed else None,
+            review_count=rng.randint(1, 20) if reviewed else 0,
+        )
+        question.learning_objective = los[i % objectives]
+        questions.append(question)
+    return questions
+
+def make_sessions(user_id, days, seed=0, per_day=2, gap_every=0):
+    """Completed StudySession rows covering ``days`` days back from today"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    sessions = []
+    for day in range(days):
+        if gap_every and day and day % gap_every == 0:
+            continue
+        for _ in range(per_day):
+            completed = now - timedelta(days=day, minutes=rng.randint(0, 600))
+            total = rng.randint(5, 30)
+            correct = rng.randint(0, total)
+            sessions.append(StudySession(
+                id=str(uuid.UUID(int=rng.getrandbits(128))),
+                user_id=user_id,
+                session_type="study",
+                started_at=completed - timedelta(minutes=10),
+                completed_at=completed,
+                total_questions=total,
+                correct_answers=correct,
+                accuracy=correct / total * 100,
+            ))
+    return sessions
+
+def make_page_text(chars, seed=0):
+    """Raw PDF-extraction-like text: camelCase joins, stray numbers, ragged whitespace"""
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    while size < chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16)))
+        chunk = sentence.capitalize() + rng.choice([". ", "! ", "? ", ".\n", "\n\n   "])
+        if rng.random() < 0.05:
+            chunk += f"\n{rng.randint(1, 400)}\n"
+        parts.append(chunk)
+        size += len(chunk)
+    return "".join(parts)
+
+def make_generated_questions(count, seed=0, invalid_ratio=0.1):
+    """LLM-style question dicts, a fraction of them invalid"""
+    rng = random.Random(seed)
+    questions = []
+    for i in range(count):
+        question = {
+            "question_text": f"Which statement about {rng.choice(WORDS)} is correct ({i})?",
+            "option_a": "Option A",
+            "option_b": "Option B",
+            "option_c": "Option C",
+            "option_d": "Option D",
+            "correct_answer": rng.choice("ABCD"),
+            "explanation": "Because it is.",
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+        }
+        if rng.random() < invalid_ratio:
+            question[rng.choice(["correct_answer", "option_c", "explanation"])] = rng.choice(["", "E"])
+        questions.append(question)
+    return questions
+
+def make_question_texts(count, seed=0):
+    """Distinct question stems of 10-20 words"""
+    rng = random.Random(seed)
+    return [
+        f"Which of the following best explains {' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 18)))} ({i})?"
+        for i in range(count)
+    ]
@@ -0,0 +1,51 @@
+"""Shared timing and result-file helpers for the benchmark suite."""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import datetime
+
+def bench(name, func, number=1, repeat=5, setup=None, **params):
+    """
+    Time ``func`` and return a result record.
+    ``number`` calls are timed together, ``repeat`` times; times are per call.
+    """
+    if setup is not None:
+        setup()
+    timer = timeit.Timer(func, timer=time.perf_counter)
+    samples = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    result = {
+        "name": name,
+        "params": params,
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.mean(samples),
+    }
+    print(f"{name:<48} {result['median_s'] * 1e6:>14.1f} us/op  (min {result['min_s'] * 1e6:.1f})")
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def write_results(path, results):
+    """Write results with enough metadata to compare runs across commits"""
+    payload = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\nWrote {len(results)} results to {path}")
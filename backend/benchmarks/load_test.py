@@ -0,0 +1,226 @@
+"""
+End-to-end load test against the full API, fully offline.
+
+Each virtual user uploads a generated PDF, polls processing status, fetches
+due questions, answers them in a study session, completes the session and
+reads gamification stats. By default a local uvicorn is started with the
+fake LLM backend on a fresh SQLite database; pass --base-url to target an
+already running server (e.g. one on a local Postgres with LLM_BACKEND=fake).
+
+Usage:
+    python -m benchmarks.load_test [--users 20] [--iterations 1] [--answers 10]
+        [--llm-latency-ms 500] [--llm-jitter-ms 200] [--base-url http://...]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = (
+    "memory retrieval spacing interval review recall schedule stability difficulty "
+    "retention forgetting curve practice testing feedback encoding consolidation "
+    "concept principle example application analysis evaluation synthesis"
+).split()
+
+def make_pdf(pages):
+    """Build a minimal text-only PDF with one page per list of lines"""
+    def escape(line):
+        return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        page_number = len(objects) + 1
+        kids.append(f"{page_number} 0 R")
+        stream = "BT /F1 11 Tf 50 750 Td 14 TL " + " ".join(f"({escape(l)}) Tj T*" for l in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def make_document(rng, pages=4, lines_per_page=30):
+    return make_pdf([
+        [" ".join(rng.choice(WORDS) for _ in range(10)).capitalize() + "." for _ in range(lines_per_page)]
+        for _ in range(pages)
+    ])
+
+class Recorder:
+    """Latency samples and error counts per endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, name, request):
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response.json()
+
+    def report(self, elapsed):
+        def percentile(samples, p):
+            return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+        print(f"\n{'endpoint':<10} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+        for name in ["upload", "status", "due", "start", "answer", "complete", "stats"]:
+            samples = sorted(self.latencies.get(name, []))
+            if not samples:
+                print(f"{name:<10} {0:>7} {self.errors[name]:>7}")
+                continue
+            print(
+                f"{name:<10} {len(samples):>7} {self.errors[name]:>7} "
+                f"{percentile(samples, 50) * 1000:>9.1f} {percentile(samples, 95) * 1000:>9.1f} "
+                f"{percentile(samples, 99) * 1000:>9.1f} {len(samples) / elapsed:>8.1f}"
+            )
+        total = sum(len(s) for s in self.latencies.values())
+        print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+async def virtual_user(client, recorder, user_number, args):
+    rng = random.Random(user_number)
+    user_id = f"load-user-{user_number}"
+
+    for _ in range(args.iterations):
+        upload = await recorder.call("upload", client.post(
+            "/api/pdf/upload",
+            params={"user_id": user_id},
+            files={"file": ("notes.pdf", make_document(rng), "application/pdf")}
+        ))
+
+        if upload:
+            deadline = time.perf_counter() + args.processing_timeout
+            while time.perf_counter() < deadline:
+                status = await recorder.call("status", client.get(f"/api/pdf/status/{upload['pdf_id']}"))
+                if status and status["processed"]:
+                    break
+                await asyncio.sleep(args.poll_interval)
+
+        due = await recorder.call("due", client.get("/api/questions/due", params={"user_id": user_id})) or []
+
+        session = await recorder.call("start", client.post(
+            "/api/study/session/start",
+            params={"user_id": user_id, "session_type": "study"}
+        ))
+        if not session:
+            continue
+
+        for question in due[:args.answers]:
+            await recorder.call("answer", client.post(
+                f"/api/study/session/{session['session_id']}/answer",
+                json={
+                    "question_id": question["id"],
+                    "user_answer": rng.choice("ABCD"),
+                    "response_time": rng.uniform(2, 20),
+                    "difficulty_rating": rng.choice(["easy", "medium", "hard"])
+                }
+            ))
+
+        await recorder.call("complete", client.post(f"/api/study/session/{session['session_id']}/complete"))
+        await recorder.call("stats", client.get(f"/api/gamification/stats/{user_id}"))
+
+def start_server(args, workdir):
+    """Start uvicorn on a fresh SQLite database with the fake LLM backend"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        AUTO_MIGRATE="true",
+        LLM_BACKEND="fake",
+        FAKE_LLM_LATENCY_MS=str(args.llm_latency_ms),
+        FAKE_LLM_JITTER_MS=str(args.llm_jitter_ms),
+        FASTAPI_RELOAD="false",
+        # Every virtual user comes from 127.0.0.1, so per-IP buckets would throttle the whole run
+        RATE_LIMIT_ENABLED="false",
+    )
+    # Run from the temp dir so uploads and .env lookups stay out of the repo
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+async def run(args, base_url):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(client, recorder, n, args) for n in range(args.users)))
+        elapsed = time.perf_counter() - started
+    recorder.report(elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=1, help="scenario runs per user")
+    parser.add_argument("--answers", type=int, default=10, help="answers submitted per session")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=200)
+    parser.add_argument("--processing-timeout", type=float, default=300)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--base-url", default=None, help="target a running server instead of starting one")
+    args = parser.parse_args()
+
+    if args.base_url:
+        asyncio.run(run(args, args.base_url))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server, base_url = start_server(args, workdir)
+        try:
+            asyncio.run(run(args, base_url))
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
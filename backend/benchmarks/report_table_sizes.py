@@ -0,0 +1,150 @@
+"""
+Storage and load-size report for the large text columns.
+
+Prints per-table on-disk size, per-column raw vs stored bytes (Postgres
+reports TOAST-compressed sizes; a zlib estimate shows what the text
+compresses to) and the bytes and time the due-questions query spends
+materializing rows with every column loaded vs the default deferred load.
+
+Without --database-url it seeds a temporary SQLite database at head;
+--seed does the same for an empty database at --database-url. Point it at
+a real database before and after ``alembic upgrade`` to compare.
+
+Usage:
+    python -m benchmarks.report_table_sizes [--database-url postgresql://...]
+        [--seed] [--users 20] [--objectives 20] [--questions 100] [--content-chars 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import zlib
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker, contains_eager, undefer
+
+from app.core.database import run_migrations
+from app.models.database import Base, Question, LearningObjective, PDF
+
+from .bench_search import seed
+
+TABLES = ["learning_objectives", "questions"]
+
+# (table, column) pairs that are deferred and compressed
+LARGE_COLUMNS = [
+    ("learning_objectives", "content_chunk"),
+    ("questions", "explanation"),
+    ("questions", "options"),
+]
+
+def table_sizes(conn):
+    """(object, bytes) per table, index and search shadow table"""
+    if conn.dialect.name == "sqlite":
+        return conn.exec_driver_sql(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE 'questions%' OR name LIKE 'learning_objectives%' "
+            "OR name LIKE 'ix_questions%' OR name LIKE 'ix_learning_objectives%' "
+            "OR name LIKE 'sqlite_autoindex_questions%' OR name LIKE 'sqlite_autoindex_learning_objectives%' "
+            "GROUP BY name ORDER BY name"
+        ).fetchall()
+    rows = []
+    for table in TABLES:
+        heap, toast, indexes = conn.execute(text(
+            "SELECT pg_relation_size(c.oid), COALESCE(pg_total_relation_size(c.reltoastrelid), 0), pg_indexes_size(c.oid) "
+            "FROM pg_class c WHERE c.relname = :table"
+        ), {"table": table}).one()
+        rows += [(f"{table} (heap)", heap), (f"{table} (toast)", toast), (f"{table} (indexes)", indexes)]
+    return rows
+
+def column_sizes(conn, table, column, sample=2000):
+    """(rows, raw bytes, stored bytes, zlib bytes over a sample scaled up)"""
+    if conn.dialect.name == "postgresql":
+        rows, raw, stored = conn.execute(text(
+            f"SELECT COUNT(*), COALESCE(SUM(octet_length({column}::text)), 0), COALESCE(SUM(pg_column_size({column})), 0) "
+            f"FROM {table}"
+        )).one()
+    else:
+        rows, raw = conn.execute(text(
+            f"SELECT COUNT(*), COALESCE(SUM(length(CAST({column} AS BLOB))), 0) FROM {table}"
+        )).one()
+        stored = raw
+    values = [value for (value,) in conn.execute(text(f"SELECT CAST({column} AS TEXT) FROM {table} LIMIT {sample}"))]
+    sample_raw = sum(len((value or "").encode("utf-8")) for value in values)
+    sample_zlib = sum(len(zlib.compress((value or "").encode("utf-8"))) for value in values if value)
+    estimate = int(raw * sample_zlib / sample_raw) if sample_raw else 0
+    return rows, raw, stored, estimate
+
+def loaded_bytes(instances):
+    """Approximate bytes held by the loaded attribute values"""
+    total = 0
+    for instance in instances:
+        for key, value in instance.__dict__.items():
+            # Skip SQLAlchemy state and related objects
+            if key.startswith("_") or value is None or isinstance(value, Base):
+                continue
+            total += len(str(value).encode("utf-8"))
+    return total
+
+def due_query(db, user_id, load_all):
+    query = db.query(Question).join(Question.learning_objective).join(LearningObjective.pdf).filter(
+        PDF.user_id == user_id
+    ).options(contains_eager(Question.learning_objective))
+    if load_all:
+        query = query.options(undefer("*"), contains_eager(Question.learning_objective).undefer("*"))
+    return query.all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", default=None, help="defaults to a seeded temporary SQLite file")
+    parser.add_argument("--user-id", default="search-user-0", help="user for the due-questions load")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--objectives", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=100)
+    parser.add_argument("--content-chars", type=int, default=20000)
+    parser.add_argument("--seed", action="store_true", help="migrate and seed --database-url (an empty database)")
+    args = parser.parse_args()
+
+    tmpdir = None
+    database_url = args.database_url
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'sizes.db')}"
+    if args.database_url is None or args.seed:
+        run_migrations(database_url)
+        seed(create_engine(database_url), args.users, args.objectives, args.questions, content_chars=args.content_chars)
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        print(f"{'object':<48} {'MB':>10}")
+        for name, size in table_sizes(conn):
+            print(f"{name:<48} {size / 1e6:>10.2f}")
+
+        print(f"\n{'column':<36} {'rows':>8} {'raw MB':>10} {'stored MB':>10} {'zlib MB':>10}")
+        for table, column in LARGE_COLUMNS:
+            rows, raw, stored, estimate = column_sizes(conn, table, column)
+            print(f"{table + '.' + column:<36} {rows:>8} {raw / 1e6:>10.2f} {stored / 1e6:>10.2f} {estimate / 1e6:>10.2f}")
+
+    Session = sessionmaker(bind=engine)
+    print(f"\n{'due-questions load':<36} {'rows':>8} {'MB':>10} {'ms':>10}")
+    for label, load_all in [("all columns", True), ("deferred (default)", False)]:
+        db = Session()
+        try:
+            # Best of three, each into an empty identity map
+            elapsed = float("inf")
+            for _ in range(3):
+                db.expunge_all()
+                start = time.perf_counter()
+                questions = due_query(db, args.user_id, load_all)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            objectives = {q.learning_objective_id: q.learning_objective for q in questions}.values()
+            size = loaded_bytes(questions) + loaded_bytes(objectives)
+            print(f"{label:<36} {len(questions):>8} {size / 1e6:>10.2f} {elapsed * 1000:>10.1f}")
+        finally:
+            db.close()
+
+    engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,69 @@
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from contextlib import asynccontextmanager
+import asyncio
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import uvicorn
-from typing import List, Optional
-import os
+from fastapi.responses import Response, ORJSONResponse
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from sqlalchemy import text
 from dotenv import load_dotenv
 
 from app.core.config import settings
-from app.api.routes import pdf, questions, study, auth, process, email, gamification
-from app.core.database import get_db
-from app.services.ai_service import AIService
-from app.models.database import Base, engine
+from app.api.routes import pdf, questions, study, auth, process, email, gamification, search
+from app.core.database import engine, read_engine, run_migrations
+from app.core.http_client import start_http_client, close_http_client
+from app.core.metrics import RequestMetricsMiddleware, register_db_pool_collector
+from app.core.query_stats import QueryStatsMiddleware
+from app.services.ai_service import ai_service
+from app.services.outbox_sender import outbox_sender
+from app.services.digest_service import digest_service
+from app.services.question_buffer import question_buffer
 
 # Load environment variables
 load_dotenv()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup work that must not run at import time"""
+    # Schema is managed by Alembic migrations; AUTO_MIGRATE applies them at boot
+    if settings.auto_migrate:
+        await asyncio.to_thread(run_migrations)
+    
+    # Build the Gemini model off the event loop so the server accepts requests
+    # immediately; a request that needs it first waits in configure()
+    warm_up = asyncio.create_task(asyncio.to_thread(ai_service.configure))
+    
+    # Pooled HTTP/2 client shared by Resend and Supabase storage calls
+    await start_http_client()
+    
+    # Deliver queued emails in the background; without a Resend key they stay queued
+    if settings.resend_api_key:
+        outbox_sender.start()
+    else:
+        print("RESEND_API_KEY not configured, outbox sender disabled")
+    
+    # Generate questions ahead of demand for objectives running low on unseen ones
+    question_buffer.start()
+    
+    # Daily cards-due reminders; run only one API instance with DIGEST_ENABLED
+    if settings.digest_enabled:
+        digest_service.start()
+    
+    yield
+    
+    await digest_service.stop()
+    await question_buffer.stop()
+    await outbox_sender.stop()
+    await close_http_client()
+    await warm_up
 
 app = FastAPI(
     title="RecallForge API",
     description="AI-powered spaced repetition learning system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson renders datetimes in the same ISO format as the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -36,8 +77,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-N-Plus-One", "X-Next-Cursor", "Retry-After"],
 )
 
+# Per-request SQL query counting and N+1 detection
+app.add_middleware(QueryStatsMiddleware)
+
+# Per-route latency and in-flight requests (outermost, so it times everything)
+app.add_middleware(RequestMetricsMiddleware)
+
+register_db_pool_collector({"primary": engine, "replica": read_engine} if read_engine is not engine else {"primary": engine})
+
 # Include routers
 app.include_router(pdf.router, prefix="/api/pdf", tags=["PDF"])
 app.include_router(questions.router, prefix="/api/questions", tags=["Questions"])
@@ -46,6 +96,7 @@ app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(process.router, prefix="/api/process", tags=["Processing"])
 app.include_router(email.router, prefix="/api/email", tags=["Email"])
 app.include_router(gamification.router, prefix="/api/gamification", tags=["Gamification"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
 
 @app.get("/")
 async def root():
@@ -56,15 +107,32 @@ async def root():
     }
 
 @app.get("/health")
-async def health_check():
+def health_check():
+    # Sync on purpose: FastAPI runs it in the threadpool, so a stalled
+    # database blocks a worker thread rather than the event loop
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        database = "connected"
+    except Exception as e:
+        print(f"Health check database error: {str(e)}")
+        database = "unavailable"
+    
     return {
-        "status": "healthy", 
+        "status": "healthy" if database == "connected" else "degraded", 
         "version": "1.0.0",
-        "database": "connected",
-        "ai_service": "ready"
+        "database": database,
+        "ai_service": "ready" if ai_service.is_configured else "not_configured"
     }
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "main:app",
         host=settings.fastapi_host,
@@ -0,0 +1,99 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations existed already have these tables;
+mark them with ``alembic stamp 0001`` and then ``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "pdfs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id")),
+        sa.Column("filename", sa.String()),
+        sa.Column("file_path", sa.String()),
+        sa.Column("uploaded_at", sa.DateTime()),
+        sa.Column("processed", sa.Boolean()),
+    )
+
+    op.create_table(
+        "learning_objectives",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("pdf_id", sa.String(), sa.ForeignKey("pdfs.id")),
+        sa.Column("title", sa.String()),
+        sa.Column("priority", sa.String()),
+        sa.Column("page_range", sa.String()),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("content_chunk", sa.Text()),
+        sa.Column("mastery_percent", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("learning_objective_id", sa.String(), sa.ForeignKey("learning_objectives.id")),
+        sa.Column("question_text", sa.Text()),
+        sa.Column("options", sa.JSON()),
+        sa.Column("correct_answer", sa.String()),
+        sa.Column("explanation", sa.Text()),
+        sa.Column("difficulty", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("stability", sa.Float()),
+        sa.Column("difficulty_rating", sa.Float()),
+        sa.Column("last_reviewed", sa.DateTime()),
+        sa.Column("next_review", sa.DateTime()),
+        sa.Column("review_count", sa.Integer()),
+    )
+
+    op.create_table(
+        "study_sessions",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id")),
+        sa.Column("session_type", sa.String()),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("total_questions", sa.Integer()),
+        sa.Column("correct_answers", sa.Integer()),
+        sa.Column("accuracy", sa.Float()),
+    )
+
+    op.create_table(
+        "question_attempts",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("session_id", sa.String(), sa.ForeignKey("study_sessions.id")),
+        sa.Column("question_id", sa.String(), sa.ForeignKey("questions.id")),
+        sa.Column("user_answer", sa.String()),
+        sa.Column("is_correct", sa.Boolean()),
+        sa.Column("response_time", sa.Float()),
+        sa.Column("difficulty_rating", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+def downgrade():
+    op.drop_table("question_attempts")
+    op.drop_table("study_sessions")
+    op.drop_table("questions")
+    op.drop_table("learning_objectives")
+    op.drop_table("pdfs")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
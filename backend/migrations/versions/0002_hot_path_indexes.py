@@ -0,0 +1,36 @@
+"""Indexes for the hot-path foreign key lookups
+
+On Postgres the indexes are built CONCURRENTLY so existing tables stay
+writable during the upgrade.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_pdfs_user_id", "pdfs", ["user_id"]),
+    ("ix_learning_objectives_pdf_id", "learning_objectives", ["pdf_id"]),
+    ("ix_questions_learning_objective_id", "questions", ["learning_objective_id"]),
+    ("ix_question_attempts_session_id", "question_attempts", ["session_id"]),
+    ("ix_question_attempts_question_id", "question_attempts", ["question_id"]),
+    ("ix_study_sessions_user_id_completed_at", "study_sessions", ["user_id", "completed_at"]),
+]
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""Composite indexes for keyset pagination on (parent, created_at, id)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ("ix_questions_learning_objective_id_created_at_id", "questions", ["learning_objective_id", "created_at", "id"]),
+    ("ix_learning_objectives_pdf_id_created_at_id", "learning_objectives", ["pdf_id", "created_at", "id"]),
+    ("ix_question_attempts_session_id_created_at_id", "question_attempts", ["session_id", "created_at", "id"]),
+]
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
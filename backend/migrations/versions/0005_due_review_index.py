@@ -0,0 +1,26 @@
+"""Index for counting due questions per learning objective
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_questions_learning_objective_id_next_review",
+            "questions",
+            ["learning_objective_id", "next_review"],
+            postgresql_concurrently=True
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_questions_learning_objective_id_next_review", table_name="questions", postgresql_concurrently=True)
@@ -0,0 +1,117 @@
+"""Full-text search over questions and learning objectives
+
+Postgres gets a stored, generated ``search_vector`` tsvector column on each
+table plus a GIN index; the database keeps the vector current on every
+insert and update. Adding a stored generated column rewrites the table, so
+run this revision in a quiet window on large databases.
+
+SQLite (local development, benchmarks) gets contentless FTS5 tables kept in
+sync by triggers. Each row also indexes an ``owner`` token derived from the
+owning user's id, so a search only walks that user's postings instead of
+every user's. Rows share the implicit rowid with their table; VACUUM may
+renumber rowids of tables without an INTEGER PRIMARY KEY, so downgrade and
+upgrade this revision after a VACUUM to rebuild the indexes.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Language-neutral parsing: material is mixed Indonesian and English, and
+# identifiers such as useEffect must match as written. Must stay in sync
+# with SEARCH_CONFIG in app/services/search_service.py
+SEARCH_CONFIG = "simple"
+
+# (table, weighted-A column, weighted-B column)
+SEARCH_TABLES = [
+    ("questions", "question_text", "explanation"),
+    ("learning_objectives", "title", "content_chunk"),
+]
+
+def _upgrade_postgresql():
+    for table, primary, secondary in SEARCH_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({primary}, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({secondary}, '')), 'B')"
+            f") STORED"
+        )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table, _, _ in SEARCH_TABLES:
+            op.create_index(
+                f"ix_{table}_search_vector",
+                table,
+                ["search_vector"],
+                postgresql_using="gin",
+                postgresql_concurrently=True
+            )
+
+# Owner token of a row, as SQL over the row alias; must stay in sync with
+# owner_token() in app/services/search_service.py
+SQLITE_OWNER = {
+    "questions": (
+        "(SELECT 'u' || hex(p.user_id) FROM learning_objectives lo JOIN pdfs p ON p.id = lo.pdf_id "
+        "WHERE lo.id = {row}.learning_objective_id)"
+    ),
+    "learning_objectives": "(SELECT 'u' || hex(p.user_id) FROM pdfs p WHERE p.id = {row}.pdf_id)",
+}
+
+def _upgrade_sqlite():
+    for table, primary, secondary in SEARCH_TABLES:
+        fts = f"{table}_fts"
+        columns = f"owner, {primary}, {secondary}"
+        owner = SQLITE_OWNER[table]
+        new_values = f"new.rowid, {owner.format(row='new')}, new.{primary}, new.{secondary}"
+        # Contentless tables need the indexed values again to delete a row
+        old_values = f"'delete', old.rowid, {owner.format(row='old')}, old.{primary}, old.{secondary}"
+        op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='')")
+        op.execute(
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts} (rowid, {columns}) VALUES ({new_values}); "
+            f"END"
+        )
+        # Only text changes touch the index, not review bookkeeping
+        op.execute(
+            f"CREATE TRIGGER {fts}_update AFTER UPDATE OF {primary}, {secondary} ON {table} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ({old_values}); "
+            f"INSERT INTO {fts} (rowid, {columns}) VALUES ({new_values}); "
+            f"END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ({old_values}); "
+            f"END"
+        )
+        op.execute(
+            f"INSERT INTO {fts} (rowid, {columns}) "
+            f"SELECT t.rowid, {owner.format(row='t')}, t.{primary}, t.{secondary} FROM {table} t"
+        )
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        _upgrade_postgresql()
+    elif dialect == "sqlite":
+        _upgrade_sqlite()
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            for table, _, _ in reversed(SEARCH_TABLES):
+                op.drop_index(f"ix_{table}_search_vector", table_name=table, postgresql_concurrently=True)
+        for table, _, _ in reversed(SEARCH_TABLES):
+            op.drop_column(table, "search_vector")
+    elif dialect == "sqlite":
+        for table, _, _ in reversed(SEARCH_TABLES):
+            fts = f"{table}_fts"
+            for trigger in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
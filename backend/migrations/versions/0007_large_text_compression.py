@@ -0,0 +1,50 @@
+"""LZ4 compression for large text columns
+
+Postgres stores values of these columns out of line (TOAST), compressed with
+pglz, once a row grows past ~2 KB; they are decompressed only when a query
+actually selects the column. LZ4 (Postgres 14+) compresses and decompresses
+several times faster at a similar ratio. The change is catalog-only: new
+and rewritten values use LZ4, existing values stay pglz-compressed and
+readable, so no table rewrite or lock beyond the ALTER itself.
+
+Compression stays inside the database so the generated full-text search
+columns (migration 0006) keep reading plain text. SQLite has no column
+compression; nothing to do there.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# (table, column)
+COMPRESSED_COLUMNS = [
+    ("learning_objectives", "content_chunk"),
+    ("questions", "explanation"),
+    ("questions", "options"),
+]
+
+def _set_compression(method: str):
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or bind.dialect.server_version_info < (14,):
+        return
+    for table, column in COMPRESSED_COLUMNS:
+        # Servers built without LZ4 keep pglz rather than failing the upgrade
+        op.execute(
+            f"DO $$ BEGIN "
+            f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION {method}; "
+            f"EXCEPTION WHEN feature_not_supported THEN "
+            f"RAISE NOTICE 'compression method {method} not supported, {table}.{column} unchanged'; "
+            f"END $$"
+        )
+
+def upgrade():
+    _set_compression("lz4")
+
+def downgrade():
+    _set_compression("pglz")
@@ -0,0 +1,35 @@
+"""Persisted per-page PDF extraction cache
+
+``extracted_pages`` holds the cleaned text of every page, keyed by the
+SHA-256 of the file and the extractor version, so reprocessing a document
+skips PDF parsing. ``pdfs.content_hash`` records the hash at upload, so a
+cached document is not even read from storage. Rows for documents uploaded
+before this revision are filled in on their next processing run.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("pdfs", sa.Column("content_hash", sa.String(64)))
+    op.create_table(
+        "extracted_pages",
+        sa.Column("document_hash", sa.String(64), primary_key=True),
+        sa.Column("extractor_version", sa.Integer(), primary_key=True),
+        sa.Column("page_number", sa.Integer(), primary_key=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+def downgrade():
+    op.drop_table("extracted_pages")
+    with op.batch_alter_table("pdfs") as batch_op:
+        batch_op.drop_column("content_hash")
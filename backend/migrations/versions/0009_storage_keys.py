@@ -0,0 +1,60 @@
+"""Rewrite legacy pdfs.file_path values as storage keys
+
+Before pluggable storage, uploads were saved to
+``os.path.join(UPLOAD_DIR, f"{id}_{filename}")`` and that path (e.g.
+"uploads/<id>_notes.pdf") was stored in ``pdfs.file_path``. The local
+backend resolves keys under UPLOAD_DIR, so those rows would resolve to
+"uploads/uploads/..." and fail with ObjectNotFound. Paths inside
+UPLOAD_DIR become keys relative to it ("<id>_notes.pdf"); the files stay
+where they are. Paths outside UPLOAD_DIR are left alone.
+
+Run with the UPLOAD_DIR (and working directory, for a relative
+UPLOAD_DIR) the application used for those uploads. Deployments switching
+to STORAGE_BACKEND=s3 must copy the files into the bucket under the same
+keys.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+pdfs = sa.table("pdfs", sa.column("id", sa.String), sa.column("file_path", sa.String))
+
+def _key(file_path: str, upload_dir: str):
+    """Storage key of a legacy path inside upload_dir, or None"""
+    relative = os.path.relpath(os.path.abspath(file_path), upload_dir)
+    if relative == "." or relative.startswith(".." + os.sep) or relative == "..":
+        return None
+    return relative.replace(os.sep, "/")
+
+def upgrade():
+    bind = op.get_bind()
+    upload_dir = os.path.abspath(settings.upload_dir)
+    rows = bind.execute(sa.select(pdfs.c.id, pdfs.c.file_path).where(pdfs.c.file_path.isnot(None))).all()
+    for pdf_id, file_path in rows:
+        # Keys written since pluggable storage
+        if file_path.startswith("pdfs/"):
+            continue
+        key = _key(file_path, upload_dir)
+        if key and key != file_path:
+            bind.execute(pdfs.update().where(pdfs.c.id == pdf_id).values(file_path=key))
+
+def downgrade():
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(pdfs.c.id, pdfs.c.file_path).where(pdfs.c.file_path.isnot(None))).all()
+    for pdf_id, file_path in rows:
+        if not file_path.startswith("pdfs/"):
+            bind.execute(
+                pdfs.update().where(pdfs.c.id == pdf_id).values(file_path=os.path.join(settings.upload_dir, file_path))
+            )
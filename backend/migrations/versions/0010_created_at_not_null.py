@@ -0,0 +1,50 @@
+"""Backfill and require created_at on keyset-paginated tables
+
+Keyset pagination orders by (created_at, id) and encodes created_at in the
+cursor, so a NULL created_at breaks both the cursor and the ordering
+(NULLs sort first on SQLite, last on Postgres). Rows written before the
+ORM default existed get the parent's timestamp, or the epoch when the
+parent has none, so they page first in a stable order.
+
+Postgres also gets NOT NULL. SQLite cannot alter a column in place, and
+rebuilding questions and learning_objectives would drop the full-text
+search triggers of revision 0006, so there the ORM default is the guard.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+EPOCH = "1970-01-01 00:00:00"
+
+# (table, parent table, foreign key column, parent timestamp); objectives
+# come before questions so questions inherit backfilled objective timestamps
+TABLES = [
+    ("learning_objectives", "pdfs", "pdf_id", "uploaded_at"),
+    ("questions", "learning_objectives", "learning_objective_id", "created_at"),
+    ("question_attempts", "study_sessions", "session_id", "started_at"),
+]
+
+def upgrade():
+    for table, parent, fk, parent_timestamp in TABLES:
+        op.execute(
+            f"UPDATE {table} SET created_at = coalesce("
+            f"(SELECT parent.{parent_timestamp} FROM {parent} parent WHERE parent.id = {table}.{fk}), "
+            f"'{EPOCH}') WHERE created_at IS NULL"
+        )
+
+    if op.get_bind().dialect.name == "postgresql":
+        for table, *_ in TABLES:
+            op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=False)
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        for table, *_ in TABLES:
+            op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,84 @@
+"""Recompress existing large text values with LZ4
+
+Revision 0007 only switched the columns' compression method in the
+catalog; values written before it stay pglz-compressed until they are
+rewritten. VACUUM FULL and CLUSTER copy compressed values as they are, so
+this revision rewrites them: batches of rows whose value is still pglz
+are updated to a new copy of the same value (``col || ''``,
+``col::text::json``), which Postgres compresses with the column's method.
+
+Each batch commits on its own, so locks are held briefly and an
+interrupted upgrade resumes where it stopped. Expect roughly one table
+rewrite of I/O, plus the generated search_vector columns (0006) being
+recomputed; run it in a quiet window on large databases. To run it
+outside a deploy, upgrade to 0010 first and then to this revision
+separately; ``alembic upgrade 0011 --sql`` is not supported (the batches
+depend on data).
+
+Skipped when the column is not LZ4 (Postgres < 14, or a server built
+without LZ4, where 0007 left pglz in place). SQLite has no column
+compression; nothing to do there.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# (table, column, expression producing a fresh copy of the value)
+RECOMPRESSED_COLUMNS = [
+    ("learning_objectives", "content_chunk", "content_chunk || ''"),
+    ("questions", "explanation", "explanation || ''"),
+    ("questions", "options", "options::text::json"),
+]
+
+def recompress(bind, table: str, column: str, expression: str, batch_size: int = BATCH_SIZE) -> int:
+    """Rewrite values of ``column`` still stored as pglz, in id order; returns rows rewritten"""
+    select_batch = sa.text(
+        f"SELECT id FROM {table} WHERE id > :after AND pg_column_compression({column}) = 'pglz' "
+        f"ORDER BY id LIMIT :limit"
+    )
+    update_batch = sa.text(
+        f"UPDATE {table} SET {column} = {expression} WHERE id IN :ids"
+    ).bindparams(sa.bindparam("ids", expanding=True))
+
+    rewritten, after = 0, ""
+    while True:
+        ids = [row.id for row in bind.execute(select_batch, {"after": after, "limit": batch_size})]
+        if not ids:
+            return rewritten
+        bind.execute(update_batch, {"ids": ids})
+        rewritten += len(ids)
+        after = ids[-1]
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or bind.dialect.server_version_info < (14,):
+        return
+    # One transaction per batch rather than one for the whole table
+    with op.get_context().autocommit_block():
+        for table, column, expression in RECOMPRESSED_COLUMNS:
+            method = bind.execute(
+                sa.text(
+                    "SELECT attcompression FROM pg_attribute "
+                    "WHERE attrelid = CAST(:table AS regclass) AND attname = :column"
+                ),
+                {"table": table, "column": column}
+            ).scalar()
+            if method != "l":
+                continue
+            rewritten = recompress(bind, table, column, expression)
+            print(f"Recompressed {rewritten} {table}.{column} values with LZ4")
+
+def downgrade():
+    # Values stay readable whatever their method; 0007's downgrade only
+    # affects new writes, as before
+    pass
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import uuid
+
+# Settings and engines are created at import time, so the test database has
+# to be chosen before anything under app/ is imported
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_tmpdir.name, 'test.db')}"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["UPLOAD_DIR"] = os.path.join(_tmpdir.name, "uploads")
+os.environ["STORAGE_CACHE_DIR"] = os.path.join(_tmpdir.name, "storage-cache")
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["FAKE_LLM_LATENCY_MS"] = "0"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["AUTO_MIGRATE"] = "false"
+
+import pytest
+
+from app.core.database import SessionLocal, engine, run_migrations
+from app.models.database import User, PDF, LearningObjective, Question, StudySession, QuestionAttempt
+
+@pytest.fixture(scope="session")
+def database():
+    """Schema at head through the real migrations"""
+    run_migrations()
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    # No lifespan: the outbox sender, digest and buffer loops stay off
+    return TestClient(app)
+
+def seed_user(db, objectives: int = 2, questions: int = 3, attempts: bool = False) -> str:
+    """A user with one PDF, ``objectives`` objectives and ``questions`` questions each"""
+    user_id = f"user-{uuid.uuid4().hex[:8]}"
+    pdf_id = str(uuid.uuid4())
+    session_id = str(uuid.uuid4())
+    db.add(User(id=user_id, email=f"{user_id}@example.com", name=user_id))
+    db.add(PDF(id=pdf_id, user_id=user_id, filename="seed.pdf", file_path=f"pdfs/{pdf_id}.pdf"))
+    db.add(StudySession(id=session_id, user_id=user_id, session_type="study"))
+    for o in range(objectives):
+        lo_id = str(uuid.uuid4())
+        db.add(LearningObjective(id=lo_id, pdf_id=pdf_id, title=f"Objective {o}", priority="High"))
+        for q in range(questions):
+            question_id = str(uuid.uuid4())
+            db.add(Question(
+                id=question_id,
+                learning_objective_id=lo_id,
+                question_text=f"Seeded question {o}.{q}?",
+                options=["A", "B", "C", "D"],
+                correct_answer="A",
+                explanation="Seeded explanation"
+            ))
+            if attempts:
+                db.add(QuestionAttempt(
+                    id=str(uuid.uuid4()),
+                    session_id=session_id,
+                    question_id=question_id,
+                    user_answer="A",
+                    is_correct=True
+                ))
+    db.commit()
+    return user_id
@@ -0,0 +1,79 @@
+import uuid
+
+from app.models.database import PDF, LearningObjective, Question
+from app.services.dedup_service import DedupService
+
+from .conftest import seed_user
+
+STORED = "What does the useState hook return in a React function component?"
+NEW = "Which HTTP status code tells a client it has sent too many requests?"
+
+def objectives_with(db, *stored_texts):
+    """Two objectives of a fresh user; the first holds ``stored_texts``"""
+    user_id = seed_user(db, objectives=2, questions=0)
+    first, second = [
+        lo_id for (lo_id,) in db.query(LearningObjective.id).join(PDF).filter(PDF.user_id == user_id).order_by(LearningObjective.title)
+    ]
+    for text in stored_texts:
+        db.add(Question(
+            id=str(uuid.uuid4()),
+            learning_objective_id=first,
+            question_text=text,
+            options=["A", "B", "C", "D"],
+            correct_answer="A",
+            explanation="Stored"
+        ))
+    db.commit()
+    return first, second
+
+def row(lo_id, text):
+    return {"id": str(uuid.uuid4()), "learning_objective_id": lo_id, "question_text": text}
+
+def texts(rows):
+    return [r["question_text"] for r in rows]
+
+def test_near_duplicates_within_a_batch_keep_the_first(db):
+    first, _ = objectives_with(db)
+    rows = [row(first, NEW), row(first, NEW.upper().rstrip("?")), row(first, STORED)]
+
+    assert texts(DedupService().filter_new_questions(db, rows)) == [NEW, STORED]
+
+def test_near_duplicates_of_stored_questions_are_dropped(db):
+    first, _ = objectives_with(db, STORED)
+    rows = [row(first, "What does the useState hook return, in a React function component?"), row(first, NEW)]
+
+    assert texts(DedupService().filter_new_questions(db, rows)) == [NEW]
+
+def test_objectives_are_deduplicated_separately(db):
+    first, second = objectives_with(db, STORED)
+    service = DedupService()
+
+    accepted = service.filter_new_questions(db, [row(first, STORED), row(second, STORED), row(second, STORED)])
+
+    assert [r["learning_objective_id"] for r in accepted] == [second]
+    assert len(service.index_for(db, first)) == 1 and len(service.index_for(db, second)) == 1
+
+def test_rollback_drops_uncommitted_questions_from_the_index(db):
+    first, _ = objectives_with(db, STORED)
+    service = DedupService()
+
+    assert texts(service.filter_new_questions(db, [row(first, NEW)])) == [NEW]
+    # Still in the index while the transaction is open
+    assert service.filter_new_questions(db, [row(first, NEW)]) == []
+
+    db.rollback()
+
+    # The insert never happened; the rebuilt index only has the stored question
+    assert len(service.index_for(db, first)) == 1
+    assert texts(service.filter_new_questions(db, [row(first, NEW)])) == [NEW]
+
+def test_commit_keeps_the_index(db):
+    first, _ = objectives_with(db)
+    service = DedupService()
+    accepted = service.filter_new_questions(db, [row(first, NEW)])
+    db.add(Question(options=["A", "B", "C", "D"], correct_answer="A", explanation="New", **accepted[0]))
+    db.commit()
+
+    index = service.index_for(db, first)
+    assert index is service.index_for(db, first) and len(index) == 1
+    assert service.filter_new_questions(db, [row(first, NEW)]) == []
@@ -0,0 +1,133 @@
+import io
+import time
+
+from app.services.markdown_splitter import is_markdown, markdown_objectives, read_section, split_sections
+
+NOTES = b"""# React Course
+
+Intro paragraph.
+
+## Chapter 1: Components (Pages 1-5)
+
+Components text.
+
+### Props
+
+Props text.
+
+```python
+# not a heading
+```
+
+## Chapter 2: Hooks (Pages 6-end)
+
+Hooks
+-----
+
+Hooks text.
+"""
+
+class ChunkedRaw(io.RawIOBase):
+    """A file whose reads return at most ``chunk`` bytes, like a slow stream"""
+
+    def __init__(self, data: bytes, chunk: int):
+        self.data, self.chunk, self.position = data, chunk, 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        piece = self.data[self.position:self.position + min(self.chunk, len(buffer))]
+        buffer[:len(piece)] = piece
+        self.position += len(piece)
+        return len(piece)
+
+def outline(sections):
+    return [(s.level, s.title, s.parent, s.page_range) for s in sections]
+
+def test_is_markdown():
+    assert is_markdown("Notes.MD") and is_markdown("a.markdown") and not is_markdown("a.pdf")
+
+def test_heading_tree_with_nesting_setext_and_fences():
+    sections = split_sections(io.BytesIO(NOTES))
+
+    assert outline(sections) == [
+        (1, "React Course", None, None),
+        (2, "Chapter 1: Components (Pages 1-5)", 0, "1-5"),
+        (3, "Props", 1, None),
+        (2, "Chapter 2: Hooks (Pages 6-end)", 0, "6-end"),
+        (2, "Hooks", 0, None),
+    ]
+    # Each section runs to the next heading of the same or a higher level
+    f = io.BytesIO(NOTES)
+    assert read_section(f, sections[0]) == NOTES.decode()
+    chapter_1 = read_section(f, sections[1])
+    assert chapter_1.startswith("## Chapter 1") and "# not a heading" in chapter_1 and "Chapter 2" not in chapter_1
+    assert read_section(f, sections[4]) == "Hooks\n-----\n\nHooks text.\n"
+
+def test_offsets_are_bytes_not_characters():
+    data = "# Über\n\nÄ text\n\n# Next\n".encode("utf-8")
+    sections = split_sections(io.BytesIO(data))
+    assert read_section(io.BytesIO(data), sections[1]) == "# Next\n"
+
+def test_read_boundaries_mid_heading_and_mid_line_do_not_change_sections():
+    expected = outline(split_sections(io.BytesIO(NOTES)))
+    offsets = [(s.start, s.end) for s in split_sections(io.BytesIO(NOTES))]
+    for chunk in (1, 2, 3, 5, 7, 13, 64):
+        stream = io.BufferedReader(ChunkedRaw(NOTES, chunk), buffer_size=max(chunk, 8))
+        sections = split_sections(stream)
+        assert outline(sections) == expected, chunk
+        assert [(s.start, s.end) for s in sections] == offsets, chunk
+
+def test_crlf_and_unterminated_last_line():
+    data = b"# One\r\n\r\ntext\r\n## Two"
+    assert outline(split_sections(io.BytesIO(data))) == [(1, "One", None, None), (2, "Two", 0, None)]
+
+def test_objectives_table_maps_objectives_to_annotated_sections():
+    table = (
+        b"## Learning Objectives\n\n"
+        b"| ID | Learning Objective | Priority | Page Range | Tags |\n|--|--|--|--|--|\n"
+        b"| LO-001 | Build components | High | 1-3 | react |\n"
+        b"| LO-002 | Use hooks | Medium | 7-9 | hooks |\n"
+        b"| LO-003 | Everything | Low | 1-end | review |\n\n"
+    )
+    objectives = markdown_objectives(io.BytesIO(NOTES.replace(b"Intro paragraph.\n", table)))
+
+    assert [o["source_id"] for o in objectives] == ["LO-001", "LO-002", "LO-003"]
+    assert objectives[0]["content_text"].startswith("## Chapter 1") and "Chapter 2" not in objectives[0]["content_text"]
+    # 7-9 overlaps the open-ended "6-end" chapter
+    assert objectives[1]["content_text"].startswith("## Chapter 2")
+    assert "Chapter 1" in objectives[2]["content_text"] and "Chapter 2" in objectives[2]["content_text"]
+
+def test_objectives_without_page_overlap_match_by_title():
+    data = (
+        b"| ID | Learning Objective | Priority | Page Range | Tags |\n|--|--|--|--|--|\n"
+        b"| LO-001 | Understand state hooks | High | 40 | hooks |\n\n"
+        b"## Rendering lists\n\nLists.\n\n## State hooks in depth\n\nState.\n"
+    )
+    objectives = markdown_objectives(io.BytesIO(data))
+    assert objectives[0]["content_text"].startswith("## State hooks in depth")
+
+def test_open_ended_ranges_stay_cheap():
+    rows = b"".join(f"| LO-{i:03d} | Topic {i} | High | {i * 5 + 1}-end | t |\n".encode() for i in range(20))
+    chapters = b"".join(f"## Chapter {i} (Pages {i * 5 + 1}-end)\n\nText {i}.\n\n".encode() for i in range(20))
+    data = b"| ID | Learning Objective | Priority | Page Range | Tags |\n|--|--|--|--|--|\n" + rows + b"\n" + chapters
+
+    started = time.perf_counter()
+    objectives = markdown_objectives(io.BytesIO(data))
+    # Materialising "N-end" as page sets used to take tens of seconds here
+    assert time.perf_counter() - started < 1.0
+    assert len(objectives) == 20
+
+def test_without_table_each_main_section_is_an_objective():
+    objectives = markdown_objectives(io.BytesIO(NOTES))
+
+    assert [(o["title"], o["page_range"]) for o in objectives] == [
+        ("Chapter 1: Components", "1-5"),
+        ("Chapter 2: Hooks", "6-end"),
+        ("Hooks", ""),
+    ]
+    assert "Props text." in objectives[0]["content_text"]
+
+def test_headingless_document_has_no_objectives():
+    assert markdown_objectives(io.BytesIO(b"Just a paragraph.\n\n```\n# fenced\n```\n")) is None
@@ -0,0 +1,105 @@
+import asyncio
+
+from app.services.ai_service import ai_service
+from app.services.objective_table import page_bounds, parse_objective_table, parse_page_range
+
+HEADER = "| ID | Learning Objective | Priority | Page Range | Tags |\n|----|----|----|----|----|\n"
+
+def document(rows, pages=10):
+    body = "".join(f"## Page {page}\n\nMaterial of page {page}.\n\n" for page in range(1, pages + 1))
+    return "# Course\n\n## Learning Objectives\n\n" + HEADER + "".join(rows) + "\n" + body
+
+def summary(objectives):
+    return [(o["source_id"], o["title"], o["priority"], o["page_range"], o["tags"]) for o in objectives]
+
+def test_page_ranges_select_their_pages():
+    objectives = parse_objective_table(document([
+        "| LO-001 | Understand hooks | High | 1-3 | react, hooks |\n",
+        "| LO-002 | Effects | sedang | 4 | react |\n",
+        "| LO-003 | Context | Low | 8-end | context |\n",
+    ]))
+
+    assert summary(objectives) == [
+        ("LO-001", "Understand hooks", "High", "1-3", ["react", "hooks"]),
+        ("LO-002", "Effects", "Medium", "4", ["react"]),
+        ("LO-003", "Context", "Low", "8-end", ["context"]),
+    ]
+    assert [page in objectives[0]["content_text"] for page in ("Page 1\n", "Page 3\n", "Page 4\n")] == [True, True, False]
+    assert "Material of page 10." in objectives[2]["content_text"]
+    # The table itself is not study material
+    assert "LO-002" not in objectives[0]["content_text"]
+
+def test_page_lists_keep_every_later_row():
+    objectives = parse_objective_table(document([
+        "| LO-001 | Basics | High | 1-2, 5 | react |\n",
+        "| LO-002 | Effects | Medium | 3 - 4 | react |\n",
+        "| LO-003 | Context | Low | 6 | context |\n",
+    ]))
+
+    assert [o["page_range"] for o in objectives] == ["1-2, 5", "3-4", "6"]
+    assert "Material of page 5." in objectives[0]["content_text"]
+    assert "Material of page 3." not in objectives[0]["content_text"]
+
+def test_flattened_pdf_text_without_pipes_or_line_breaks():
+    text = (
+        "ID Learning Objective Priority Page Range Tags "
+        "LO-001 Basics of hooks High 1-5, 8 react, hooks LO-002 Effects Medium 6 - 7 react"
+    )
+    assert summary(parse_objective_table(text)) == [
+        ("LO-001", "Basics of hooks", "High", "1-5, 8", ["react", "hooks"]),
+        ("LO-002", "Effects", "Medium", "6-7", ["react"]),
+    ]
+
+def test_without_page_markers_every_objective_sees_the_body():
+    text = "## Learning Objectives\n\n" + HEADER + "| LO-001 | Basics | High | 1 | react |\n\nPlain material.\n"
+    assert parse_objective_table(text)[0]["content_text"].endswith("Plain material.")
+
+def test_no_table_returns_none():
+    assert parse_objective_table("## Page 1\n\nJust material.\n") is None
+    assert parse_objective_table(HEADER) is None
+
+def test_malformed_row_fails_the_table_instead_of_truncating_it():
+    assert parse_objective_table(document([
+        "| LO-001 | Basics | High | 1-2 | react |\n",
+        "| LO-002 | Effects | Urgent | 3-4 | react |\n",
+        "| LO-003 | Context | Low | 5 | context |\n",
+    ])) is None
+
+def test_row_without_page_range_fails_the_table():
+    assert parse_objective_table(document([
+        "| LO-001 | Basics | High | 1-2 | react |\n",
+        "| LO-002 | Effects | Medium | | react |\n",
+    ])) is None
+
+def test_malformed_table_falls_back_to_the_llm(monkeypatch):
+    calls = []
+
+    async def from_llm(content, filename):
+        calls.append(filename)
+        return [{"title": "From the LLM", "priority": "High", "content_text": content}]
+
+    monkeypatch.setattr(ai_service, "parse_learning_objectives_from_content", from_llm)
+    malformed = document(["| LO-001 | Basics | High | 1-2 | react |\n", "| LO-002 | Effects | Urgent | 3 | x |\n"])
+    objectives = asyncio.run(ai_service.parse_learning_objectives_table(malformed, "notes.pdf"))
+
+    assert calls == ["notes.pdf"]
+    assert [o["title"] for o in objectives] == ["From the LLM"]
+    assert objectives[0]["id"]
+
+def test_valid_table_skips_the_llm(monkeypatch):
+    async def from_llm(content, filename):
+        raise AssertionError("LLM called for a parseable table")
+
+    monkeypatch.setattr(ai_service, "parse_learning_objectives_from_content", from_llm)
+    objectives = asyncio.run(ai_service.parse_learning_objectives_table(
+        document(["| LO-001 | Basics | High | 1-2 | react |\n"])
+    ))
+    assert [o["source_id"] for o in objectives] == ["LO-001"]
+
+def test_page_range_parsing():
+    assert page_bounds("2, 5-7, 9-end") == [(2, 2), (5, 7), (9, None)]
+    assert page_bounds("Pages 3-4") == [(3, 4)]
+    assert page_bounds("see chapter 2") is None
+    assert page_bounds(None) is None
+    assert parse_page_range("2, 5-7, 9-end", 10) == {2, 5, 6, 7, 9, 10}
+    assert parse_page_range("12-14", 10) is None
@@ -0,0 +1,202 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import EmailOutbox, OutboxStatus, User
+from app.services import outbox_sender as outbox_module
+from app.services.email_service import enqueue_email, enqueue_emails
+from app.services.outbox_sender import OutboxSender, RETRY_MAX_SECONDS
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+
+@pytest.fixture
+def outbox(db):
+    """An empty outbox"""
+    db.query(EmailOutbox).delete()
+    db.commit()
+    yield db
+    db.rollback()
+    db.query(EmailOutbox).delete()
+    db.commit()
+
+def add_row(db, recipient="a@example.com", status=OutboxStatus.PENDING.value, due_in=-1, attempts=0):
+    row = EmailOutbox(
+        id=str(uuid.uuid4()),
+        recipient=recipient,
+        subject="Subject",
+        html="<p>Hi</p>",
+        dedup_key=str(uuid.uuid4()),
+        status=status,
+        attempts=attempts,
+        next_attempt_at=datetime.utcnow() + timedelta(seconds=due_in)
+    )
+    db.add(row)
+    db.commit()
+    return row.id
+
+def fetch(row_id):
+    with SessionLocal() as db:
+        return db.query(EmailOutbox).filter(EmailOutbox.id == row_id).one()
+
+def queue_after_lookup(db, dedup_key):
+    """Another writer queues ``dedup_key`` right after ``db``'s next outbox lookup"""
+    @event.listens_for(db, "do_orm_execute", once=True)
+    def race(state):
+        result = state.invoke_statement().freeze()
+        with SessionLocal() as other:
+            enqueue_email(other, "a@example.com", "Winner", "<p>Won</p>", dedup_key)
+            other.commit()
+        return result()
+
+def test_identical_messages_are_queued_once(outbox):
+    assert enqueue_email(outbox, "a@example.com", "Subject", "<p>Hi</p>") is True
+    assert enqueue_email(outbox, "a@example.com", "Subject", "<p>Hi</p>") is False
+    assert enqueue_email(outbox, "b@example.com", "Subject", "<p>Hi</p>") is True
+    outbox.commit()
+
+    assert outbox.query(EmailOutbox).count() == 2
+
+def test_losing_a_dedup_race_keeps_the_callers_work(outbox):
+    user_id = f"user-{uuid.uuid4().hex[:8]}"
+    outbox.add(User(id=user_id, email=f"{user_id}@example.com", name=user_id))
+    queue_after_lookup(outbox, "race-key")
+
+    assert enqueue_email(outbox, "a@example.com", "Loser", "<p>Lost</p>", "race-key") is False
+    outbox.commit()
+
+    assert outbox.query(User).filter(User.id == user_id).count() == 1
+    assert [row.subject for row in outbox.query(EmailOutbox)] == ["Winner"]
+
+def test_bulk_enqueue_falls_back_to_row_by_row_on_a_race(outbox):
+    enqueue_email(outbox, "a@example.com", "Old", "<p>Old</p>", "digest:1")
+    outbox.commit()
+    messages = [
+        {"recipient": f"{key}@example.com", "subject": key, "html": "<p>Due</p>", "dedup_key": key}
+        for key in ("digest:1", "digest:2", "digest:3")
+    ]
+    queue_after_lookup(outbox, "digest:3")
+
+    # digest:1 was already queued; digest:3 is queued by the other writer meanwhile
+    assert enqueue_emails(outbox, messages) == 1
+    outbox.commit()
+
+    assert sorted(row.dedup_key for row in outbox.query(EmailOutbox)) == ["digest:1", "digest:2", "digest:3"]
+    assert enqueue_emails(outbox, messages) == 0
+
+def test_claim_takes_due_rows_in_order_and_skips_claimed_ones(outbox, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_claim_seconds", 300)
+    later = add_row(outbox, due_in=-10)
+    first = add_row(outbox, due_in=-60)
+    not_due = add_row(outbox, due_in=60)
+    sent = add_row(outbox, status=OutboxStatus.SENT.value, due_in=-60)
+    failed = add_row(outbox, status=OutboxStatus.FAILED.value, due_in=-60)
+    sender = OutboxSender()
+
+    assert [email["id"] for email in sender._claim(1)] == [first]
+    assert [email["id"] for email in sender._claim(10)] == [later]
+    assert sender._claim(10) == []
+
+    row = fetch(first)
+    assert row.status == OutboxStatus.SENDING.value and row.attempts == 1
+    assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=290)
+    assert {fetch(row_id).status for row_id in (not_due, sent, failed)} == {
+        OutboxStatus.PENDING.value, OutboxStatus.SENT.value, OutboxStatus.FAILED.value
+    }
+
+def test_expired_claims_are_reclaimed(outbox):
+    # A sender died mid-batch: the row is still "sending" but its claim has expired
+    stale = add_row(outbox, status=OutboxStatus.SENDING.value, due_in=-1, attempts=1)
+
+    claimed = OutboxSender()._claim(10)
+
+    assert [(email["id"], email["attempts"]) for email in claimed] == [(stale, 2)]
+
+@pytest.mark.parametrize("attempts, delay", [(1, 30), (2, 60), (4, 240), (10, RETRY_MAX_SECONDS)])
+def test_failures_back_off_exponentially(outbox, monkeypatch, attempts, delay):
+    monkeypatch.setattr(settings, "outbox_max_attempts", 20)
+    row_id = add_row(outbox, status=OutboxStatus.SENDING.value, attempts=attempts)
+
+    OutboxSender()._mark_failed([{"id": row_id}], "503: unavailable")
+
+    row = fetch(row_id)
+    assert row.status == OutboxStatus.PENDING.value and row.last_error == "503: unavailable"
+    expected = datetime.utcnow() + timedelta(seconds=delay)
+    assert abs((row.next_attempt_at - expected).total_seconds()) < 5
+
+def test_failures_give_up_after_max_attempts_or_when_permanent(outbox, monkeypatch):
+    monkeypatch.setattr(settings, "outbox_max_attempts", 3)
+    exhausted = add_row(outbox, status=OutboxStatus.SENDING.value, attempts=3)
+    invalid = add_row(outbox, status=OutboxStatus.SENDING.value, attempts=1)
+    sender = OutboxSender()
+
+    sender._mark_failed([{"id": exhausted}], "500: error")
+    sender._mark_failed([{"id": invalid}], "422: invalid address", permanent=True)
+
+    assert fetch(exhausted).status == OutboxStatus.FAILED.value
+    assert fetch(invalid).status == OutboxStatus.FAILED.value
+
+def test_drain_sends_a_batch(outbox, monkeypatch):
+    row_ids = [add_row(outbox, recipient=f"{i}@example.com") for i in range(3)]
+    batches = []
+
+    async def post_batch(payloads):
+        batches.append([payload["to"] for payload in payloads])
+        return FakeResponse(200)
+
+    monkeypatch.setattr(outbox_module, "_post_batch_to_resend", post_batch)
+
+    assert asyncio.run(OutboxSender().drain_once()) == 3
+    assert len(batches) == 1 and len(batches[0]) == 3
+    assert {fetch(row_id).status for row_id in row_ids} == {OutboxStatus.SENT.value}
+    assert asyncio.run(OutboxSender().drain_once()) == 0
+
+def test_drain_retries_a_failed_batch_later(outbox, monkeypatch):
+    row_id = add_row(outbox)
+
+    async def post_batch(payloads):
+        return FakeResponse(503, "unavailable")
+
+    monkeypatch.setattr(outbox_module, "_post_batch_to_resend", post_batch)
+
+    assert asyncio.run(OutboxSender().drain_once()) == 1
+    row = fetch(row_id)
+    assert row.status == OutboxStatus.PENDING.value and row.attempts == 1
+    assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    # Not due again until the backoff passes
+    assert asyncio.run(OutboxSender().drain_once()) == 0
+
+def test_rejected_batch_is_sent_individually(outbox, monkeypatch):
+    good = add_row(outbox, recipient="good@example.com")
+    bad = add_row(outbox, recipient="bad@example.com")
+
+    async def post_batch(payloads):
+        return FakeResponse(422, "invalid recipient")
+
+    async def post_one(payload):
+        return FakeResponse(422, "invalid recipient") if payload["to"] == ["bad@example.com"] else FakeResponse(200)
+
+    monkeypatch.setattr(outbox_module, "_post_batch_to_resend", post_batch)
+    monkeypatch.setattr(outbox_module, "_post_to_resend", post_one)
+
+    asyncio.run(OutboxSender().drain_once())
+
+    assert fetch(good).status == OutboxStatus.SENT.value
+    assert fetch(bad).status == OutboxStatus.FAILED.value
+
+def test_send_test_link_reports_a_deduplicated_send(client, outbox):
+    first = client.post("/api/email/send-test-link", json={"email": "tester@example.com"})
+    again = client.post("/api/email/send-test-link", json={"email": "tester@example.com"})
+
+    assert first.status_code == 200 and first.json()["queued"] is True
+    assert first.json()["message"] == "Test link queued for delivery"
+    assert again.status_code == 200 and again.json()["queued"] is False
+    assert again.json()["message"] == "This test link was already sent today"
+    assert outbox.query(EmailOutbox).filter(EmailOutbox.recipient == "tester@example.com").count() == 1
@@ -0,0 +1,49 @@
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.models.database import LearningObjective, PDF, Question, QuestionAttempt, StudySession
+
+from .conftest import seed_user
+
+def test_keyset_pages_cover_every_question_once(client, db):
+    user_id = seed_user(db, objectives=1, questions=7)
+    lo_id = db.query(LearningObjective.id).join(PDF).filter(PDF.user_id == user_id).scalar()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/api/questions/by-objective/{lo_id}", params=params)
+        assert response.status_code == 200
+        seen.extend(q["id"] for q in response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    expected = db.query(Question.id).filter(Question.learning_objective_id == lo_id).order_by(Question.created_at, Question.id)
+    assert seen == [row.id for row in expected]
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/questions/by-objective/anything", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+def test_session_results_page_through_the_header_only(client, db):
+    user_id = seed_user(db, objectives=1, questions=5, attempts=True)
+    session_id = db.query(StudySession.id).filter(StudySession.user_id == user_id).scalar()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "question_id"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/api/study/session/{session_id}/results", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert "next_cursor" not in body
+        seen.extend(attempt["question_id"] for attempt in body["attempts"])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(
+        row.question_id for row in db.query(QuestionAttempt.question_id).filter(QuestionAttempt.session_id == session_id)
+    )
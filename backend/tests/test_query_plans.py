@@ -0,0 +1,122 @@
+"""
+Query-plan regression tests for the hot-path queries.
+
+Runs EXPLAIN on every query in ``HOT_PATH_QUERIES`` against the migrated
+test database and fails if any of them falls back to a sequential scan.
+SQLite uses EXPLAIN QUERY PLAN; on Postgres (TEST_DATABASE_URL) plans are
+taken with enable_seqscan off, so a sequential scan only shows up when no
+usable index exists.
+"""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models.database import User, PDF, LearningObjective, Question, StudySession, QuestionAttempt
+
+SEED_USER = "plan-user-0"
+SEED_PDF = "plan-pdf-0"
+SEED_LO = "plan-lo-0"
+SEED_QUESTION = "plan-q-0"
+SEED_SESSION = "plan-session-0"
+
+# Each entry mirrors the statement a route or service issues on the hot path
+HOT_PATH_QUERIES = {
+    "questions.by_objective": select(Question).where(Question.learning_objective_id == SEED_LO),
+    "questions.by_objective_page": (
+        select(Question)
+        .where(Question.learning_objective_id == SEED_LO)
+        .order_by(Question.created_at, Question.id)
+        .limit(100)
+    ),
+    "questions.due_for_user": (
+        select(Question)
+        .join(LearningObjective, Question.learning_objective_id == LearningObjective.id)
+        .join(PDF, LearningObjective.pdf_id == PDF.id)
+        .where(PDF.user_id == SEED_USER)
+    ),
+    "pdf.learning_objectives": select(LearningObjective).where(LearningObjective.pdf_id == SEED_PDF),
+    "pdf.by_user": select(PDF).where(PDF.user_id == SEED_USER),
+    "study.attempts_by_session": select(QuestionAttempt).where(QuestionAttempt.session_id == SEED_SESSION),
+    "study.attempts_by_question": select(QuestionAttempt).where(QuestionAttempt.question_id == SEED_QUESTION),
+    "gamification.completed_sessions": (
+        select(StudySession)
+        .where(StudySession.user_id == SEED_USER, StudySession.completed_at.isnot(None))
+        .order_by(StudySession.completed_at.desc())
+    ),
+}
+
+@pytest.fixture(scope="module")
+def seeded(database, users=20, objectives_per_user=5, questions_per_objective=10):
+    """Enough rows that the planner has a real choice to make"""
+    db = SessionLocal()
+    try:
+        for u in range(users):
+            user_id = f"plan-user-{u}"
+            pdf_id = f"plan-pdf-{u}"
+            session_id = f"plan-session-{u}"
+            db.add(User(id=user_id, email=f"{user_id}@example.com", name=user_id))
+            db.add(PDF(id=pdf_id, user_id=user_id, filename="plan.pdf", file_path="plan.pdf"))
+            db.add(StudySession(id=session_id, user_id=user_id, session_type="study"))
+            for o in range(objectives_per_user):
+                lo_id = f"plan-lo-{u * objectives_per_user + o}"
+                db.add(LearningObjective(id=lo_id, pdf_id=pdf_id, title=lo_id, priority="High"))
+                for q in range(questions_per_objective):
+                    question_id = SEED_QUESTION if (u, o, q) == (0, 0, 0) else str(uuid.uuid4())
+                    db.add(Question(
+                        id=question_id,
+                        learning_objective_id=lo_id,
+                        question_text="Seeded question?",
+                        options=["A", "B", "C", "D"],
+                        correct_answer="A",
+                        explanation="Seeded explanation"
+                    ))
+                    db.add(QuestionAttempt(
+                        id=str(uuid.uuid4()),
+                        session_id=session_id,
+                        question_id=question_id,
+                        user_answer="A",
+                        is_correct=True
+                    ))
+        db.commit()
+    finally:
+        db.close()
+
+    with database.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE")
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        yield conn
+
+def explain(conn, statement):
+    """Return (plan text, uses_sequential_scan) for a statement"""
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        details = [row[-1] for row in rows]
+        # "SCAN <table>" without an index is a full table scan
+        seq_scan = any(d.startswith("SCAN") and "USING" not in d for d in details)
+        return "\n".join(details), seq_scan
+
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        node_types = []
+        stack = [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            node_types.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+            stack.extend(node.get("Plans", []))
+        return "\n".join(node_types), any(n.startswith("Seq Scan") for n in node_types)
+
+    pytest.skip(f"No plan checks for {conn.dialect.name}")
+
+@pytest.mark.parametrize("name", list(HOT_PATH_QUERIES))
+def test_hot_path_query_uses_an_index(seeded, name):
+    plan, seq_scan = explain(seeded, HOT_PATH_QUERIES[name])
+    assert not seq_scan, f"{name} uses a sequential scan:\n{plan}"
@@ -0,0 +1,65 @@
+from sqlalchemy import select, text
+
+from app.core.query_stats import QueryStats, assert_max_queries, count_queries
+from app.models.database import Question
+
+from .conftest import seed_user
+
+def test_repeated_statement_with_same_parameters_is_not_n_plus_one():
+    stats = QueryStats()
+    for _ in range(10):
+        stats.record("SELECT * FROM questions WHERE id = ?", ("q-1",), 0.001)
+    assert stats.count == 10
+    assert stats.repeated_statements(threshold=5) == []
+
+def test_statement_with_distinct_parameter_sets_is_n_plus_one():
+    stats = QueryStats()
+    for i in range(6):
+        stats.record("SELECT * FROM questions WHERE id = ?", (f"q-{i}",), 0.001)
+    stats.record("SELECT * FROM pdfs WHERE id = ?", ({"unhashable": ["json"]},), 0.001)
+    assert stats.repeated_statements(threshold=5) == [("SELECT * FROM questions WHERE id = ?", 6)]
+
+def test_count_queries_sees_parameters(database):
+    with count_queries() as stats:
+        with database.connect() as conn:
+            for i in range(3):
+                conn.execute(select(Question.id).where(Question.id == f"missing-{i}"))
+            conn.execute(text("SELECT 1"))
+    assert stats.count == 4
+    assert stats.repeated_statements(threshold=3)[0][1] == 3
+
+def test_due_questions_query_count_does_not_grow_with_questions(client, db):
+    small = seed_user(db, objectives=1, questions=1)
+    large = seed_user(db, objectives=5, questions=20)
+
+    # One query for the questions with their objectives, one for the options of the page
+    for user_id in (small, large):
+        with assert_max_queries(2):
+            response = client.get("/api/questions/due", params={"user_id": user_id})
+        assert response.status_code == 200
+
+    assert len(response.json()) == 30
+
+def test_background_task_queries_are_not_charged_to_the_request(database):
+    from fastapi import BackgroundTasks, FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.core.metrics import DB_QUERIES_PER_REQUEST
+    from app.core.query_stats import QueryStatsMiddleware
+
+    def run_queries(count):
+        with database.connect() as conn:
+            for i in range(count):
+                conn.execute(text(f"SELECT {i}"))
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.post("/with-background-work")
+    def handler(background_tasks: BackgroundTasks):
+        run_queries(1)
+        background_tasks.add_task(run_queries, 10)
+        return {}
+
+    TestClient(app).post("/with-background-work")
+    assert DB_QUERIES_PER_REQUEST.labels(route="/with-background-work")._sum.get() == 1
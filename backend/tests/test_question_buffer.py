@@ -0,0 +1,63 @@
+import asyncio
+
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitStore, RateLimitRule, rate_limiter
+from app.services.question_buffer import QuestionBufferService
+
+class SharedStore:
+    """Stands in for the Redis store: one set of buckets for every worker"""
+
+    def __init__(self):
+        self.buckets = MemoryRateLimitStore()
+        self.keys = []
+
+    def take(self, key, rule, cost=1.0):
+        self.keys.append(key)
+        return self.buckets.take(key, rule, cost)
+
+def worker(budget: int) -> QuestionBufferService:
+    service = QuestionBufferService()
+    service._budget_rule = RateLimitRule(budget, 3600)
+    return service
+
+def takes(service, count):
+    return [asyncio.run(service._take_budget()) for _ in range(count)]
+
+def test_budget_is_per_process_with_the_memory_backend(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    first, second = worker(2), worker(2)
+
+    assert takes(first, 3) == [True, True, False]
+    assert takes(second, 2) == [True, True]
+
+def test_budget_is_shared_through_the_redis_store(monkeypatch):
+    store = SharedStore()
+    monkeypatch.setattr(settings, "rate_limit_backend", "redis")
+    monkeypatch.setattr(rate_limiter, "_store", store)
+    first, second = worker(3), worker(3)
+
+    assert takes(first, 2) == [True, True]
+    assert takes(second, 2) == [True, False]
+    assert takes(first, 1) == [False]
+    assert set(store.keys) == {"question_buffer:generation"}
+
+def test_budget_fails_open_when_the_store_is_down(monkeypatch):
+    class BrokenStore:
+        def take(self, key, rule, cost=1.0):
+            raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(settings, "rate_limit_backend", "redis")
+    monkeypatch.setattr(rate_limiter, "_store", BrokenStore())
+
+    assert takes(worker(1), 3) == [True, True, True]
+
+def test_budget_survives_client_bucket_eviction(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(rate_limiter, "_store", MemoryRateLimitStore(max_keys=1))
+    service = worker(1)
+
+    assert takes(service, 1) == [True]
+    # Flood the client limiter's store; the budget lives in its own store
+    for i in range(10):
+        rate_limiter.store.take(f"email:ip:10.0.0.{i}", RateLimitRule(5, 300))
+    assert takes(service, 1) == [False]
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import rate_limit as rate_limit_module
+from app.core.config import settings
+from app.core.rate_limit import (
+    ConcurrencyLimiter,
+    MemoryRateLimitStore,
+    RateLimitRule,
+    llm_admission,
+    rate_limit,
+    rate_limiter
+)
+
+class FakeClock:
+    """Stands in for the time module inside app.core.rate_limit"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit_module, "time", clock)
+    return clock
+
+@pytest.fixture
+def limited_client(monkeypatch, clock):
+    """An app with one rate-limited route: 2 requests per 60 seconds"""
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_backend", "memory")
+    monkeypatch.setattr(rate_limiter, "_rules", {"email": RateLimitRule(2, 60)})
+    monkeypatch.setattr(rate_limiter, "_store", MemoryRateLimitStore())
+
+    app = FastAPI()
+
+    @app.post("/send", dependencies=[Depends(rate_limit("email"))])
+    def send():
+        return {"ok": True}
+
+    return TestClient(app)
+
+def test_rule_parse():
+    rule = RateLimitRule.parse("10/3600")
+    assert rule == RateLimitRule(10, 3600.0)
+    assert rule.refill_per_second == pytest.approx(10 / 3600)
+
+def test_bucket_refills_continuously_up_to_capacity(clock):
+    store, rule = MemoryRateLimitStore(), RateLimitRule(2, 60)
+
+    assert store.take("k", rule) == (True, 0.0)
+    assert store.take("k", rule) == (True, 0.0)
+    allowed, retry_after = store.take("k", rule)
+    assert not allowed and retry_after == pytest.approx(30)
+
+    clock.advance(15)
+    allowed, retry_after = store.take("k", rule)
+    assert not allowed and retry_after == pytest.approx(15)
+
+    clock.advance(15)
+    assert store.take("k", rule)[0]
+
+    # Idle time never banks more than capacity
+    clock.advance(3600)
+    assert [store.take("k", rule)[0] for _ in range(3)] == [True, True, False]
+
+def test_buckets_are_independent_and_evicted_least_recently_used(clock):
+    store, rule = MemoryRateLimitStore(max_keys=2), RateLimitRule(1, 60)
+    assert store.take("a", rule)[0] and store.take("b", rule)[0]
+    assert not store.take("a", rule)[0]
+
+    # "b" is now the least recently used; a third key evicts it, and it starts full again
+    assert store.take("c", rule)[0]
+    assert store.take("b", rule)[0]
+
+def test_route_returns_429_with_retry_after(limited_client, clock):
+    assert [limited_client.post("/send").status_code for _ in range(2)] == [200, 200]
+
+    response = limited_client.post("/send")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+    clock.advance(30)
+    assert limited_client.post("/send").status_code == 200
+
+def test_user_bucket_applies_across_addresses(limited_client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trust_forwarded", True)
+    for address in ("10.0.0.1", "10.0.0.2"):
+        response = limited_client.post("/send", params={"user_id": "u1"}, headers={"X-Forwarded-For": address})
+        assert response.status_code == 200
+
+    response = limited_client.post("/send", params={"user_id": "u1"}, headers={"X-Forwarded-For": "10.0.0.3"})
+    assert response.status_code == 429
+    # Another user from a fresh address is unaffected
+    response = limited_client.post("/send", params={"user_id": "u2"}, headers={"X-Forwarded-For": "10.0.0.4"})
+    assert response.status_code == 200
+
+def test_store_errors_fail_open(limited_client, monkeypatch):
+    class BrokenStore:
+        def take(self, key, rule, cost=1.0):
+            raise ConnectionError("redis is down")
+
+    monkeypatch.setattr(rate_limiter, "_store", BrokenStore())
+    assert [limited_client.post("/send").status_code for _ in range(5)] == [200] * 5
+
+def test_disabled_limiter_admits_everything(limited_client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    assert [limited_client.post("/send").status_code for _ in range(5)] == [200] * 5
+
+def test_concurrency_limiter_queues_then_sheds():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_waiting=1)
+    order = []
+
+    async def call(name, release):
+        async with limiter:
+            order.append(name)
+            await release.wait()
+
+    async def scenario():
+        first_done, second_done = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(call("first", first_done))
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1 and not limiter.saturated
+
+        second = asyncio.create_task(call("second", second_done))
+        await asyncio.sleep(0)
+        # One running, one waiting: new work should be shed
+        assert limiter.waiting == 1 and limiter.saturated
+        assert order == ["first"]
+
+        first_done.set()
+        await first
+        await asyncio.sleep(0)
+        assert order == ["first", "second"] and not limiter.saturated
+
+        second_done.set()
+        await second
+        assert limiter.in_flight == 0 and limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+def test_llm_admission_returns_503_while_saturated(monkeypatch):
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_waiting=0)
+    monkeypatch.setattr(rate_limit_module, "llm_limiter", limiter)
+    monkeypatch.setattr(settings, "llm_retry_after_seconds", 7)
+
+    app = FastAPI()
+
+    @app.post("/process", dependencies=[Depends(llm_admission("pdf_process"))])
+    def process():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/process").status_code == 200
+
+    limiter.in_flight = 1
+    response = client.post("/process")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
@@ -0,0 +1,66 @@
+from app.services.revision_service import PageDiff, format_page_range, pages_content, plan_revision
+
+OLD = [f"page {page} text" for page in range(1, 11)]
+OBJECTIVES = [("intro", "1-3"), ("middle", "4-6"), ("rest", "7-end"), ("free", "see chapter 2"), ("unset", None)]
+
+def plan_for(new_pages, objectives=OBJECTIVES):
+    return plan_revision(objectives, PageDiff.between(OLD, new_pages))
+
+def test_format_page_range_compacts_runs():
+    assert format_page_range({1, 2, 3, 7, 9, 10}) == "1-3, 7, 9-10"
+
+def test_unchanged_document_plans_nothing():
+    plan = plan_for(list(OLD))
+    assert not plan.regenerate and not plan.renumber and not plan.remove
+
+def test_edit_regenerates_only_the_objective_on_that_page():
+    new = list(OLD)
+    new[4] = "page 5 text, revised"
+    plan = plan_for(new)
+
+    assert plan.regenerate == {"middle": "4-6", "free": "see chapter 2", "unset": None}
+    assert plan.renumber == {}
+    assert plan.remove == []
+
+def test_insert_renumbers_later_objectives_and_keeps_open_end():
+    new = OLD[:3] + ["inserted page"] + OLD[3:]
+    plan = plan_for(new)
+
+    # The inserted page continues page 3, so only "intro" gets new material
+    assert plan.regenerate == {"intro": "1-4", "free": "see chapter 2", "unset": None}
+    assert plan.renumber == {"middle": "5-7", "rest": "8-end"}
+
+def test_insert_before_open_ended_objective_shifts_its_start():
+    new = OLD[:2] + ["inserted page"] + OLD[2:]
+    plan = plan_for(new, [("intro", "1-2"), ("rest", "3-end")])
+
+    assert plan.regenerate == {"intro": "1-3"}
+    assert plan.renumber == {"rest": "4-end"}
+
+def test_delete_regenerates_the_owner_and_renumbers_the_rest():
+    new = OLD[:4] + OLD[5:]
+    plan = plan_for(new)
+
+    assert plan.regenerate == {"middle": "4-5"}
+    assert plan.renumber == {"rest": "6-end"}
+    # Free-text and unset ranges only follow changed or inserted pages
+    assert "free" not in plan.regenerate and "unset" not in plan.regenerate
+
+def test_objective_whose_pages_were_all_deleted_is_removed():
+    new = OLD[:3] + OLD[6:]
+    plan = plan_for(new, [("intro", "1-3"), ("middle", "4-6"), ("rest", "7-10")])
+
+    assert plan.remove == ["middle"]
+    assert plan.renumber == {"rest": "4-7"}
+    assert "middle" not in plan.regenerate
+
+def test_changed_pages_outside_every_objective_are_reported():
+    new = OLD + ["appendix"]
+    plan = plan_for(new, [("intro", "1-3")])
+
+    assert plan.regenerate == {}
+    assert plan.uncovered_pages == [11]
+
+def test_pages_content_selects_pages_in_page_format():
+    content = pages_content(["one", "two", "three"], {1, 3})
+    assert content == "## Page 1\n\none\n\n## Page 3\n\nthree\n"
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import text
+
+from app.models.database import LearningObjective, PDF, Question
+
+from .conftest import seed_user
+
+def _question(db, user_id):
+    return db.query(Question).join(LearningObjective).join(PDF).filter(PDF.user_id == user_id).first()
+
+def test_search_returns_only_the_users_questions(client, db):
+    alice, bob = seed_user(db, objectives=1, questions=1), seed_user(db, objectives=1, questions=1)
+    _question(db, alice).question_text = "What does useEffect cleanup do?"
+    _question(db, bob).question_text = "What does useEffect return?"
+    db.commit()
+
+    hits = client.get("/api/search", params={"q": "useEffect", "user_id": bob}).json()
+    assert [hit["question_text"] for hit in hits] == ["What does useEffect return?"]
+
+def test_renumbered_rowids_do_not_leak_other_users_rows(client, db):
+    alice, bob = seed_user(db, objectives=1, questions=1), seed_user(db, objectives=1, questions=1)
+    alice_question, bob_question = _question(db, alice), _question(db, bob)
+    alice_question.question_text = "Alice's private zanzibar notes"
+    bob_question.question_text = "Bob's zanzibar notes"
+    db.commit()
+    if db.get_bind().dialect.name != "sqlite":
+        pytest.skip("rowid renumbering only affects the SQLite FTS5 index")
+
+    # What a VACUUM may do to tables without an INTEGER PRIMARY KEY: the FTS
+    # entries keep the old rowids while the rows move
+    rowids = dict(db.execute(text("SELECT id, rowid FROM questions WHERE id IN (:a, :b)"),
+                             {"a": alice_question.id, "b": bob_question.id}).all())
+    db.execute(text("UPDATE questions SET rowid = -1 WHERE id = :id"), {"id": alice_question.id})
+    db.execute(text("UPDATE questions SET rowid = :r WHERE id = :id"), {"r": rowids[alice_question.id], "id": bob_question.id})
+    db.execute(text("UPDATE questions SET rowid = :r WHERE id = :id"), {"r": rowids[bob_question.id], "id": alice_question.id})
+    db.commit()
+
+    hits = client.get("/api/search", params={"q": "zanzibar", "user_id": bob}).json()
+    assert all("Alice" not in (hit.get("question_text") or "") for hit in hits)